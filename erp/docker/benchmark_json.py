@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de la codificación JSON de la API Renaix.
+
+Compara, sobre una página de productos como la de GET /api/v1/productos:
+  - antes: isoformat() a mano en los serializers + json.dumps (como
+    request.make_json_response de Odoo)
+  - ahora: renaix_api/models/utils/json_utils.dumps con las fechas sin
+    convertir (orjson si está instalado, json de la librería estándar si no)
+
+No necesita Odoo ni la BD.
+
+Requisitos (opcional, para medir orjson):
+    pip install orjson
+
+Uso:
+    python benchmark_json.py --productos 100 --repeticiones 2000
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import timeit
+from datetime import datetime, timedelta
+
+# ==================== CONFIGURACIÓN ====================
+
+JSON_UTILS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'custom_addons', 'renaix_api', 'models', 'utils', 'json_utils.py',
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de codificación JSON")
+    parser.add_argument("--productos",    type=int, default=100,  help="Productos por página")
+    parser.add_argument("--repeticiones", type=int, default=2000, help="Codificaciones por medición")
+    return parser.parse_args()
+
+
+def load_json_utils():
+    # Se carga por ruta: importar el paquete del addon requiere Odoo
+    spec = importlib.util.spec_from_file_location('json_utils', JSON_UTILS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# ==================== DATOS DE PRUEBA ====================
+
+def build_producto(i, fecha):
+    """Producto con la misma forma que serializers.serialize_productos."""
+    return {
+        'id': i,
+        'nombre': f'Producto de prueba número {i} — bicicleta de montaña',
+        'descripcion': 'Bicicleta en buen estado, revisada hace un mes. ' * 4,
+        'precio': round(random.uniform(5, 900), 2),
+        'estado_producto': random.choice(['nuevo', 'como_nuevo', 'buen_estado', 'usado']),
+        'estado_venta': 'disponible',
+        'antiguedad': '2 años',
+        'ubicacion': 'València',
+        'latitud': 39.4699,
+        'longitud': -0.3763,
+        'fecha_publicacion': fecha,
+        'fecha_actualizacion': fecha + timedelta(hours=3),
+        'dias_publicado': 12,
+        'total_comentarios': 3,
+        'total_denuncias': 0,
+        'propietario': {'id': 1000 + i % 37, 'name': 'Usuaria Renaix', 'email': 'usuaria@example.com'},
+        'categoria': {
+            'id': 7,
+            'nombre': 'Deporte',
+            'descripcion': 'Artículos deportivos',
+            'producto_count': 412,
+            'imagen_url': '/web/image/renaix.categoria/7/image',
+        },
+        'etiquetas': [
+            {'id': 10 + j, 'nombre': f'etiqueta{j}', 'producto_count': 50 + j, 'color': j}
+            for j in range(3)
+        ],
+        'imagenes': [
+            {'id': i * 10 + j, 'url_imagen': f'/api/v1/imagenes/{i * 10 + j}', 'es_principal': j == 0,
+             'descripcion': '', 'secuencia': j}
+            for j in range(3)
+        ],
+    }
+
+
+def build_page(n):
+    base = datetime(2025, 11, 3, 10, 15, 0)
+    items = [build_producto(i, base - timedelta(days=i)) for i in range(1, n + 1)]
+    return {
+        'success': True,
+        'message': 'Productos recuperados',
+        'data': items,
+        'pagination': {'limit': n, 'next_cursor': 'MjAyNS0xMS0wMyAxMDoxNTowMHw0Mg==', 'has_next': True},
+    }
+
+
+def with_isoformat(value):
+    """Copia de la página con las fechas ya convertidas (serializers antiguos)."""
+    if isinstance(value, dict):
+        return {k: with_isoformat(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [with_isoformat(v) for v in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+# ==================== MEDICIÓN ====================
+
+def main():
+    args = parse_args()
+    json_utils = load_json_utils()
+    page = build_page(args.productos)
+    # Las fechas se convierten fuera de la medición (favorece a "antes")
+    page_iso = with_isoformat(page)
+
+    def antes():
+        json.dumps(page_iso, ensure_ascii=False).encode('utf-8')
+
+    def ahora():
+        json_utils.dumps(page)
+
+    # Misma salida en ambos caminos
+    assert json.loads(json_utils.dumps(page)) == json.loads(json.dumps(page_iso))
+
+    print(f"Página de {args.productos} productos ({len(json_utils.dumps(page)) / 1024:.1f} KB), "
+          f"{args.repeticiones} repeticiones, codificador: {json_utils.encoder_name()}")
+
+    resultados = {}
+    for nombre, funcion in (('antes', antes), ('ahora', ahora)):
+        segundos = min(timeit.repeat(funcion, number=args.repeticiones, repeat=5))
+        resultados[nombre] = segundos / args.repeticiones * 1e6
+        print(f"  {nombre:6} {resultados[nombre]:9.1f} µs/página")
+
+    print(f"  mejora x{resultados['antes'] / resultados['ahora']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
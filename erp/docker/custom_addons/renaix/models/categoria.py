@@ -84,6 +84,15 @@ class Categoria(models.Model):
         for categoria in self:
             categoria.producto_count = len(categoria.producto_ids)
     
+    def write(self, vals):
+        """Al renombrar: actualizar el vector de búsqueda de sus productos"""
+        result = super(Categoria, self).write(vals)
+        
+        if 'name' in vals:
+            self.with_context(active_test=False).producto_ids._update_search_vector()
+        
+        return result
+    
     @api.constrains('name')
     def _check_name(self):
         """Validación: el nombre no puede estar vacío después de quitar espacios"""
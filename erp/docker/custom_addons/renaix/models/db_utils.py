@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Utilidades de base de datos compartidas por los modelos de Renaix
+"""
+
+import logging
+import psycopg2
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+
+def ensure_extension(cr, extension):
+    """
+    Instala una extensión de PostgreSQL si no lo está ya.
+
+    Requiere permisos suficientes en la BD; si no los hay se registra un
+    aviso y se continúa sin la extensión.
+
+    Args:
+        cr: Cursor de la BD
+        extension (str): Nombre de la extensión (ej: 'unaccent', 'pg_trgm')
+
+    Returns:
+        bool: True si la extensión está disponible
+    """
+    cr.execute('SELECT 1 FROM pg_extension WHERE extname = %s', [extension])
+    if cr.rowcount:
+        return True
+
+    try:
+        with cr.savepoint():
+            cr.execute(SQL('CREATE EXTENSION IF NOT EXISTS %s', SQL.identifier(extension)))
+        return True
+    except psycopg2.Error:
+        _logger.warning('No se pudo instalar la extensión %s de PostgreSQL', extension)
+        return False
@@ -2,6 +2,8 @@
 
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import sql
+from .db_utils import ensure_extension
 
 
 class Etiqueta(models.Model):
@@ -60,6 +62,18 @@ class Etiqueta(models.Model):
          'Ya existe una etiqueta con este nombre (no distingue mayúsculas).')
     ]
     
+    def init(self):
+        """Índices del nombre: prefijo (autocompletado) y trigram (subcadena y aproximada)"""
+        sql.create_index(
+            self.env.cr, 'renaix_etiqueta_name_prefix_idx', self._table,
+            ['lower(name) text_pattern_ops'],
+        )
+        if ensure_extension(self.env.cr, 'pg_trgm'):
+            sql.create_index(
+                self.env.cr, 'renaix_etiqueta_name_trgm_idx', self._table,
+                ['name gin_trgm_ops'], method='gin',
+            )
+    
     @api.depends('producto_ids')
     def _compute_producto_count(self):
         """Calcula cuántos productos tienen esta etiqueta"""
@@ -81,8 +95,23 @@ class Etiqueta(models.Model):
         """
         if 'name' in vals:
             vals['name'] = self._normalize_name(vals['name'])
-        return super(Etiqueta, self).write(vals)
-    
+        result = super(Etiqueta, self).write(vals)
+        
+        # El nombre de la etiqueta forma parte del vector de búsqueda de los productos
+        if 'name' in vals:
+            self.with_context(active_test=False).producto_ids._update_search_vector()
+        
+        return result
+
+    def unlink(self):
+        """
+        Al borrar: quitar la etiqueta del vector de búsqueda de sus productos
+        """
+        productos = self.with_context(active_test=False).producto_ids
+        result = super(Etiqueta, self).unlink()
+        productos._update_search_vector()
+        return result
+
     def _normalize_name(self, name):
         """
         Normaliza el nombre de la etiqueta:
@@ -178,3 +207,34 @@ class Etiqueta(models.Model):
             reverse=True
         )
         return etiquetas_ordenadas[:limit]
+    
+    @api.model
+    def buscar_similares(self, texto, limit=20, umbral=0.3):
+        """
+        Búsqueda aproximada (tolerante a erratas) por similitud trigram.
+        Usa el índice GIN trigram del nombre y ordena por similitud.
+        
+        Args:
+            texto (str): Texto a buscar
+            limit (int): Máximo de etiquetas
+            umbral (float): Similitud mínima (0-1)
+        
+        Returns:
+            renaix.etiqueta: Etiquetas ordenadas de más a menos parecida
+        """
+        texto = self._normalize_name(texto)
+        if not texto:
+            return self.browse()
+        
+        self.flush_model(['name', 'active', 'producto_count'])
+        
+        cr = self.env.cr
+        # El operador % usa pg_trgm.similarity_threshold (solo para esta transacción)
+        cr.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", [str(umbral)])
+        cr.execute("""
+            SELECT id FROM renaix_etiqueta
+             WHERE active AND name %% %s
+             ORDER BY similarity(name, %s) DESC, producto_count DESC
+             LIMIT %s
+        """, [texto, texto, limit])
+        return self.browse([row[0] for row in cr.fetchall()])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Geocodificación local de ubicaciones (sin servicios externos)
+
+Traduce el texto libre de renaix.producto.ubicacion (ciudad y/o código
+postal) a coordenadas usando la tabla incluida en data/geo/localidades.csv.
+Los códigos postales se resuelven por provincia (dos primeros dígitos).
+"""
+
+import csv
+import re
+import unicodedata
+from odoo.tools import file_open
+
+_LOCALIDADES_PATH = 'renaix/data/geo/localidades.csv'
+
+_CP_RE = re.compile(r'\b(\d{5})\b')
+
+# Tabla cargada una sola vez por proceso: (por_nombre, por_prefijo_cp)
+_tabla = None
+
+
+def _normalizar(texto):
+    """Minúsculas, sin acentos ni signos de puntuación y con espacios simples"""
+    texto = unicodedata.normalize('NFKD', texto)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r"[^\w'\- ]+", ' ', texto.lower())
+    return ' '.join(texto.split())
+
+
+def _cargar_tabla():
+    global _tabla
+    if _tabla is None:
+        por_nombre = {}
+        por_cp = {}
+        with file_open(_LOCALIDADES_PATH) as f:
+            for fila in csv.DictReader(f):
+                coords = (float(fila['latitud']), float(fila['longitud']))
+                nombres = [fila['nombre']] + [a for a in fila['alias'].split('|') if a]
+                for nombre in nombres:
+                    por_nombre[_normalizar(nombre)] = coords
+                if fila['cp']:
+                    por_cp[fila['cp']] = coords
+        _tabla = (por_nombre, por_cp)
+    return _tabla
+
+
+def geocodificar(ubicacion):
+    """
+    Obtiene las coordenadas aproximadas de una ubicación en texto libre.
+
+    Prueba primero con el código postal (si lo hay), después con el texto
+    completo y por último con cada fragmento separado por comas o paréntesis
+    (ej: "Valencia, España" -> "valencia").
+
+    Args:
+        ubicacion (str): Texto de ubicación del producto
+
+    Returns:
+        tuple: (latitud, longitud) o None si no se reconoce
+    """
+    if not ubicacion:
+        return None
+
+    por_nombre, por_cp = _cargar_tabla()
+
+    cp = _CP_RE.search(ubicacion)
+    if cp and cp.group(1)[:2] in por_cp:
+        return por_cp[cp.group(1)[:2]]
+
+    texto = _normalizar(ubicacion)
+    if texto in por_nombre:
+        return por_nombre[texto]
+
+    for fragmento in re.split(r'[,()/;]', ubicacion):
+        fragmento = _normalizar(fragmento)
+        if fragmento in por_nombre:
+            return por_nombre[fragmento]
+
+    return None
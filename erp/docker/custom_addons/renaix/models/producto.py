@@ -2,6 +2,27 @@
 
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import sql, SQL
+from .db_utils import ensure_extension
+from .geocoding import geocodificar
+
+
+# Recalcula el vector de búsqueda: nombre (A), categoría y etiquetas (B), descripción (C)
+_SEARCH_VECTOR_UPDATE = """
+    UPDATE renaix_producto p
+       SET search_vector =
+               setweight(to_tsvector(%(config)s, coalesce(p.name, '')), 'A')
+            || setweight(to_tsvector(%(config)s, coalesce(c.name, '')), 'B')
+            || setweight(to_tsvector(%(config)s, coalesce((
+                   SELECT string_agg(e.name, ' ')
+                     FROM renaix_producto_etiqueta_rel r
+                     JOIN renaix_etiqueta e ON e.id = r.etiqueta_id
+                    WHERE r.producto_id = p.id
+               ), '')), 'B')
+            || setweight(to_tsvector(%(config)s, coalesce(p.descripcion, '')), 'C')
+      FROM renaix_categoria c
+     WHERE c.id = p.categoria_id
+"""
 
 
 class Producto(models.Model):
@@ -73,6 +94,23 @@ class Producto(models.Model):
         help='Ubicación del producto (ciudad, código postal, etc.)'
     )
     
+    # Coordenadas aproximadas (geocodificadas desde la ubicación con la tabla local)
+    latitud = fields.Float(
+        string='Latitud',
+        compute='_compute_coordenadas',
+        store=True,
+        readonly=False,
+        help='Latitud aproximada de la ubicación (0 si no se reconoce)'
+    )
+    
+    longitud = fields.Float(
+        string='Longitud',
+        compute='_compute_coordenadas',
+        store=True,
+        readonly=False,
+        help='Longitud aproximada de la ubicación (0 si no se reconoce)'
+    )
+    
     # Campos de fecha
     fecha_publicacion = fields.Datetime(
         string='Fecha de Publicación',
@@ -206,6 +244,97 @@ class Producto(models.Model):
         ('precio_positivo', 'CHECK(precio >= 0)', 'El precio debe ser mayor o igual a 0.'),
     ]
     
+    # Configuración de texto completo (español + unaccent) usada por search_vector
+    _search_ts_config = 'renaix_es'
+    
+    # Campos que alimentan el vector de búsqueda
+    _search_vector_fields = ('name', 'descripcion', 'categoria_id', 'etiqueta_ids')
+    
+    def init(self):
+        """Índices adicionales para los listados y la búsqueda de la API"""
+        cr = self.env.cr
+        
+        # Feed de productos disponibles en el orden del modelo: permite
+        # paginar por cursor ((fecha_publicacion, id) < cursor) con un index seek
+        sql.create_index(
+            cr, 'renaix_producto_feed_idx', self._table,
+            ['fecha_publicacion DESC', 'id DESC'],
+            where="active AND estado_venta = 'disponible'",
+        )
+        
+        # Búsqueda por cercanía: caja (bounding box) sobre latitud/longitud
+        sql.create_index(
+            cr, 'renaix_producto_geo_idx', self._table,
+            ['latitud', 'longitud'],
+            where="active AND estado_venta = 'disponible'",
+        )
+        
+        # Autocompletado por prefijo (lower(name) LIKE 'pre%') sobre los disponibles
+        sql.create_index(
+            cr, 'renaix_producto_name_prefix_idx', self._table,
+            ['lower(name) text_pattern_ops'],
+            where="active AND estado_venta = 'disponible'",
+        )
+        
+        # Búsqueda de texto completo: columna tsvector (fuera del ORM) + índice GIN
+        self._init_search_ts_config()
+        if not sql.column_exists(cr, self._table, 'search_vector'):
+            sql.create_column(cr, self._table, 'search_vector', 'tsvector')
+        sql.create_index(
+            cr, 'renaix_producto_search_vector_idx', self._table,
+            ['search_vector'], method='gin',
+        )
+        
+        # Rellenar los productos que aún no tienen vector (instalación/actualización)
+        cr.execute(
+            _SEARCH_VECTOR_UPDATE + ' AND p.search_vector IS NULL',
+            {'config': self._search_ts_config},
+        )
+        
+        # Índices trigram: filtros ilike por subcadena y búsqueda aproximada
+        if ensure_extension(cr, 'pg_trgm'):
+            sql.create_index(
+                cr, 'renaix_producto_name_trgm_idx', self._table,
+                ['name gin_trgm_ops'], method='gin',
+            )
+            sql.create_index(
+                cr, 'renaix_producto_ubicacion_trgm_idx', self._table,
+                ['ubicacion gin_trgm_ops'], method='gin',
+            )
+    
+    def _init_search_ts_config(self):
+        """Crea la configuración de texto completo en español (sin acentos si es posible)"""
+        cr = self.env.cr
+        
+        cr.execute('SELECT 1 FROM pg_ts_config WHERE cfgname = %s', [self._search_ts_config])
+        if cr.rowcount:
+            return
+        
+        config = SQL.identifier(self._search_ts_config)
+        cr.execute(SQL('CREATE TEXT SEARCH CONFIGURATION %s (COPY = pg_catalog.spanish)', config))
+        # Sin unaccent la búsqueda distinguirá acentos
+        if ensure_extension(cr, 'unaccent'):
+            cr.execute(SQL(
+                'ALTER TEXT SEARCH CONFIGURATION %s '
+                'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem',
+                config,
+            ))
+    
+    def _update_search_vector(self):
+        """Recalcula el vector de búsqueda de texto completo de los productos"""
+        if not self.ids:
+            return
+        
+        # El UPDATE lee de la BD: volcar antes los cambios pendientes del ORM
+        self.env['renaix.producto'].flush_model(self._search_vector_fields)
+        self.env['renaix.categoria'].flush_model(['name'])
+        self.env['renaix.etiqueta'].flush_model(['name'])
+        
+        self.env.cr.execute(
+            _SEARCH_VECTOR_UPDATE + ' AND p.id IN %(ids)s',
+            {'config': self._search_ts_config, 'ids': tuple(self.ids)},
+        )
+    
     @api.depends('comentario_ids', 'denuncia_ids')
     def _compute_estadisticas(self):
         """Calcula estadísticas del producto"""
@@ -213,6 +342,13 @@ class Producto(models.Model):
             producto.total_comentarios = len(producto.comentario_ids)
             producto.total_denuncias = len(producto.denuncia_ids)
     
+    @api.depends('ubicacion')
+    def _compute_coordenadas(self):
+        """Geocodifica la ubicación con la tabla local de localidades"""
+        for producto in self:
+            coordenadas = geocodificar(producto.ubicacion)
+            producto.latitud, producto.longitud = coordenadas or (0.0, 0.0)
+    
     @api.depends('imagen_ids')
     def _compute_total_imagenes(self):
         """Cuenta el total de imágenes"""
@@ -270,6 +406,8 @@ class Producto(models.Model):
             subject='Producto Creado'
         )
         
+        producto._update_search_vector()
+        
         return producto
     
     def write(self, vals):
@@ -291,7 +429,13 @@ class Producto(models.Model):
         if 'fecha_actualizacion' not in vals:
             vals['fecha_actualizacion'] = fields.Datetime.now()
         
-        return super(Producto, self).write(vals)
+        result = super(Producto, self).write(vals)
+        
+        # Mantener al día el vector de búsqueda de texto completo
+        if any(field in vals for field in self._search_vector_fields):
+            self._update_search_vector()
+        
+        return result
     
     def action_publicar(self):
         """Publica el producto (cambia estado a disponible)"""
@@ -19,6 +19,7 @@ class ProductoImagen(models.Model):
         string='Producto',
         required=True,
         ondelete='cascade',
+        index=True,
         help='Producto al que pertenece esta imagen'
     )
     
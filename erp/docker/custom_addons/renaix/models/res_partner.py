@@ -130,12 +130,14 @@ class ResPartner(models.Model):
         string='Mensajes Recibidos'
     )
     
-    # Token para API REST (opcional, para autenticación)
+    # Obsoleto: los refresh tokens se guardan (hasheados) en renaix.refresh.token
+    # y renaix_api vacía esta columna al actualizarse. Se mantiene solo para no
+    # romper las BD existentes; no se lee ni se escribe
     api_token = fields.Char(
-        string='API Token',
+        string='API Token (obsoleto)',
         copy=False,
         groups='base.group_system',
-        help='Token de autenticación para la API REST'
+        help='Obsoleto: sustituido por renaix.refresh.token'
     )
     
     # Campos para control de cuenta
@@ -29,7 +29,10 @@
     ],
     
     # Archivos del módulo
-    'data': [],  # No necesitamos vistas ni datos, solo API
+    'data': [
+        'security/ir.model.access.csv',
+        'data/cron_jobs.xml',
+    ],
     
     # Configuración
     'installable': True,
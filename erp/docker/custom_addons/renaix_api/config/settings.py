@@ -18,6 +18,27 @@ JWT_ALGORITHM = 'HS256'
 ACCESS_TOKEN_EXPIRATION_HOURS = 1      # Access token: 1 hora
 REFRESH_TOKEN_EXPIRATION_DAYS = 7      # Refresh token: 7 días
 
+# Sesiones por dispositivo (renaix.refresh.token): longitud máxima del nombre del
+# dispositivo y sesiones caducadas/revocadas borradas por ejecución del cron
+REFRESH_TOKEN_DEVICE_MAX_LENGTH = 100
+REFRESH_TOKEN_PURGE_BATCH_SIZE = 1000
+
+# Access tokens revocados (logout) borrados por ejecución del cron, ya caducados
+REVOKED_TOKEN_PURGE_BATCH_SIZE = 1000
+
+# Última actividad del usuario (fecha_ultima_actividad): se anota en memoria al
+# verificar el token y un temporizador del worker la guarda en bloque como mucho
+# ACTIVITY_FLUSH_INTERVAL_SECONDS después (y al cerrar el worker), solo si el
+# valor guardado tiene más de ACTIVITY_MIN_UPDATE_SECONDS. Si el worker muere de
+# golpe se pierde como mucho un intervalo
+ACTIVITY_FLUSH_INTERVAL_SECONDS = 60
+ACTIVITY_MIN_UPDATE_SECONDS = 60
+
+# Caché de access tokens ya verificados (por worker): evita decodificar el JWT y
+# consultar el usuario en cada petición. Cada entrada vale hasta que el token caduca
+TOKEN_CACHE_ENABLED = True
+TOKEN_CACHE_MAX_ENTRIES = 10000
+
 # ========================================
 # CONFIGURACIÓN DE PASSWORDS
 # ========================================
@@ -31,6 +52,24 @@ PASSWORD_REQUIRE_UPPERCASE = False
 # Requiere números (deshabilitado por simplicidad)
 PASSWORD_REQUIRE_NUMBERS = False
 
+# Algoritmo de hash: 'argon2id' (requiere argon2-cffi; si no está instalado se
+# usa PBKDF2) o 'pbkdf2'. Al cambiar algoritmo o coste, cada contraseña se
+# vuelve a hashear en el siguiente login correcto
+PASSWORD_HASH_ALGORITHM = 'argon2id'
+
+# Coste de argon2id (memory_cost en KiB): ~19 MiB, 2 pasadas
+PASSWORD_ARGON2_TIME_COST = 2
+PASSWORD_ARGON2_MEMORY_COST = 19456
+PASSWORD_ARGON2_PARALLELISM = 1
+
+# Iteraciones de PBKDF2-SHA256
+PASSWORD_PBKDF2_ITERATIONS = 600000
+
+# Hashes de contraseña simultáneos por worker y espera máxima por un hueco
+# (si se supera, la petición recibe 503 en lugar de bloquear el worker)
+PASSWORD_HASH_MAX_CONCURRENCY = 2
+PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS = 2
+
 # ========================================
 # CONFIGURACIÓN DE PAGINACIÓN
 # ========================================
@@ -41,6 +80,10 @@ DEFAULT_PAGE_SIZE = 20
 # Máximo de resultados por página
 MAX_PAGE_SIZE = 100
 
+# Listados completos sin paginar (compras, ventas, valoraciones, comentarios,
+# denuncias): se envían en streaming, serializando este número de filas cada vez
+STREAM_BATCH_SIZE = 200
+
 # ========================================
 # CONFIGURACIÓN CORS
 # ========================================
@@ -55,8 +98,109 @@ CORS_ORIGINS = '*'
 # CONFIGURACIÓN DE BÚSQUEDA
 # ========================================
 
-# Número máximo de productos en búsqueda
-MAX_SEARCH_RESULTS = 100
+# Hasta este número de resultados el total de una búsqueda es exacto.
+# Por encima se devuelve la estimación del planificador de PostgreSQL
+# (evita un count(*) completo en búsquedas muy amplias)
+SEARCH_EXACT_COUNT_THRESHOLD = 1000
+
+# Similitud mínima (0-1) de la búsqueda aproximada (?fuzzy=1) con pg_trgm
+SEARCH_FUZZY_THRESHOLD = 0.4
+
+# Radio por defecto y máximo (en km) de la búsqueda por cercanía (?lat=&lon=&radio_km=)
+GEO_DEFAULT_RADIUS_KM = 10
+GEO_MAX_RADIUS_KM = 200
+
+# Facetas disponibles en /productos/buscar (?facets=categoria,estado_producto,precio)
+SEARCH_FACETS = ['categoria', 'estado_producto', 'precio']
+
+# Límites de los rangos de precio de la faceta "precio" (en euros)
+# Ej: [50, 100] genera los rangos: 0-50, 50-100 y 100 o más
+SEARCH_PRICE_BUCKETS = [25, 50, 100, 250, 500, 1000]
+
+# Caché de objetos serializados (producto, propietario, categoría, etiqueta) por
+# worker, con clave (modelo, id, write_date): un cambio en el registro la invalida.
+# El TTL acota la antigüedad de contadores calculados que no mueven write_date
+SERIALIZED_CACHE_ENABLED = True
+SERIALIZED_CACHE_MAX_ENTRIES = 20000
+SERIALIZED_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 32 MB
+SERIALIZED_CACHE_TTL_SECONDS = 300
+
+# Autocompletado (/api/v1/autocompletar): sugerencias por tipo y longitud máxima del prefijo
+AUTOCOMPLETE_LIMIT = 5
+AUTOCOMPLETE_MAX_LENGTH = 50
+
+# Caché de resultados de búsqueda (ids por filtros + página, por worker).
+# Se invalida al modificar productos, imágenes, etiquetas o categorías.
+SEARCH_CACHE_ENABLED = True
+SEARCH_CACHE_MAX_ENTRIES = 512
+SEARCH_CACHE_TTL_SECONDS = 60
+
+# Búsquedas guardadas: máximo por usuario y avisos procesados por ejecución del cron
+SAVED_SEARCH_MAX_PER_USER = 20
+SAVED_SEARCH_NOTIFY_BATCH_SIZE = 500
+
+# ========================================
+# CONFIGURACIÓN DE COMPRESIÓN
+# ========================================
+
+# Comprimir las respuestas JSON si la app envía Accept-Encoding (gzip, y
+# brotli si está instalado: pip install brotli)
+COMPRESSION_ENABLED = True
+
+# Tamaño mínimo (en bytes) a partir del cual se comprime una respuesta
+COMPRESSION_MIN_BYTES = 1024
+
+# Nivel de compresión: gzip 1-9, brotli 0-11 (más alto = más CPU)
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Caché de respuestas comprimidas (por ETag), por worker
+COMPRESSION_CACHE_MAX_ENTRIES = 1000
+COMPRESSION_CACHE_MAX_BYTES = 16 * 1024 * 1024  # 16 MB
+
+# ========================================
+# CONFIGURACIÓN DE PETICIONES
+# ========================================
+
+# Tamaño máximo del body JSON, comprobado con Content-Length antes de leerlo
+API_MAX_BODY_BYTES = 64 * 1024  # 64 KB
+
+# Endpoints que reciben imágenes en base64 (una imagen de MAX_IMAGE_SIZE_MB
+# ocupa 4/3 en base64, más el resto del JSON)
+API_MAX_IMAGE_BODY_BYTES = 8 * 1024 * 1024  # 8 MB
+
+# Añadir la cabecera Server-Timing (duración de cada etapa del endpoint)
+SERVER_TIMING_ENABLED = True
+
+# ========================================
+# CONFIGURACIÓN DE LÍMITES DE PETICIONES
+# ========================================
+
+# Limitar login, registro, escrituras y subida de imágenes con un token bucket
+# por IP y por usuario (estado en Postgres, compartido por todos los workers).
+# Las peticiones rechazadas reciben 429 con Retry-After
+RATE_LIMIT_ENABLED = True
+
+# Por ruta y ámbito ('ip' o 'usuario'): (capacidad, periodo en segundos).
+# Se admiten ráfagas de hasta <capacidad> peticiones, que se recuperan en <periodo>.
+# En login, el usuario es el email recibido
+RATE_LIMITS = {
+    'login': {'ip': (20, 60), 'usuario': (5, 60)},
+    'register': {'ip': (5, 3600)},
+    'mensajes': {'ip': (60, 60), 'usuario': (30, 60)},
+    'comentarios': {'ip': (30, 60), 'usuario': (10, 60)},
+    'imagenes': {'ip': (30, 60), 'usuario': (20, 60)},
+}
+
+# ========================================
+# CONFIGURACIÓN DE MÉTRICAS
+# ========================================
+
+# Exponer /api/v1/metricas (estadísticas internas del worker). Desactivado por
+# defecto; si se activa, requiere el access token de uno de estos usuarios
+# (ids de res.partner)
+METRICS_ENABLED = False
+METRICS_PARTNER_IDS = ()
 
 # ========================================
 # CONFIGURACIÓN DE IMÁGENES
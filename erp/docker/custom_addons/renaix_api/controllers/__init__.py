@@ -10,3 +10,5 @@ from . import mensajes
 from . import denuncias
 from . import categorias
 from . import etiquetas
+from . import metricas
+from . import busquedas_guardadas
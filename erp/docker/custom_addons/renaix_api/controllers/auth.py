@@ -4,20 +4,24 @@ Controlador de Autenticación
 Endpoints: login, registro, refresh token, logout
 """
 
-import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, auth_helpers, validators, response_helpers, serializers
+from ..models.utils import jwt_utils, auth_helpers, validators, response_helpers, serializers, route_utils
 
 _logger = logging.getLogger(__name__)
 
 
 class AuthController(http.Controller):
     
+    def _dispositivo(self, data):
+        """Nombre del dispositivo de la sesión: el enviado por la app o su User-Agent."""
+        return data.get('dispositivo') or request.httprequest.headers.get('User-Agent')
+    
     @http.route('/api/v1/auth/register', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
-    def register(self, **params):
+    @route_utils.endpoint('auth.register', auth=False, schema=validators.REGISTRO_SCHEMA, rate_limit='register')
+    def register(self, data, **params):
         """
         Registro de nuevo usuario.
         
@@ -26,144 +30,104 @@ class AuthController(http.Controller):
             "name": "Juan Pérez",
             "email": "juan@example.com",
             "password": "password123",
-            "phone": "612345678"  # opcional
+            "phone": "612345678",  # opcional
+            "dispositivo": "Pixel 7"  # opcional (por defecto, el User-Agent)
         }
         
         Returns:
             JSON: {access_token, refresh_token, user}
         """
-        try:
-            # Obtener datos del body
-            data = json.loads(request.httprequest.data.decode('utf-8'))
-            
-            # Validar campos requeridos
-            required_fields = ['name', 'email', 'password']
-            is_valid, error_msg = validators.validate_required_fields(data, required_fields)
-            
-            if not is_valid:
-                return response_helpers.validation_error_response(error_msg)
-            
-            # Validar formato de email
-            if not auth_helpers.validate_email_format(data['email']):
-                return response_helpers.validation_error_response('Formato de email inválido')
-            
-            # Validar fortaleza de contraseña
-            is_valid, error_msg = auth_helpers.validate_password_strength(data['password'])
-            if not is_valid:
-                return response_helpers.validation_error_response(error_msg)
-            
-            # Validar teléfono (si se proporciona)
-            if data.get('phone') and not auth_helpers.validate_phone_number(data['phone']):
-                return response_helpers.validation_error_response('Formato de teléfono inválido')
-            
-            # Verificar que no existe un usuario con ese email
-            existing_user = request.env['res.partner'].sudo().search([
-                ('email', '=', data['email']),
-                ('es_usuario_app', '=', True)
-            ], limit=1)
-            
-            if existing_user:
-                return response_helpers.validation_error_response('Ya existe un usuario con este email')
-            
-            # Crear usuario
-            partner_vals = {
-                'name': data['name'],
-                'email': data['email'],
-                'phone': data.get('phone', ''),
-                'es_usuario_app': True,
-                'cuenta_activa': True,
-            }
-            
-            partner = request.env['res.partner'].sudo().create(partner_vals)
-            
-            # Establecer contraseña (hasheada)
-            partner.set_password(data['password'])
-            
-            # Generar tokens
-            access_token = jwt_utils.generate_access_token(partner)
-            refresh_token = jwt_utils.generate_refresh_token(partner)
-            
-            _logger.info(f'Nuevo usuario registrado: {partner.email} (ID: {partner.id})')
-            
-            return response_helpers.success_response(
-                data={
-                    'access_token': access_token,
-                    'refresh_token': refresh_token,
-                    'user': serializers.serialize_partner(partner, full=True)
-                },
-                message='Usuario registrado exitosamente',
-                status=201
-            )
-            
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
+        # Verificar que no existe un usuario con ese email
+        existing_user = request.env['res.partner'].sudo().search([
+            ('email', '=', data['email']),
+            ('es_usuario_app', '=', True)
+        ], limit=1)
         
-        except Exception as e:
-            _logger.error(f'Error en registro: {str(e)}')
-            return response_helpers.server_error_response(f'Error al registrar usuario: {str(e)}')
+        if existing_user:
+            return response_helpers.validation_error_response('Ya existe un usuario con este email')
+        
+        # Hashear la contraseña antes de crear nada: si el pool de hashing está
+        # saturado (PasswordHashBusy -> 503) no queda un usuario sin contraseña
+        password_hash = auth_helpers.hash_password(data['password'])
+        
+        # Crear usuario
+        partner_vals = {
+            'name': data['name'],
+            'email': data['email'],
+            'phone': data.get('phone', ''),
+            'es_usuario_app': True,
+            'cuenta_activa': True,
+            'password_hash': password_hash,
+        }
+        
+        partner = request.env['res.partner'].sudo().create(partner_vals)
+        
+        # Generar tokens
+        access_token = jwt_utils.generate_access_token(partner)
+        refresh_token = jwt_utils.generate_refresh_token(partner, self._dispositivo(data))
+        
+        _logger.info(f'Nuevo usuario registrado: {partner.email} (ID: {partner.id})')
+        
+        return response_helpers.success_response(
+            data={
+                'access_token': access_token,
+                'refresh_token': refresh_token,
+                'user': serializers.serialize_partner(partner, full=True)
+            },
+            message='Usuario registrado exitosamente',
+            status=201
+        )
     
     
     @http.route('/api/v1/auth/login', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
-    def login(self, **params):
+    @route_utils.endpoint('auth.login', auth=False, schema=validators.LOGIN_SCHEMA, rate_limit='login',
+                          rate_limit_key=lambda partner, data: data['email'].strip().lower())
+    def login(self, data, **params):
         """
         Login de usuario.
         
+        Límite de intentos por IP y por email, antes de verificar la contraseña.
+        
         Body JSON:
         {
             "email": "juan@example.com",
-            "password": "password123"
+            "password": "password123",
+            "dispositivo": "Pixel 7"  # opcional (por defecto, el User-Agent)
         }
         
         Returns:
             JSON: {access_token, refresh_token, user}
         """
-        try:
-            # Obtener datos del body
-            data = json.loads(request.httprequest.data.decode('utf-8'))
-            
-            # Validar campos requeridos
-            required_fields = ['email', 'password']
-            is_valid, error_msg = validators.validate_required_fields(data, required_fields)
-            
-            if not is_valid:
-                return response_helpers.validation_error_response(error_msg)
-            
-            # Autenticar usuario
-            partner = request.env['res.partner'].sudo().authenticate_app_user(
-                data['email'],
-                data['password']
-            )
-            
-            if not partner:
-                return response_helpers.unauthorized_response('Credenciales inválidas')
-            
-            # Generar tokens
-            access_token = jwt_utils.generate_access_token(partner)
-            refresh_token = jwt_utils.generate_refresh_token(partner)
-            
-            _logger.info(f'Login exitoso: {partner.email} (ID: {partner.id})')
-            
-            return response_helpers.success_response(
-                data={
-                    'access_token': access_token,
-                    'refresh_token': refresh_token,
-                    'user': serializers.serialize_partner(partner, full=True)
-                },
-                message='Login exitoso'
-            )
-            
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
+        # Autenticar usuario
+        partner = request.env['res.partner'].sudo().authenticate_app_user(
+            data['email'],
+            data['password']
+        )
         
-        except Exception as e:
-            _logger.error(f'Error en login: {str(e)}')
+        if not partner:
             return response_helpers.unauthorized_response('Credenciales inválidas')
+        
+        # Generar tokens
+        access_token = jwt_utils.generate_access_token(partner)
+        refresh_token = jwt_utils.generate_refresh_token(partner, self._dispositivo(data))
+        
+        _logger.info(f'Login exitoso: {partner.email} (ID: {partner.id})')
+        
+        return response_helpers.success_response(
+            data={
+                'access_token': access_token,
+                'refresh_token': refresh_token,
+                'user': serializers.serialize_partner(partner, full=True)
+            },
+            message='Login exitoso'
+        )
     
     
     @http.route('/api/v1/auth/refresh', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
-    def refresh_token(self, **params):
+    @route_utils.endpoint('auth.refresh', auth=False, schema=validators.REFRESH_SCHEMA)
+    def refresh_token(self, data, **params):
         """
         Renovar access token usando refresh token.
         
@@ -175,61 +139,51 @@ class AuthController(http.Controller):
         Returns:
             JSON: {access_token}
         """
+        # Verificar refresh token
         try:
-            # Obtener datos del body
-            data = json.loads(request.httprequest.data.decode('utf-8'))
-            
-            if not data.get('refresh_token'):
-                return response_helpers.validation_error_response('Refresh token requerido')
-            
-            # Verificar refresh token
             partner = jwt_utils.verify_refresh_token(data['refresh_token'])
-            
-            # Generar nuevo access token
-            access_token = jwt_utils.generate_access_token(partner)
-            
-            _logger.info(f'Token renovado para usuario: {partner.email}')
-            
-            return response_helpers.success_response(
-                data={
-                    'access_token': access_token
-                },
-                message='Token renovado exitosamente'
-            )
-            
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
-        
         except Exception as e:
             _logger.warning(f'Error al renovar token: {str(e)}')
             return response_helpers.unauthorized_response(str(e))
+        
+        # Generar nuevo access token
+        access_token = jwt_utils.generate_access_token(partner)
+        
+        _logger.info(f'Token renovado para usuario: {partner.email}')
+        
+        return response_helpers.success_response(
+            data={
+                'access_token': access_token
+            },
+            message='Token renovado exitosamente'
+        )
     
     
     @http.route('/api/v1/auth/logout', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
-    def logout(self, **params):
+    @route_utils.endpoint('auth.logout', schema=validators.LOGOUT_SCHEMA, body='opcional')
+    def logout(self, partner, data, **params):
         """
-        Logout de usuario (invalida refresh token).
+        Logout de usuario (invalida refresh token y access token).
         
         Headers:
             Authorization: Bearer <access_token>
         
+        Body JSON (opcional):
+        {
+            "refresh_token": "eyJ0eXAiOiJKV1QiLCJhbGc..."  # cierra solo este dispositivo
+        }
+        Sin refresh_token se cierran las sesiones de todos los dispositivos.
+        
         Returns:
             JSON: {message}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            # Revocar refresh token
-            jwt_utils.revoke_refresh_token(partner)
-            
-            _logger.info(f'Logout exitoso: {partner.email}')
-            
-            return response_helpers.success_response(
-                message='Logout exitoso'
-            )
-            
-        except Exception as e:
-            _logger.warning(f'Error en logout: {str(e)}')
-            return response_helpers.unauthorized_response(str(e))
+        # Revocar refresh token (del dispositivo o de todos) y el access token actual
+        jwt_utils.revoke_refresh_token(partner, data.get('refresh_token'))
+        jwt_utils.revoke_access_token(request, partner)
+        
+        _logger.info(f'Logout exitoso: {partner.email}')
+        
+        return response_helpers.success_response(
+            message='Logout exitoso'
+        )
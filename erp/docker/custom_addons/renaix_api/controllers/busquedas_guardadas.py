@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Controlador de Búsquedas Guardadas
+Endpoints: listar, crear, eliminar, avisos (productos nuevos que coinciden)
+"""
+
+import logging
+from odoo import http
+from odoo.http import request
+from ..models.utils import validators, response_helpers, serializers, route_utils
+from ..config import settings
+
+_logger = logging.getLogger(__name__)
+
+class BusquedasGuardadasController(http.Controller):
+
+    @http.route('/api/v1/busquedas-guardadas', type='http', auth='public', methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('busquedas_guardadas.listar_busquedas')
+    def listar_busquedas(self, partner, **params):
+        busquedas = request.env['renaix.busqueda.guardada'].sudo().search([('partner_id', '=', partner.id)])
+
+        busquedas_data = [serializers.serialize_busqueda_guardada(b) for b in busquedas]
+
+        return response_helpers.success_response(data=busquedas_data, message='Búsquedas guardadas recuperadas')
+
+    @http.route('/api/v1/busquedas-guardadas', type='http', auth='public', methods=['POST'], csrf=False, cors='*')
+    @route_utils.endpoint('busquedas_guardadas.crear_busqueda', schema=validators.BUSQUEDA_GUARDADA_SCHEMA)
+    def crear_busqueda(self, partner, data, **params):
+        """
+        Guardar una búsqueda para recibir avisos de productos nuevos.
+
+        Body JSON:
+        {
+            "nombre": "iPhone barato",
+            "filtros": {"query": "iphone", "precio_max": 300}  # mismos filtros que /productos/buscar
+        }
+
+        Returns:
+            JSON: {busqueda}
+        """
+        BusquedaGuardada = request.env['renaix.busqueda.guardada'].sudo()
+        if BusquedaGuardada.search_count([('partner_id', '=', partner.id)]) >= settings.SAVED_SEARCH_MAX_PER_USER:
+            return response_helpers.validation_error_response(
+                f'Máximo {settings.SAVED_SEARCH_MAX_PER_USER} búsquedas guardadas'
+            )
+
+        filtros = validators.validate_search_filters(data['filtros'])
+
+        # El índice inverso referencia la categoría y las etiquetas: deben existir
+        if filtros.get('categoria_id') and not request.env['renaix.categoria'].sudo().browse(filtros['categoria_id']).exists():
+            return response_helpers.validation_error_response('Categoría no encontrada')
+
+        etiquetas = request.env['renaix.etiqueta'].sudo().browse(list(set(filtros.get('etiquetas', []))))
+        if len(etiquetas.exists()) != len(etiquetas):
+            return response_helpers.validation_error_response('Etiqueta no encontrada')
+
+        busqueda = BusquedaGuardada.create({
+            'name': data['nombre'],
+            'partner_id': partner.id,
+            'filtros': filtros,
+        })
+
+        return response_helpers.success_response(
+            data=serializers.serialize_busqueda_guardada(busqueda),
+            message='Búsqueda guardada',
+            status=201
+        )
+
+    @http.route('/api/v1/busquedas-guardadas/<int:busqueda_id>', type='http', auth='public', methods=['DELETE'], csrf=False, cors='*')
+    @route_utils.endpoint('busquedas_guardadas.eliminar_busqueda')
+    def eliminar_busqueda(self, busqueda_id, partner, **params):
+        busqueda = request.env['renaix.busqueda.guardada'].sudo().browse(busqueda_id)
+
+        if not busqueda.exists():
+            return response_helpers.not_found_response('Búsqueda no encontrada')
+
+        if busqueda.partner_id.id != partner.id:
+            return response_helpers.forbidden_response('No tienes permiso')
+
+        busqueda.unlink()
+
+        return response_helpers.success_response(message='Búsqueda eliminada')
+
+    @http.route('/api/v1/busquedas-guardadas/avisos', type='http', auth='public', methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('busquedas_guardadas.listar_avisos')
+    def listar_avisos(self, partner, **params):
+        """
+        Productos nuevos que coinciden con mis búsquedas guardadas (no leídos).
+        No modifica nada: la app los marca como leídos con
+        PUT /api/v1/busquedas-guardadas/avisos/marcar-leidos.
+
+        Returns:
+            JSON: [{id, busqueda_id, busqueda_nombre, fecha_notificacion, producto}]
+        """
+        avisos = request.env['renaix.busqueda.guardada.coincidencia'].sudo().search([
+            ('partner_id', '=', partner.id),
+            ('estado', '=', 'notificada'),
+            ('leida', '=', False),
+            ('producto_id.active', '=', True),
+            ('producto_id.estado_venta', '=', 'disponible'),
+        ], limit=settings.MAX_PAGE_SIZE)
+
+        avisos_data = [serializers.serialize_aviso_busqueda(a) for a in avisos]
+
+        return response_helpers.success_response(data=avisos_data, message='Avisos recuperados')
+
+    @http.route('/api/v1/busquedas-guardadas/avisos/marcar-leidos', type='http', auth='public', methods=['PUT'], csrf=False, cors='*')
+    @route_utils.endpoint('busquedas_guardadas.marcar_avisos_leidos', schema=validators.AVISOS_LEIDOS_SCHEMA,
+                          body='opcional')
+    def marcar_avisos_leidos(self, partner, data, **params):
+        """
+        Marcar avisos como leídos.
+
+        Body JSON (opcional):
+        {
+            "ids": [12, 13]  # avisos a marcar; sin ids, todos los no leídos
+        }
+
+        Returns:
+            JSON: {marcados}
+        """
+        domain = [
+            ('partner_id', '=', partner.id),
+            ('estado', '=', 'notificada'),
+            ('leida', '=', False),
+        ]
+        if 'ids' in data:
+            domain.append(('id', 'in', data['ids']))
+
+        avisos = request.env['renaix.busqueda.guardada.coincidencia'].sudo().search(domain)
+        avisos.write({'leida': True})
+
+        return response_helpers.success_response(data={'marcados': len(avisos)}, message='Avisos marcados como leídos')
@@ -4,19 +4,22 @@
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import response_helpers, serializers
+from ..models.utils import response_helpers, serializers, etag_utils, route_utils
 
 _logger = logging.getLogger(__name__)
 
 class CategoriasController(http.Controller):
     
     @http.route('/api/v1/categorias', type='http', auth='none', methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('categorias.listar_categorias', auth=False)
     def listar_categorias(self, **params):
-        try:
-            categorias = request.env['renaix.categoria'].sudo().search([], order='name ASC')
-            categorias_data = [serializers.serialize_categoria(c) for c in categorias]
+        Categoria = request.env['renaix.categoria'].sudo()
 
-            return response_helpers.success_response(data=categorias_data, message='Categorías recuperadas')
-        except Exception as e:
-            _logger.error(f'Error: {str(e)}')
-            return response_helpers.server_error_response(str(e))
\ No newline at end of file
+        etag = etag_utils.collection_etag(Categoria)
+        if etag_utils.is_not_modified('categorias', etag):
+            return etag_utils.not_modified_response(etag)
+
+        categorias = Categoria.search([], order='name ASC')
+        categorias_data = [serializers.serialize_categoria(c) for c in categorias]
+
+        return response_helpers.success_response(data=categorias_data, message='Categorías recuperadas', etag=etag)
\ No newline at end of file
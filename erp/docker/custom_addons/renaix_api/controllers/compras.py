@@ -4,11 +4,10 @@ Controlador de Compras
 Endpoints: crear compra, detalle, confirmar, completar, cancelar
 """
 
-import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, response_helpers, serializers
+from ..models.utils import validators, response_helpers, serializers, route_utils
 
 _logger = logging.getLogger(__name__)
 
@@ -17,7 +16,8 @@ class ComprasController(http.Controller):
     
     @http.route('/api/v1/compras', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
-    def crear_compra(self, **params):
+    @route_utils.endpoint('compras.crear_compra', schema=validators.COMPRA_SCHEMA)
+    def crear_compra(self, partner, data, **params):
         """
         Comprar un producto.
         
@@ -30,157 +30,126 @@ class ComprasController(http.Controller):
         Returns:
             JSON: {compra}
         """
-        try:
-            partner = jwt_utils.verify_token(request)
-            data = json.loads(request.httprequest.data.decode('utf-8'))
+        producto = request.env['renaix.producto'].sudo().browse(data['producto_id'])
 
-            if not data.get('producto_id'):
-                return response_helpers.validation_error_response('producto_id requerido')
+        if not producto.exists():
+            return response_helpers.not_found_response('Producto no encontrado')
 
-            producto = request.env['renaix.producto'].sudo().browse(data['producto_id'])
+        if producto.estado_venta != 'disponible':
+            return response_helpers.validation_error_response('Producto no disponible')
 
-            if not producto.exists():
-                return response_helpers.not_found_response('Producto no encontrado')
+        if producto.propietario_id.id == partner.id:
+            return response_helpers.validation_error_response('No puedes comprar tu propio producto')
 
-            if producto.estado_venta != 'disponible':
-                return response_helpers.validation_error_response('Producto no disponible')
-
-            if producto.propietario_id.id == partner.id:
-                return response_helpers.validation_error_response('No puedes comprar tu propio producto')
-
-            compra_vals = {
-                'producto_id': producto.id,
-                'comprador_id': partner.id,
-                'precio_final': producto.precio,
-                'notas': data.get('notas', ''),
-            }
-
-            # Usamos savepoint para que un fallo del ORM no deje la transacción
-            # en estado abortado, lo que causaría una respuesta HTML en vez de JSON
-            with request.env.cr.savepoint():
-                compra = request.env['renaix.compra'].sudo().create(compra_vals)
+        compra_vals = {
+            'producto_id': producto.id,
+            'comprador_id': partner.id,
+            'precio_final': producto.precio,
+            'notas': data.get('notas', ''),
+        }
 
-            _logger.info(f'Compra creada: {compra.id}')
+        # Usamos savepoint para que un fallo del ORM no deje la transacción
+        # en estado abortado, lo que causaría una respuesta HTML en vez de JSON
+        with request.env.cr.savepoint():
+            compra = request.env['renaix.compra'].sudo().create(compra_vals)
 
-            return response_helpers.success_response(
-                data=serializers.serialize_compra(compra),
-                message='Compra creada exitosamente',
-                status=201
-            )
+        _logger.info(f'Compra creada: {compra.id}')
 
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
-        except Exception as e:
-            _logger.error(f'Error al crear compra: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        return response_helpers.success_response(
+            data=serializers.serialize_compra(compra),
+            message='Compra creada exitosamente',
+            status=201
+        )
     
     
     @http.route('/api/v1/compras/<int:compra_id>', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
-    def detalle_compra(self, compra_id, **params):
+    @route_utils.endpoint('compras.detalle_compra')
+    def detalle_compra(self, compra_id, partner, **params):
         """Obtener detalle de una compra."""
-        try:
-            partner = jwt_utils.verify_token(request)
-            compra = request.env['renaix.compra'].sudo().browse(compra_id)
-            
-            if not compra.exists():
-                return response_helpers.not_found_response('Compra no encontrada')
-            
-            if compra.comprador_id.id != partner.id and compra.vendedor_id.id != partner.id:
-                return response_helpers.forbidden_response('No tienes permiso')
-            
-            return response_helpers.success_response(
-                data=serializers.serialize_compra(compra, include_valoraciones=True),
-                message='Compra encontrada'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        compra = request.env['renaix.compra'].sudo().browse(compra_id)
+        
+        if not compra.exists():
+            return response_helpers.not_found_response('Compra no encontrada')
+        
+        if compra.comprador_id.id != partner.id and compra.vendedor_id.id != partner.id:
+            return response_helpers.forbidden_response('No tienes permiso')
+        
+        return response_helpers.success_response(
+            data=serializers.serialize_compra(
+                compra, include_valoraciones=True, **validators.validate_fieldsets(params)
+            ),
+            message='Compra encontrada'
+        )
     
     
     @http.route('/api/v1/compras/<int:compra_id>/confirmar', type='http', auth='public',
                 methods=['POST'], csrf=False, cors='*')
-    def confirmar_compra(self, compra_id, **params):
+    @route_utils.endpoint('compras.confirmar_compra')
+    def confirmar_compra(self, compra_id, partner, **params):
         """Confirmar compra (vendedor)."""
-        try:
-            partner = jwt_utils.verify_token(request)
-            compra = request.env['renaix.compra'].sudo().browse(compra_id)
-
-            if not compra.exists():
-                return response_helpers.not_found_response('Compra no encontrada')
+        compra = request.env['renaix.compra'].sudo().browse(compra_id)
 
-            if compra.vendedor_id.id != partner.id:
-                return response_helpers.forbidden_response('Solo el vendedor puede confirmar')
+        if not compra.exists():
+            return response_helpers.not_found_response('Compra no encontrada')
 
-            if compra.estado != 'pendiente':
-                return response_helpers.validation_error_response('La compra no está en estado pendiente')
+        if compra.vendedor_id.id != partner.id:
+            return response_helpers.forbidden_response('Solo el vendedor puede confirmar')
 
-            compra.sudo().action_confirmar()
+        if compra.estado != 'pendiente':
+            return response_helpers.validation_error_response('La compra no está en estado pendiente')
 
-            return response_helpers.success_response(
-                data=serializers.serialize_compra(compra),
-                message='Compra confirmada'
-            )
+        compra.sudo().action_confirmar()
 
-        except Exception as e:
-            _logger.error(f'Error: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        return response_helpers.success_response(
+            data=serializers.serialize_compra(compra),
+            message='Compra confirmada'
+        )
     
     
     @http.route('/api/v1/compras/<int:compra_id>/completar', type='http', auth='public',
                 methods=['POST'], csrf=False, cors='*')
-    def completar_compra(self, compra_id, **params):
+    @route_utils.endpoint('compras.completar_compra')
+    def completar_compra(self, compra_id, partner, **params):
         """Completar compra (comprador confirma recepción)."""
-        try:
-            partner = jwt_utils.verify_token(request)
-            compra = request.env['renaix.compra'].sudo().browse(compra_id)
+        compra = request.env['renaix.compra'].sudo().browse(compra_id)
 
-            if not compra.exists():
-                return response_helpers.not_found_response('Compra no encontrada')
+        if not compra.exists():
+            return response_helpers.not_found_response('Compra no encontrada')
 
-            if compra.comprador_id.id != partner.id:
-                return response_helpers.forbidden_response('Solo el comprador puede completar')
+        if compra.comprador_id.id != partner.id:
+            return response_helpers.forbidden_response('Solo el comprador puede completar')
 
-            if compra.estado != 'confirmada':
-                return response_helpers.validation_error_response('La compra debe estar confirmada primero')
+        if compra.estado != 'confirmada':
+            return response_helpers.validation_error_response('La compra debe estar confirmada primero')
 
-            compra.sudo().action_completar()
+        compra.sudo().action_completar()
 
-            return response_helpers.success_response(
-                data=serializers.serialize_compra(compra),
-                message='Compra completada'
-            )
-
-        except Exception as e:
-            _logger.error(f'Error: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        return response_helpers.success_response(
+            data=serializers.serialize_compra(compra),
+            message='Compra completada'
+        )
     
     
     @http.route('/api/v1/compras/<int:compra_id>/cancelar', type='http', auth='public',
                 methods=['POST'], csrf=False, cors='*')
-    def cancelar_compra(self, compra_id, **params):
+    @route_utils.endpoint('compras.cancelar_compra')
+    def cancelar_compra(self, compra_id, partner, **params):
         """Cancelar compra."""
-        try:
-            partner = jwt_utils.verify_token(request)
-            compra = request.env['renaix.compra'].sudo().browse(compra_id)
-
-            if not compra.exists():
-                return response_helpers.not_found_response('Compra no encontrada')
+        compra = request.env['renaix.compra'].sudo().browse(compra_id)
 
-            if compra.comprador_id.id != partner.id and compra.vendedor_id.id != partner.id:
-                return response_helpers.forbidden_response('No tienes permiso')
+        if not compra.exists():
+            return response_helpers.not_found_response('Compra no encontrada')
 
-            if compra.estado == 'completada':
-                return response_helpers.validation_error_response('No se puede cancelar una compra completada')
+        if compra.comprador_id.id != partner.id and compra.vendedor_id.id != partner.id:
+            return response_helpers.forbidden_response('No tienes permiso')
 
-            compra.sudo().action_cancelar()
+        if compra.estado == 'completada':
+            return response_helpers.validation_error_response('No se puede cancelar una compra completada')
 
-            return response_helpers.success_response(
-                data=serializers.serialize_compra(compra),
-                message='Compra cancelada'
-            )
+        compra.sudo().action_cancelar()
 
-        except Exception as e:
-            _logger.error(f'Error: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        return response_helpers.success_response(
+            data=serializers.serialize_compra(compra),
+            message='Compra cancelada'
+        )
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Controlador de Métricas (estadísticas internas del worker)"""
+
+import logging
+from odoo import http
+from ..models.utils import jwt_utils, response_helpers, cache_utils, serializers, json_utils, etag_utils, compression_utils, activity_utils, revocation_utils, rate_limit_utils, route_utils
+from ..config import settings
+
+_logger = logging.getLogger(__name__)
+
+class MetricasController(http.Controller):
+    
+    @http.route('/api/v1/metricas', type='http', auth='public', methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('metricas.obtener_metricas')
+    def obtener_metricas(self, partner, **params):
+        """
+        Estadísticas de las cachés del worker que atiende la petición.
+        Solo para los usuarios de METRICS_PARTNER_IDS.
+        
+        Returns:
+            JSON: {json_encoder, endpoints: {endpoint: {etapa: {peticiones, media_ms, max_ms}}}, actividad: {pendientes, volcados}, tokens_revocados: {revocados, errores}, limites: {ruta: {permitidas, rechazadas}}, etags: {endpoint: {hits, misses, hit_ratio}}, caches: {busquedas|serializados|comprimidos|tokens: {entries, bytes, hits, misses, hit_ratio...}}}
+        """
+        if not settings.METRICS_ENABLED:
+            return response_helpers.not_found_response('Recurso no encontrado')
+        
+        if partner.id not in settings.METRICS_PARTNER_IDS:
+            return response_helpers.forbidden_response('No tienes permiso')
+        
+        metricas = {
+            'json_encoder': json_utils.encoder_name(),
+            'endpoints': route_utils.endpoint_stats.stats(),
+            'etags': etag_utils.etag_stats.stats(),
+            'actividad': activity_utils.activity_tracker.stats(),
+            'tokens_revocados': revocation_utils.revocation_filter.stats(),
+            'limites': rate_limit_utils.rate_limiter.stats(),
+            'caches': {
+                cache_utils.search_cache.name: cache_utils.search_cache.stats(),
+                serializers.serialized_cache.name: serializers.serialized_cache.stats(),
+                compression_utils.compressed_cache.name: compression_utils.compressed_cache.stats(),
+                jwt_utils.token_cache.name: jwt_utils.token_cache.stats(),
+            }
+        }
+        return response_helpers.success_response(data=metricas, message='Métricas recuperadas')
@@ -1,15 +1,14 @@
 # -*- coding: utf-8 -*-
 """
 Controlador de Productos
-Endpoints: listar, detalle, crear, actualizar, eliminar, buscar, publicar, imágenes
+Endpoints: listar, detalle, crear, actualizar, eliminar, buscar, autocompletar, publicar, imágenes
 """
 
-import json
 import logging
 import base64
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, validators, response_helpers, serializers
+from ..models.utils import validators, response_helpers, serializers, search_helpers, cache_utils, etag_utils, route_utils
 from ..config import settings
 
 _logger = logging.getLogger(__name__)
@@ -19,6 +18,7 @@ class ProductosController(http.Controller):
     
     @http.route('/api/v1/productos', type='http', auth='none', 
                 methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('productos.listar_productos', auth=False)
     def listar_productos(self, **params):
         """
         Listar productos disponibles (público).
@@ -26,54 +26,108 @@ class ProductosController(http.Controller):
         Query params:
             page: Número de página (default: 1)
             limit: Elementos por página (default: 20)
+            cursor: Cursor de paginación keyset (vacío = primera página).
+                    Si se envía, se ignora `page` y se devuelve `next_cursor`
             estado_venta: filtrar por estado (disponible, reservado, vendido)
+            fields: Campos a devolver, separados por coma (ej: id,nombre,precio)
+            expand: Relaciones a incluir como objeto (propietario, categoria, etiquetas, imagenes)
+            vista: tarjeta para el formato compacto de listados (miniatura + vendedor)
         
         Returns:
             JSON: {productos} (paginado)
         """
-        try:
-            # Parámetros de paginación
-            page, limit = validators.validate_pagination_params(
-                params.get('page'),
-                params.get('limit')
+        # Parámetros de paginación
+        page, limit = validators.validate_pagination_params(
+            params.get('page'),
+            params.get('limit')
+        )
+        
+        # Respuesta parcial (?fields=, ?expand=) o tarjeta (?vista=tarjeta)
+        fieldsets = validators.validate_fieldsets(params)
+        vista = validators.validate_vista(params)
+        
+        # Construir dominio de búsqueda
+        domain = [('active', '=', True)]
+        
+        # Filtrar por estado de venta si se proporciona
+        if params.get('estado_venta'):
+            domain.append(('estado_venta', '=', params.get('estado_venta')))
+        else:
+            # Por defecto, solo productos disponibles
+            domain.append(('estado_venta', '=', 'disponible'))
+        
+        Producto = request.env['renaix.producto'].sudo()
+        
+        # Modo cursor: la página 500 cuesta lo mismo que la primera
+        if 'cursor' in params:
+            cursor = None
+            if params.get('cursor'):
+                cursor = search_helpers.decode_cursor(params['cursor'])
+                if not cursor:
+                    return response_helpers.validation_error_response('Cursor inválido')
+            
+            def _buscar_cursor():
+                productos, next_cursor = search_helpers.search_keyset(Producto, domain, cursor, limit)
+                return {'ids': productos.ids, 'next_cursor': next_cursor}
+            
+            resultado = cache_utils.cached_search(
+                request.env.cr, ('listar', 'cursor', domain, params.get('cursor'), limit), _buscar_cursor
             )
+            productos_pagina = Producto.browse(resultado['ids'])
             
-            # Construir dominio de búsqueda
-            domain = [('active', '=', True)]
+            # 304 si la app ya tiene esta página (antes de serializar)
+            etag = etag_utils.productos_etag(productos_pagina, resultado['next_cursor'])
+            if etag_utils.is_not_modified('productos', etag):
+                return etag_utils.not_modified_response(etag)
             
-            # Filtrar por estado de venta si se proporciona
-            if params.get('estado_venta'):
-                domain.append(('estado_venta', '=', params.get('estado_venta')))
-            else:
-                # Por defecto, solo productos disponibles
-                domain.append(('estado_venta', '=', 'disponible'))
+            productos_data = serializers.serialize_productos(productos_pagina, include_images=True, vista=vista, **fieldsets)
             
-            # Buscar productos
-            Producto = request.env['renaix.producto'].sudo()
-            productos = Producto.search(domain, order='fecha_publicacion DESC')
-            
-            total = len(productos)
-            offset = (page - 1) * limit
-            productos_pagina = productos[offset:offset + limit]
-            
-            # Serializar
-            productos_data = [serializers.serialize_producto(p, include_images=True) for p in productos_pagina]
-            
-            return response_helpers.paginated_response(
+            return response_helpers.cursor_paginated_response(
                 items=productos_data,
-                total=total,
-                page=page,
+                next_cursor=resultado['next_cursor'],
                 limit=limit,
-                message='Productos recuperados'
+                message='Productos recuperados',
+                etag=etag
             )
-            
-        except Exception as e:
-            _logger.error(f'Error al listar productos: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        
+        # Buscar productos (ids de la página + total, cacheados)
+        offset = (page - 1) * limit
+        
+        def _buscar_pagina():
+            return {
+                'total': Producto.search_count(domain),
+                'ids': Producto.search(
+                    domain, order='fecha_publicacion DESC, id DESC', limit=limit, offset=offset
+                ).ids,
+            }
+        
+        resultado = cache_utils.cached_search(
+            request.env.cr, ('listar', 'page', domain, page, limit), _buscar_pagina
+        )
+        total = resultado['total']
+        productos_pagina = Producto.browse(resultado['ids'])
+        
+        # 304 si la app ya tiene esta página (antes de serializar)
+        etag = etag_utils.productos_etag(productos_pagina, total)
+        if etag_utils.is_not_modified('productos', etag):
+            return etag_utils.not_modified_response(etag)
+        
+        # Serializar
+        productos_data = serializers.serialize_productos(productos_pagina, include_images=True, vista=vista, **fieldsets)
+        
+        return response_helpers.paginated_response(
+            items=productos_data,
+            total=total,
+            page=page,
+            limit=limit,
+            message='Productos recuperados',
+            etag=etag
+        )
     
     
     @http.route('/api/v1/productos/<int:producto_id>', type='http', auth='none', 
                 methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('productos.detalle_producto', auth=False)
     def detalle_producto(self, producto_id, **params):
         """
         Obtener detalle de un producto (público).
@@ -81,34 +135,42 @@ class ProductosController(http.Controller):
         Returns:
             JSON: {producto}
         """
-        try:
-            # Buscar producto
-            producto = request.env['renaix.producto'].sudo().browse(producto_id)
-            
-            if not producto.exists():
-                return response_helpers.not_found_response('Producto no encontrado')
-            
-            # Serializar con comentarios
-            producto_data = serializers.serialize_producto(
-                producto, 
-                include_images=True, 
-                include_comentarios=True,
-                include_propietario_full=True
-            )
-            
-            return response_helpers.success_response(
-                data=producto_data,
-                message='Producto encontrado'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al obtener producto: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Buscar producto
+        producto = request.env['renaix.producto'].sudo().browse(producto_id)
+        
+        if not producto.exists():
+            return response_helpers.not_found_response('Producto no encontrado')
+        
+        # 304 si la app ya tiene esta versión (producto, propietario,
+        # categoría, imágenes/etiquetas y comentarios)
+        comentarios_etag = etag_utils.collection_etag(
+            request.env['renaix.comentario'].sudo(),
+            [('producto_id', '=', producto.id), ('active', '=', True)]
+        )
+        etag = etag_utils.productos_etag(producto, comentarios_etag)
+        if etag_utils.is_not_modified('producto', etag):
+            return etag_utils.not_modified_response(etag)
+        
+        # Serializar con comentarios
+        producto_data = serializers.serialize_producto(
+            producto, 
+            include_images=True, 
+            include_comentarios=True,
+            include_propietario_full=True,
+            **validators.validate_fieldsets(params)
+        )
+        
+        return response_helpers.success_response(
+            data=producto_data,
+            message='Producto encontrado',
+            etag=etag
+        )
     
     
     @http.route('/api/v1/productos', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
-    def crear_producto(self, **params):
+    @route_utils.endpoint('productos.crear_producto', schema=validators.PRODUCTO_SCHEMA)
+    def crear_producto(self, partner, data, **params):
         """
         Crear nuevo producto (requiere autenticación).
         
@@ -127,78 +189,60 @@ class ProductosController(http.Controller):
         Returns:
             JSON: {producto}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            # Obtener datos
-            data = json.loads(request.httprequest.data.decode('utf-8'))
-            
-            # Validar datos
-            is_valid, error_msg = validators.validate_producto_data(data)
-            if not is_valid:
-                return response_helpers.validation_error_response(error_msg)
-            
-            # Verificar que la categoría existe
-            categoria = request.env['renaix.categoria'].sudo().browse(data['categoria_id'])
-            if not categoria.exists():
-                return response_helpers.validation_error_response('Categoría no encontrada')
-            
-            # Preparar valores
-            producto_vals = {
-                'name': data['nombre'],
-                'descripcion': data.get('descripcion', ''),
-                'precio': data['precio'],
-                'propietario_id': partner.id,
-                'categoria_id': data['categoria_id'],
-                'estado_producto': data.get('estado_producto', 'usado'),
-                'antiguedad': data.get('antiguedad', ''),
-                'ubicacion': data.get('ubicacion', ''),
-                'estado_venta': 'borrador',  # Inicialmente en borrador
-            }
-            
-            # Crear producto
-            producto = request.env['renaix.producto'].sudo().create(producto_vals)
-
-            # Añadir etiquetas si se proporcionan (por IDs o por nombres)
-            etiqueta_ids = list(data.get('etiqueta_ids', []))
-
-            if data.get('etiqueta_nombres'):
-                Etiqueta = request.env['renaix.etiqueta'].sudo()
-                for nombre in data['etiqueta_nombres']:
-                    nombre = nombre.strip()
-                    if not nombre:
-                        continue
-                    existing = Etiqueta.search([('name', '=ilike', nombre.lower())], limit=1)
-                    if existing:
-                        if existing.id not in etiqueta_ids:
-                            etiqueta_ids.append(existing.id)
-                    else:
-                        nueva = Etiqueta.create({'name': nombre})
-                        etiqueta_ids.append(nueva.id)
-
-            if etiqueta_ids:
-                producto.sudo().write({'etiqueta_ids': [(6, 0, etiqueta_ids)]})
-            
-            _logger.info(f'Producto creado: {producto.id} por usuario {partner.id}')
-            
-            return response_helpers.success_response(
-                data=serializers.serialize_producto(producto, include_images=True),
-                message='Producto creado exitosamente',
-                status=201
-            )
-            
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
+        # Verificar que la categoría existe
+        categoria = request.env['renaix.categoria'].sudo().browse(data['categoria_id'])
+        if not categoria.exists():
+            return response_helpers.validation_error_response('Categoría no encontrada')
         
-        except Exception as e:
-            _logger.error(f'Error al crear producto: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Preparar valores
+        producto_vals = {
+            'name': data['nombre'],
+            'descripcion': data.get('descripcion', ''),
+            'precio': data['precio'],
+            'propietario_id': partner.id,
+            'categoria_id': data['categoria_id'],
+            'estado_producto': data.get('estado_producto', 'usado'),
+            'antiguedad': data.get('antiguedad', ''),
+            'ubicacion': data.get('ubicacion', ''),
+            'estado_venta': 'borrador',  # Inicialmente en borrador
+        }
+        
+        # Crear producto
+        producto = request.env['renaix.producto'].sudo().create(producto_vals)
+
+        # Añadir etiquetas si se proporcionan (por IDs o por nombres)
+        etiqueta_ids = list(data.get('etiqueta_ids', []))
+
+        if data.get('etiqueta_nombres'):
+            Etiqueta = request.env['renaix.etiqueta'].sudo()
+            for nombre in data['etiqueta_nombres']:
+                nombre = nombre.strip()
+                if not nombre:
+                    continue
+                existing = Etiqueta.search([('name', '=ilike', nombre.lower())], limit=1)
+                if existing:
+                    if existing.id not in etiqueta_ids:
+                        etiqueta_ids.append(existing.id)
+                else:
+                    nueva = Etiqueta.create({'name': nombre})
+                    etiqueta_ids.append(nueva.id)
+
+        if etiqueta_ids:
+            producto.sudo().write({'etiqueta_ids': [(6, 0, etiqueta_ids)]})
+        
+        _logger.info(f'Producto creado: {producto.id} por usuario {partner.id}')
+        
+        return response_helpers.success_response(
+            data=serializers.serialize_producto(producto, include_images=True),
+            message='Producto creado exitosamente',
+            status=201
+        )
     
     
     @http.route('/api/v1/productos/<int:producto_id>', type='http', auth='public', 
                 methods=['PUT'], csrf=False, cors='*')
-    def actualizar_producto(self, producto_id, **params):
+    @route_utils.endpoint('productos.actualizar_producto', schema=validators.PRODUCTO_UPDATE_SCHEMA)
+    def actualizar_producto(self, producto_id, partner, data, **params):
         """
         Actualizar producto (solo el propietario).
         
@@ -207,280 +251,335 @@ class ProductosController(http.Controller):
         Returns:
             JSON: {producto}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            # Buscar producto
-            producto = request.env['renaix.producto'].sudo().browse(producto_id)
-            
-            if not producto.exists():
-                return response_helpers.not_found_response('Producto no encontrado')
-            
-            # Verificar que sea el propietario
-            if producto.propietario_id.id != partner.id:
-                return response_helpers.forbidden_response('No tienes permiso para editar este producto')
-            
-            # Obtener datos
-            data = json.loads(request.httprequest.data.decode('utf-8'))
-            
-            # Preparar valores a actualizar
-            update_vals = {}
-            
-            if 'nombre' in data:
-                update_vals['name'] = data['nombre']
-            
-            if 'descripcion' in data:
-                update_vals['descripcion'] = data['descripcion']
-            
-            if 'precio' in data:
-                if not validators.validate_price(data['precio']):
-                    return response_helpers.validation_error_response('Precio inválido')
-                update_vals['precio'] = data['precio']
-            
-            if 'estado_producto' in data:
-                update_vals['estado_producto'] = data['estado_producto']
-            
-            if 'antiguedad' in data:
-                update_vals['antiguedad'] = data['antiguedad']
-            
-            if 'ubicacion' in data:
-                update_vals['ubicacion'] = data['ubicacion']
-            
-            if 'categoria_id' in data:
-                categoria = request.env['renaix.categoria'].sudo().browse(data['categoria_id'])
-                if not categoria.exists():
-                    return response_helpers.validation_error_response('Categoría no encontrada')
-                update_vals['categoria_id'] = data['categoria_id']
-            
-            # Actualizar
-            if update_vals:
-                producto.sudo().write(update_vals)
-            
-            # Actualizar etiquetas si se proporcionan (por IDs o por nombres)
-            etiqueta_ids = list(data.get('etiqueta_ids', []))
-
-            if data.get('etiqueta_nombres'):
-                Etiqueta = request.env['renaix.etiqueta'].sudo()
-                for nombre in data['etiqueta_nombres']:
-                    nombre = nombre.strip()
-                    if not nombre:
-                        continue
-                    existing = Etiqueta.search([('name', '=ilike', nombre.lower())], limit=1)
-                    if existing:
-                        if existing.id not in etiqueta_ids:
-                            etiqueta_ids.append(existing.id)
-                    else:
-                        nueva = Etiqueta.create({'name': nombre})
-                        etiqueta_ids.append(nueva.id)
-
-            if 'etiqueta_ids' in data or 'etiqueta_nombres' in data:
-                producto.sudo().write({'etiqueta_ids': [(6, 0, etiqueta_ids)]})
-            
-            _logger.info(f'Producto actualizado: {producto.id}')
-            
-            return response_helpers.success_response(
-                data=serializers.serialize_producto(producto, include_images=True),
-                message='Producto actualizado'
-            )
-            
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
+        # Buscar producto
+        producto = request.env['renaix.producto'].sudo().browse(producto_id)
         
-        except Exception as e:
-            _logger.error(f'Error al actualizar producto: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        if not producto.exists():
+            return response_helpers.not_found_response('Producto no encontrado')
+        
+        # Verificar que sea el propietario
+        if producto.propietario_id.id != partner.id:
+            return response_helpers.forbidden_response('No tienes permiso para editar este producto')
+        
+        # Preparar valores a actualizar
+        update_vals = {}
+        
+        if 'nombre' in data:
+            update_vals['name'] = data['nombre']
+        
+        if 'descripcion' in data:
+            update_vals['descripcion'] = data['descripcion']
+        
+        if 'precio' in data:
+            update_vals['precio'] = data['precio']
+        
+        if 'estado_producto' in data:
+            update_vals['estado_producto'] = data['estado_producto']
+        
+        if 'antiguedad' in data:
+            update_vals['antiguedad'] = data['antiguedad']
+        
+        if 'ubicacion' in data:
+            update_vals['ubicacion'] = data['ubicacion']
+        
+        if 'categoria_id' in data:
+            categoria = request.env['renaix.categoria'].sudo().browse(data['categoria_id'])
+            if not categoria.exists():
+                return response_helpers.validation_error_response('Categoría no encontrada')
+            update_vals['categoria_id'] = data['categoria_id']
+        
+        # Actualizar
+        if update_vals:
+            producto.sudo().write(update_vals)
+        
+        # Actualizar etiquetas si se proporcionan (por IDs o por nombres)
+        etiqueta_ids = list(data.get('etiqueta_ids', []))
+
+        if data.get('etiqueta_nombres'):
+            Etiqueta = request.env['renaix.etiqueta'].sudo()
+            for nombre in data['etiqueta_nombres']:
+                nombre = nombre.strip()
+                if not nombre:
+                    continue
+                existing = Etiqueta.search([('name', '=ilike', nombre.lower())], limit=1)
+                if existing:
+                    if existing.id not in etiqueta_ids:
+                        etiqueta_ids.append(existing.id)
+                else:
+                    nueva = Etiqueta.create({'name': nombre})
+                    etiqueta_ids.append(nueva.id)
+
+        if 'etiqueta_ids' in data or 'etiqueta_nombres' in data:
+            producto.sudo().write({'etiqueta_ids': [(6, 0, etiqueta_ids)]})
+        
+        _logger.info(f'Producto actualizado: {producto.id}')
+        
+        return response_helpers.success_response(
+            data=serializers.serialize_producto(producto, include_images=True),
+            message='Producto actualizado'
+        )
     
     
     @http.route('/api/v1/productos/<int:producto_id>', type='http', auth='public', 
                 methods=['DELETE'], csrf=False, cors='*')
-    def eliminar_producto(self, producto_id, **params):
+    @route_utils.endpoint('productos.eliminar_producto')
+    def eliminar_producto(self, producto_id, partner, **params):
         """
         Eliminar producto (solo el propietario).
         
         Returns:
             JSON: {message}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            # Buscar producto
-            producto = request.env['renaix.producto'].sudo().browse(producto_id)
-            
-            if not producto.exists():
-                return response_helpers.not_found_response('Producto no encontrado')
-            
-            # Verificar que sea el propietario
-            if producto.propietario_id.id != partner.id:
-                return response_helpers.forbidden_response('No tienes permiso para eliminar este producto')
-            
-            # Verificar que no tenga compras activas
-            if producto.estado_venta in ['reservado', 'vendido']:
-                return response_helpers.validation_error_response('No se puede eliminar un producto reservado o vendido')
-            
-            # Eliminar (soft delete)
-            producto.sudo().write({'active': False})
-            
-            _logger.info(f'Producto eliminado: {producto.id}')
-            
-            return response_helpers.success_response(
-                message='Producto eliminado exitosamente'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al eliminar producto: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Buscar producto
+        producto = request.env['renaix.producto'].sudo().browse(producto_id)
+        
+        if not producto.exists():
+            return response_helpers.not_found_response('Producto no encontrado')
+        
+        # Verificar que sea el propietario
+        if producto.propietario_id.id != partner.id:
+            return response_helpers.forbidden_response('No tienes permiso para eliminar este producto')
+        
+        # Verificar que no tenga compras activas
+        if producto.estado_venta in ['reservado', 'vendido']:
+            return response_helpers.validation_error_response('No se puede eliminar un producto reservado o vendido')
+        
+        # Eliminar (soft delete)
+        producto.sudo().write({'active': False})
+        
+        _logger.info(f'Producto eliminado: {producto.id}')
+        
+        return response_helpers.success_response(
+            message='Producto eliminado exitosamente'
+        )
     
     
     @http.route('/api/v1/productos/<int:producto_id>/publicar', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
-    def publicar_producto(self, producto_id, **params):
+    @route_utils.endpoint('productos.publicar_producto')
+    def publicar_producto(self, producto_id, partner, **params):
         """
         Publicar producto (cambiar estado de borrador a disponible).
 
         Returns:
             JSON: {producto}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-
-            # Buscar producto
-            producto = request.env['renaix.producto'].sudo().browse(producto_id)
-
-            if not producto.exists():
-                return response_helpers.not_found_response('Producto no encontrado')
+        # Buscar producto
+        producto = request.env['renaix.producto'].sudo().browse(producto_id)
 
-            # Verificar que sea el propietario
-            if producto.propietario_id.id != partner.id:
-                return response_helpers.forbidden_response('No tienes permiso')
+        if not producto.exists():
+            return response_helpers.not_found_response('Producto no encontrado')
 
-            # Verificar que esté en borrador
-            if producto.estado_venta != 'borrador':
-                return response_helpers.validation_error_response('El producto ya está publicado')
+        # Verificar que sea el propietario
+        if producto.propietario_id.id != partner.id:
+            return response_helpers.forbidden_response('No tienes permiso')
 
-            # Publicar usando el método del modelo (valida imágenes y actualiza fecha)
-            from odoo.exceptions import ValidationError
-            try:
-                producto.sudo().action_publicar()
-            except ValidationError as ve:
-                return response_helpers.validation_error_response(str(ve))
+        # Verificar que esté en borrador
+        if producto.estado_venta != 'borrador':
+            return response_helpers.validation_error_response('El producto ya está publicado')
 
-            _logger.info(f'Producto publicado: {producto.id}')
+        # Publicar usando el método del modelo (valida imágenes y actualiza fecha)
+        from odoo.exceptions import ValidationError
+        try:
+            producto.sudo().action_publicar()
+        except ValidationError as ve:
+            return response_helpers.validation_error_response(str(ve))
 
-            return response_helpers.success_response(
-                data=serializers.serialize_producto(producto, include_images=True),
-                message='Producto publicado exitosamente'
-            )
+        _logger.info(f'Producto publicado: {producto.id}')
 
-        except Exception as e:
-            _logger.error(f'Error al publicar producto: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        return response_helpers.success_response(
+            data=serializers.serialize_producto(producto, include_images=True),
+            message='Producto publicado exitosamente'
+        )
     
     
     @http.route('/api/v1/productos/buscar', type='http', auth='none', 
                 methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('productos.buscar_productos', auth=False)
     def buscar_productos(self, **params):
         """
         Búsqueda avanzada de productos (público).
         
         Query params:
-            query: Texto a buscar
+            query: Texto a buscar (texto completo: nombre, descripción, etiquetas y categoría)
+            fuzzy: 1 para búsqueda aproximada (tolerante a erratas, ordenada por similitud)
             categoria_id: ID de categoría
             etiquetas: IDs de etiquetas (separadas por coma)
             precio_min: Precio mínimo
             precio_max: Precio máximo
             estado_producto: Estado del producto
             ubicacion: Ubicación
-            orden: precio_asc, precio_desc, fecha_desc, fecha_asc
+            lat, lon: Coordenadas del usuario para buscar productos cercanos
+            radio_km: Radio de búsqueda en km (default: 10)
+            orden: precio_asc, precio_desc, fecha_desc, fecha_asc, relevancia, distancia
             page: Número de página
             limit: Elementos por página
+            cursor: Cursor de paginación keyset (solo con orden=fecha_desc)
+            facets: Facetas a contar (categoria, estado_producto, precio), separadas por coma
+            fields: Campos a devolver, separados por coma (ej: id,nombre,precio)
+            expand: Relaciones a incluir como objeto (propietario, categoria, etiquetas, imagenes)
+            vista: tarjeta para el formato compacto de listados (miniatura + vendedor)
         
         Returns:
             JSON: {productos} (paginado)
         """
-        try:
-            # Validar y limpiar filtros
-            filters = validators.validate_search_filters(params)
-            
-            # Parámetros de paginación
-            page, limit = validators.validate_pagination_params(
-                params.get('page'),
-                params.get('limit')
+        # Validar y limpiar filtros (NaN o infinito se rechazan, no se ignoran)
+        es_valido, mensaje = validators.validate_numeric_search_filters(params)
+        if not es_valido:
+            return response_helpers.validation_error_response(mensaje)
+        filters = validators.validate_search_filters(params)
+        
+        # Parámetros de paginación
+        page, limit = validators.validate_pagination_params(
+            params.get('page'),
+            params.get('limit')
+        )
+        
+        # Respuesta parcial (?fields=, ?expand=) o tarjeta (?vista=tarjeta)
+        fieldsets = validators.validate_fieldsets(params)
+        vista = validators.validate_vista(params)
+        
+        # Construir dominio (la búsqueda de texto y la cercanía las aplica
+        # search_helpers sobre sus índices, no se expresan como dominio)
+        domain = search_helpers.build_search_domain(filters)
+        
+        # Determinar orden
+        order_map = {
+            'precio_asc': 'precio ASC',
+            'precio_desc': 'precio DESC',
+            'fecha_desc': 'fecha_publicacion DESC',
+            'fecha_asc': 'fecha_publicacion ASC',
+            # Se sustituyen en search_helpers (ts_rank / distancia al punto)
+            'relevancia': 'fecha_publicacion DESC',
+            'distancia': 'fecha_publicacion DESC',
+        }
+        order = order_map.get(filters.get('orden', 'fecha_desc'), 'fecha_publicacion DESC')
+        
+        Producto = request.env['renaix.producto'].sudo()
+        
+        facets = validators.validate_facets(params.get('facets'))
+        
+        # Modo cursor (solo sobre el orden del feed: fecha_publicacion DESC, id DESC)
+        if 'cursor' in params:
+            if filters['orden'] != 'fecha_desc':
+                return response_helpers.validation_error_response(
+                    'La paginación por cursor solo está disponible con orden=fecha_desc'
+                )
+            
+            cursor = None
+            if params.get('cursor'):
+                cursor = search_helpers.decode_cursor(params['cursor'])
+                if not cursor:
+                    return response_helpers.validation_error_response('Cursor inválido')
+            
+            def _buscar_cursor():
+                productos, next_cursor = search_helpers.search_keyset(
+                    Producto, domain, cursor, limit, filters=filters
+                )
+                return {
+                    'ids': productos.ids,
+                    'next_cursor': next_cursor,
+                    # Recuentos por faceta sobre el conjunto filtrado (una sola consulta)
+                    'facets': search_helpers.compute_facets(Producto, domain, filters, facets) if facets else None,
+                }
+            
+            resultado = cache_utils.cached_search(
+                request.env.cr, ('buscar', 'cursor', filters, facets, params.get('cursor'), limit), _buscar_cursor
             )
+            productos_pagina = Producto.browse(resultado['ids'])
+            productos_data = serializers.serialize_productos(productos_pagina, include_images=True, vista=vista, **fieldsets)
             
-            # Construir dominio
-            domain = [
-                ('active', '=', True),
-                ('estado_venta', '=', 'disponible')
-            ]
-            
-            # Búsqueda de texto
-            if filters.get('query'):
-                domain.append('|')
-                domain.append(('name', 'ilike', filters['query']))
-                domain.append(('descripcion', 'ilike', filters['query']))
-            
-            # Filtro de categoría
-            if filters.get('categoria_id'):
-                domain.append(('categoria_id', '=', filters['categoria_id']))
-            
-            # Filtro de etiquetas
-            if filters.get('etiquetas'):
-                domain.append(('etiqueta_ids', 'in', filters['etiquetas']))
-            
-            # Filtro de precio
-            if filters.get('precio_min'):
-                domain.append(('precio', '>=', filters['precio_min']))
-            
-            if filters.get('precio_max'):
-                domain.append(('precio', '<=', filters['precio_max']))
-            
-            # Filtro de estado del producto
-            if filters.get('estado_producto'):
-                domain.append(('estado_producto', '=', filters['estado_producto']))
-            
-            # Filtro de ubicación
-            if filters.get('ubicacion'):
-                domain.append(('ubicacion', 'ilike', filters['ubicacion']))
-            
-            # Determinar orden
-            order_map = {
-                'precio_asc': 'precio ASC',
-                'precio_desc': 'precio DESC',
-                'fecha_desc': 'fecha_publicacion DESC',
-                'fecha_asc': 'fecha_publicacion ASC',
-            }
-            order = order_map.get(filters.get('orden', 'fecha_desc'), 'fecha_publicacion DESC')
-            
-            # Buscar
-            Producto = request.env['renaix.producto'].sudo()
-            productos = Producto.search(domain, order=order, limit=settings.MAX_SEARCH_RESULTS)
-            
-            total = len(productos)
-            offset = (page - 1) * limit
-            productos_pagina = productos[offset:offset + limit]
-            
-            # Serializar
-            productos_data = [serializers.serialize_producto(p, include_images=True) for p in productos_pagina]
-            
-            return response_helpers.paginated_response(
+            return response_helpers.cursor_paginated_response(
                 items=productos_data,
-                total=total,
-                page=page,
+                next_cursor=resultado['next_cursor'],
                 limit=limit,
-                message=f'Se encontraron {total} productos'
+                message='Productos recuperados',
+                facets=resultado['facets']
             )
-            
-        except Exception as e:
-            _logger.error(f'Error en búsqueda: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        
+        # Buscar (total exacto o estimado + solo la página solicitada)
+        offset = (page - 1) * limit
+        
+        def _buscar_pagina():
+            total, total_exact = search_helpers.count_search(Producto, domain, filters)
+            # Con un total estimado, un registro extra dice si hay página siguiente
+            productos = search_helpers.search_page(
+                Producto, domain, filters, order, limit=limit if total_exact else limit + 1, offset=offset
+            )
+            return {
+                'total': total,
+                'total_exact': total_exact,
+                'has_next': None if total_exact else len(productos) > limit,
+                'ids': productos.ids[:limit],
+                'facets': search_helpers.compute_facets(Producto, domain, filters, facets) if facets else None,
+            }
+        
+        resultado = cache_utils.cached_search(
+            request.env.cr, ('buscar', 'page', filters, facets, page, limit), _buscar_pagina
+        )
+        total = resultado['total']
+        total_exact = resultado['total_exact']
+        has_next = resultado['has_next']
+        facets_data = resultado['facets']
+        productos_pagina = Producto.browse(resultado['ids'])
+        
+        # Serializar
+        productos_data = serializers.serialize_productos(productos_pagina, include_images=True, vista=vista, **fieldsets)
+        
+        if total_exact:
+            message = f'Se encontraron {total} productos'
+        else:
+            message = f'Se encontraron aproximadamente {total} productos'
+        
+        return response_helpers.paginated_response(
+            items=productos_data,
+            total=total,
+            page=page,
+            limit=limit,
+            message=message,
+            total_exact=total_exact,
+            facets=facets_data,
+            has_next=has_next
+        )
+    
+    
+    @http.route('/api/v1/autocompletar', type='http', auth='none',
+                methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('productos.autocompletar', auth=False)
+    def autocompletar(self, **params):
+        """
+        Sugerencias mientras se escribe en el buscador (público).
+        
+        Mucho más ligero que /productos/buscar: solo nombres, sin serializar productos.
+        
+        Query params:
+            q: Prefijo escrito por el usuario
+        
+        Returns:
+            JSON: {productos: [nombre], etiquetas: [{id, nombre, count}], categorias: [{id, nombre, count}]}
+        """
+        prefijo = (params.get('q') or '').strip()[:settings.AUTOCOMPLETE_MAX_LENGTH]
+        
+        if not prefijo:
+            return response_helpers.validation_error_response('El parámetro q es requerido')
+        
+        sugerencias = cache_utils.cached_search(
+            request.env.cr,
+            ('autocompletar', prefijo.lower(), settings.AUTOCOMPLETE_LIMIT),
+            lambda: search_helpers.autocompletar(request.env, prefijo, settings.AUTOCOMPLETE_LIMIT)
+        )
+        
+        return response_helpers.success_response(
+            data=sugerencias,
+            message='Sugerencias recuperadas'
+        )
     
     
     @http.route('/api/v1/productos/<int:producto_id>/imagenes', type='http', auth='public',
                 methods=['POST'], csrf=False, cors='*')
-    def agregar_imagen(self, producto_id, **params):
+    @route_utils.endpoint('productos.agregar_imagen', schema=validators.IMAGEN_SCHEMA,
+                          rate_limit='imagenes', max_body_bytes=settings.API_MAX_IMAGE_BODY_BYTES)
+    def agregar_imagen(self, producto_id, partner, data, **params):
         """
         Agregar imagen a un producto.
 
@@ -494,118 +593,94 @@ class ProductosController(http.Controller):
         Returns:
             JSON: {imagen}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
+        # Buscar producto
+        producto = request.env['renaix.producto'].sudo().browse(producto_id)
 
-            # Buscar producto
-            producto = request.env['renaix.producto'].sudo().browse(producto_id)
+        if not producto.exists():
+            return response_helpers.not_found_response('Producto no encontrado')
 
-            if not producto.exists():
-                return response_helpers.not_found_response('Producto no encontrado')
+        # Verificar que sea el propietario
+        if producto.propietario_id.id != partner.id:
+            return response_helpers.forbidden_response('No tienes permiso')
 
-            # Verificar que sea el propietario
-            if producto.propietario_id.id != partner.id:
-                return response_helpers.forbidden_response('No tienes permiso')
+        # Verificar límite de imágenes
+        if len(producto.imagen_ids) >= settings.MAX_IMAGES_PER_PRODUCT:
+            return response_helpers.validation_error_response(f'Máximo {settings.MAX_IMAGES_PER_PRODUCT} imágenes por producto')
 
-            # Obtener datos
-            data = json.loads(request.httprequest.data.decode('utf-8'))
+        # Procesar imagen base64
+        image_data = data['image']
 
-            if not data.get('image'):
-                return response_helpers.validation_error_response('Campo "image" requerido (base64)')
+        if isinstance(image_data, str):
+            if image_data.startswith('data:image'):
+                image_data = image_data.split(',', 1)[1]
+            image_data = image_data.strip()
 
-            # Verificar límite de imágenes
-            if len(producto.imagen_ids) >= settings.MAX_IMAGES_PER_PRODUCT:
-                return response_helpers.validation_error_response(f'Máximo {settings.MAX_IMAGES_PER_PRODUCT} imágenes por producto')
-
-            # Procesar imagen base64
-            image_data = data['image']
-
-            if isinstance(image_data, str):
-                if image_data.startswith('data:image'):
-                    image_data = image_data.split(',', 1)[1]
-                image_data = image_data.strip()
-
-            # Validar base64
-            try:
-                image_bytes = base64.b64decode(image_data, validate=True)
-            except (base64.binascii.Error, ValueError):
-                return response_helpers.validation_error_response('Imagen en formato base64 inválido')
-
-            # Validar tamaño
-            if len(image_bytes) > settings.MAX_IMAGE_SIZE_MB * 1024 * 1024:
-                return response_helpers.validation_error_response(f'La imagen es demasiado grande. Máximo: {settings.MAX_IMAGE_SIZE_MB}MB')
-
-            if len(image_bytes) < 100:
-                return response_helpers.validation_error_response('La imagen es demasiado pequeña o está corrupta')
-
-            # Crear imagen con el campo binario correcto
-            imagen_vals = {
-                'producto_id': producto.id,
-                'imagen': image_data,
-                'es_principal': data.get('es_principal', False),
-                'descripcion': data.get('descripcion', ''),
-            }
-
-            imagen = request.env['renaix.producto.imagen'].sudo().create(imagen_vals)
-
-            _logger.info(f'Imagen añadida al producto {producto.id}')
+        # Validar base64
+        try:
+            image_bytes = base64.b64decode(image_data, validate=True)
+        except (base64.binascii.Error, ValueError):
+            return response_helpers.validation_error_response('Imagen en formato base64 inválido')
+
+        # Validar tamaño
+        if len(image_bytes) > settings.MAX_IMAGE_SIZE_MB * 1024 * 1024:
+            return response_helpers.validation_error_response(f'La imagen es demasiado grande. Máximo: {settings.MAX_IMAGE_SIZE_MB}MB')
+
+        if len(image_bytes) < 100:
+            return response_helpers.validation_error_response('La imagen es demasiado pequeña o está corrupta')
+
+        # Crear imagen con el campo binario correcto
+        imagen_vals = {
+            'producto_id': producto.id,
+            'imagen': image_data,
+            'es_principal': data.get('es_principal', False),
+            'descripcion': data.get('descripcion', ''),
+        }
 
-            return response_helpers.success_response(
-                data=serializers.serialize_producto_imagen(imagen),
-                message='Imagen añadida exitosamente',
-                status=201
-            )
+        imagen = request.env['renaix.producto.imagen'].sudo().create(imagen_vals)
 
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
+        _logger.info(f'Imagen añadida al producto {producto.id}')
 
-        except Exception as e:
-            _logger.error(f'Error al agregar imagen: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        return response_helpers.success_response(
+            data=serializers.serialize_producto_imagen(imagen),
+            message='Imagen añadida exitosamente',
+            status=201
+        )
     
     
     @http.route('/api/v1/productos/<int:producto_id>/imagenes/<int:imagen_id>', 
                 type='http', auth='public', methods=['DELETE'], csrf=False, cors='*')
-    def eliminar_imagen(self, producto_id, imagen_id, **params):
+    @route_utils.endpoint('productos.eliminar_imagen')
+    def eliminar_imagen(self, producto_id, imagen_id, partner, **params):
         """
         Eliminar imagen de un producto.
         
         Returns:
             JSON: {message}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            # Buscar producto
-            producto = request.env['renaix.producto'].sudo().browse(producto_id)
-            
-            if not producto.exists():
-                return response_helpers.not_found_response('Producto no encontrado')
-            
-            # Verificar que sea el propietario
-            if producto.propietario_id.id != partner.id:
-                return response_helpers.forbidden_response('No tienes permiso')
-            
-            # Buscar imagen
-            imagen = request.env['renaix.producto.imagen'].sudo().browse(imagen_id)
-            
-            if not imagen.exists() or imagen.producto_id.id != producto.id:
-                return response_helpers.not_found_response('Imagen no encontrada')
-            
-            # Eliminar
-            imagen.sudo().unlink()
-            
-            _logger.info(f'Imagen eliminada del producto {producto.id}')
-            
-            return response_helpers.success_response(
-                message='Imagen eliminada exitosamente'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al eliminar imagen: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Buscar producto
+        producto = request.env['renaix.producto'].sudo().browse(producto_id)
+        
+        if not producto.exists():
+            return response_helpers.not_found_response('Producto no encontrado')
+        
+        # Verificar que sea el propietario
+        if producto.propietario_id.id != partner.id:
+            return response_helpers.forbidden_response('No tienes permiso')
+        
+        # Buscar imagen
+        imagen = request.env['renaix.producto.imagen'].sudo().browse(imagen_id)
+        
+        if not imagen.exists() or imagen.producto_id.id != producto.id:
+            return response_helpers.not_found_response('Imagen no encontrada')
+        
+        # Eliminar
+        imagen.sudo().unlink()
+        
+        _logger.info(f'Imagen eliminada del producto {producto.id}')
+        
+        return response_helpers.success_response(
+            message='Imagen eliminada exitosamente'
+        )
 
 
     @http.route('/api/v1/imagenes/<int:imagen_id>', type='http', auth='none',
@@ -615,6 +690,9 @@ class ProductosController(http.Controller):
         Sirve el binario de una imagen de producto (público, sin autenticación).
         Necesario porque /web/image/ requiere sesión web, no Bearer token.
 
+        Query params:
+            size: small para la miniatura (imagen_small)
+
         Returns:
             HTTP binary response con la imagen
         """
@@ -624,7 +702,9 @@ class ProductosController(http.Controller):
             if not imagen.exists() or not imagen.imagen:
                 return request.make_response('Not found', status=404)
 
-            image_data = b64.b64decode(imagen.imagen)
+            # ?size=small: miniatura de 256px (tarjetas de listado)
+            contenido = imagen.imagen_small if params.get('size') == 'small' else imagen.imagen
+            image_data = b64.b64decode(contenido or imagen.imagen)
             headers = [
                 ('Content-Type', 'image/jpeg'),
                 ('Cache-Control', 'public, max-age=86400'),
@@ -4,11 +4,11 @@ Controlador de Usuarios
 Endpoints: perfil, actualizar perfil, productos del usuario, compras, ventas, valoraciones, estadísticas
 """
 
-import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, auth_helpers, validators, response_helpers, serializers
+from ..models.utils import auth_helpers, validators, response_helpers, serializers, route_utils
+from ..config import settings
 
 _logger = logging.getLogger(__name__)
 
@@ -16,7 +16,8 @@ class UsuariosController(http.Controller):
     
     @http.route('/api/v1/usuarios/perfil', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
-    def get_perfil(self, **params):
+    @route_utils.endpoint('usuarios.get_perfil')
+    def get_perfil(self, partner, **params):
         """
         Obtener perfil del usuario autenticado.
         
@@ -26,26 +27,23 @@ class UsuariosController(http.Controller):
         Returns:
             JSON: {user}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            return response_helpers.success_response(
-                data=serializers.serialize_partner(partner, full=True),
-                message='Perfil recuperado'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al obtener perfil: {str(e)}')
-            return response_helpers.unauthorized_response(str(e))
+        return response_helpers.success_response(
+            data=serializers.serialize_partner(partner, full=True),
+            message='Perfil recuperado'
+        )
     
     
     @http.route('/api/v1/usuarios/perfil', type='http', auth='public',
                 methods=['PUT'], csrf=False, cors='*')
-    def update_perfil(self, **params):
+    @route_utils.endpoint('usuarios.update_perfil', schema=validators.PERFIL_SCHEMA,
+                          rate_limit='imagenes', max_body_bytes=settings.API_MAX_IMAGE_BODY_BYTES)
+    def update_perfil(self, partner, data, **params):
         """
         Actualizar perfil del usuario autenticado.
 
+        Admite subir la imagen de perfil (como /perfil/imagen), así que
+        comparte su límite de peticiones.
+
         Body JSON:
         {
             "name": "Nuevo Nombre",     # opcional
@@ -57,186 +55,151 @@ class UsuariosController(http.Controller):
         Returns:
             JSON: {user}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-
-            # Obtener datos
-            data = json.loads(request.httprequest.data.decode('utf-8'))
-
-            # Campos permitidos para actualizar
-            allowed_fields = ['name', 'phone', 'mobile']
-            update_vals = {}
-
-            for field in allowed_fields:
-                if field in data:
-                    update_vals[field] = data[field]
-
-            # Validar teléfonos si se proporcionan
-            if update_vals.get('phone') and not auth_helpers.validate_phone_number(update_vals['phone']):
-                return response_helpers.validation_error_response('Formato de teléfono inválido')
-
-            if update_vals.get('mobile') and not auth_helpers.validate_phone_number(update_vals['mobile']):
-                return response_helpers.validation_error_response('Formato de móvil inválido')
-
-            # Manejar imagen si se proporciona (null significa "no cambiar", "" significa "eliminar")
-            if 'image' in data and data['image'] is not None:
-                image_data = data['image']
-
-                # Si es una cadena vacía, eliminar la imagen
-                if not image_data:
-                    update_vals['image_1920'] = False
-                else:
-                    # Validar que sea base64 válido
-                    try:
-                        import base64
-
-                        # Verificar si tiene el prefijo data:image y extraerlo
-                        if isinstance(image_data, str):
-                            if image_data.startswith('data:image'):
-                                # Extraer solo la parte base64
-                                image_data = image_data.split(',', 1)[1]
-
-                            # Limpiar espacios en blanco
-                            image_data = image_data.strip()
-
-                        # Intentar decodificar para validar formato base64
-                        image_bytes = base64.b64decode(image_data, validate=True)
-
-                        # Validar tamaño (máximo 5MB)
-                        if len(image_bytes) > 5 * 1024 * 1024:
-                            return response_helpers.validation_error_response(
-                                'La imagen es demasiado grande. Tamaño máximo: 5MB'
-                            )
-
-                        # Validar que tenga un tamaño mínimo razonable (al menos 100 bytes)
-                        if len(image_bytes) < 100:
-                            return response_helpers.validation_error_response(
-                                'La imagen es demasiado pequeña o está corrupta'
-                            )
-
-                        # Guardar la imagen en base64 (Odoo valida internamente el formato)
-                        update_vals['image_1920'] = image_data
-
-                    except (base64.binascii.Error, ValueError) as b64_error:
-                        _logger.error(f'Error al decodificar base64: {str(b64_error)}')
-                        return response_helpers.validation_error_response('Imagen en formato base64 inválido')
-                    except Exception as img_error:
-                        _logger.error(f'Error al procesar imagen: {str(img_error)}')
-                        return response_helpers.validation_error_response(f'Error al procesar imagen: {str(img_error)}')
-
-            # Actualizar
-            if update_vals:
-                partner.sudo().write(update_vals)
+        # Campos permitidos para actualizar
+        allowed_fields = ['name', 'phone', 'mobile']
+        update_vals = {}
 
-            return response_helpers.success_response(
-                data=serializers.serialize_partner(partner, full=True),
-                message='Perfil actualizado'
-            )
+        for field in allowed_fields:
+            if field in data:
+                update_vals[field] = data[field]
 
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
+        # Manejar imagen si se proporciona (null significa "no cambiar", "" significa "eliminar")
+        if 'image' in data and data['image'] is not None:
+            image_data = data['image']
 
-        except Exception as e:
-            _logger.error(f'Error al actualizar perfil: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+            # Si es una cadena vacía, eliminar la imagen
+            if not image_data:
+                update_vals['image_1920'] = False
+            else:
+                # Validar que sea base64 válido
+                try:
+                    import base64
+
+                    # Verificar si tiene el prefijo data:image y extraerlo
+                    if isinstance(image_data, str):
+                        if image_data.startswith('data:image'):
+                            # Extraer solo la parte base64
+                            image_data = image_data.split(',', 1)[1]
+
+                        # Limpiar espacios en blanco
+                        image_data = image_data.strip()
+
+                    # Intentar decodificar para validar formato base64
+                    image_bytes = base64.b64decode(image_data, validate=True)
+
+                    # Validar tamaño (máximo 5MB)
+                    if len(image_bytes) > 5 * 1024 * 1024:
+                        return response_helpers.validation_error_response(
+                            'La imagen es demasiado grande. Tamaño máximo: 5MB'
+                        )
+
+                    # Validar que tenga un tamaño mínimo razonable (al menos 100 bytes)
+                    if len(image_bytes) < 100:
+                        return response_helpers.validation_error_response(
+                            'La imagen es demasiado pequeña o está corrupta'
+                        )
+
+                    # Guardar la imagen en base64 (Odoo valida internamente el formato)
+                    update_vals['image_1920'] = image_data
+
+                except (base64.binascii.Error, ValueError) as b64_error:
+                    _logger.error(f'Error al decodificar base64: {str(b64_error)}')
+                    return response_helpers.validation_error_response('Imagen en formato base64 inválido')
+                except Exception as img_error:
+                    _logger.error(f'Error al procesar imagen: {str(img_error)}')
+                    return response_helpers.validation_error_response(f'Error al procesar imagen: {str(img_error)}')
+
+        # Actualizar
+        if update_vals:
+            partner.sudo().write(update_vals)
+
+        return response_helpers.success_response(
+            data=serializers.serialize_partner(partner, full=True),
+            message='Perfil actualizado'
+        )
     
     
     @http.route('/api/v1/usuarios/perfil/imagen', type='http', auth='public',
-                methods=['POST', 'DELETE'], csrf=False, cors='*')
-    def update_imagen_perfil(self, **params):
+                methods=['POST'], csrf=False, cors='*')
+    @route_utils.endpoint('usuarios.update_imagen_perfil', schema=validators.IMAGEN_SCHEMA,
+                          rate_limit='imagenes', max_body_bytes=settings.API_MAX_IMAGE_BODY_BYTES)
+    def update_imagen_perfil(self, partner, data, **params):
         """
-        Actualizar o eliminar la imagen de perfil del usuario autenticado.
+        Actualizar la imagen de perfil del usuario autenticado.
 
-        POST - Subir nueva imagen:
         Body JSON:
         {
             "image": "base64_string"  # imagen en base64
         }
 
-        DELETE - Eliminar imagen actual:
-        Sin body
-
         Returns:
             JSON: {user}
         """
+        image_data = data['image']
+
+        # Validar y procesar imagen
         try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-
-            # DELETE - Eliminar imagen
-            if request.httprequest.method == 'DELETE':
-                partner.sudo().write({'image_1920': False})
-                return response_helpers.success_response(
-                    data=serializers.serialize_partner(partner, full=True),
-                    message='Imagen de perfil eliminada'
-                )
+            import base64
 
-            # POST - Subir nueva imagen
-            data = json.loads(request.httprequest.data.decode('utf-8'))
+            # Verificar si tiene el prefijo data:image y extraerlo
+            if isinstance(image_data, str):
+                if image_data.startswith('data:image'):
+                    # Extraer solo la parte base64
+                    image_data = image_data.split(',', 1)[1]
 
-            if 'image' not in data:
-                return response_helpers.validation_error_response('Campo "image" requerido')
+                # Limpiar espacios en blanco
+                image_data = image_data.strip()
 
-            image_data = data['image']
+            # Intentar decodificar para validar formato base64
+            image_bytes = base64.b64decode(image_data, validate=True)
 
-            if not image_data:
-                return response_helpers.validation_error_response('La imagen no puede estar vacía')
-
-            # Validar y procesar imagen
-            try:
-                import base64
-
-                # Verificar si tiene el prefijo data:image y extraerlo
-                if isinstance(image_data, str):
-                    if image_data.startswith('data:image'):
-                        # Extraer solo la parte base64
-                        image_data = image_data.split(',', 1)[1]
-
-                    # Limpiar espacios en blanco
-                    image_data = image_data.strip()
-
-                # Intentar decodificar para validar formato base64
-                image_bytes = base64.b64decode(image_data, validate=True)
-
-                # Validar tamaño (máximo 5MB)
-                if len(image_bytes) > 5 * 1024 * 1024:
-                    return response_helpers.validation_error_response(
-                        'La imagen es demasiado grande. Tamaño máximo: 5MB'
-                    )
-
-                # Validar que tenga un tamaño mínimo razonable (al menos 100 bytes)
-                if len(image_bytes) < 100:
-                    return response_helpers.validation_error_response(
-                        'La imagen es demasiado pequeña o está corrupta'
-                    )
-
-                # Guardar la imagen (Odoo valida internamente el formato)
-                partner.sudo().write({'image_1920': image_data})
-
-                return response_helpers.success_response(
-                    data=serializers.serialize_partner(partner, full=True),
-                    message='Imagen de perfil actualizada'
+            # Validar tamaño (máximo 5MB)
+            if len(image_bytes) > 5 * 1024 * 1024:
+                return response_helpers.validation_error_response(
+                    'La imagen es demasiado grande. Tamaño máximo: 5MB'
                 )
 
-            except (base64.binascii.Error, ValueError) as b64_error:
-                _logger.error(f'Error al decodificar base64: {str(b64_error)}')
-                return response_helpers.validation_error_response('Imagen en formato base64 inválido')
-            except Exception as img_error:
-                _logger.error(f'Error al procesar imagen: {str(img_error)}')
-                return response_helpers.validation_error_response(f'Error al procesar imagen: {str(img_error)}')
+            # Validar que tenga un tamaño mínimo razonable (al menos 100 bytes)
+            if len(image_bytes) < 100:
+                return response_helpers.validation_error_response(
+                    'La imagen es demasiado pequeña o está corrupta'
+                )
 
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
+            # Guardar la imagen (Odoo valida internamente el formato)
+            partner.sudo().write({'image_1920': image_data})
 
-        except Exception as e:
-            _logger.error(f'Error al actualizar imagen de perfil: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+            return response_helpers.success_response(
+                data=serializers.serialize_partner(partner, full=True),
+                message='Imagen de perfil actualizada'
+            )
+
+        except (base64.binascii.Error, ValueError) as b64_error:
+            _logger.error(f'Error al decodificar base64: {str(b64_error)}')
+            return response_helpers.validation_error_response('Imagen en formato base64 inválido')
+        except Exception as img_error:
+            _logger.error(f'Error al procesar imagen: {str(img_error)}')
+            return response_helpers.validation_error_response(f'Error al procesar imagen: {str(img_error)}')
 
+    @http.route('/api/v1/usuarios/perfil/imagen', type='http', auth='public',
+                methods=['DELETE'], csrf=False, cors='*')
+    @route_utils.endpoint('usuarios.eliminar_imagen_perfil')
+    def eliminar_imagen_perfil(self, partner, **params):
+        """
+        Eliminar la imagen de perfil del usuario autenticado.
+
+        Returns:
+            JSON: {user}
+        """
+        partner.sudo().write({'image_1920': False})
+        return response_helpers.success_response(
+            data=serializers.serialize_partner(partner, full=True),
+            message='Imagen de perfil eliminada'
+        )
 
     @http.route('/api/v1/usuarios/perfil/password', type='http', auth='public',
                 methods=['PUT'], csrf=False, cors='*')
-    def cambiar_password(self, **params):
+    @route_utils.endpoint('usuarios.cambiar_password', schema=validators.PASSWORD_SCHEMA)
+    def cambiar_password(self, partner, data, **params):
         """
         Cambiar contraseña del usuario autenticado.
 
@@ -249,46 +212,27 @@ class UsuariosController(http.Controller):
         Returns:
             JSON: {message}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-
-            # Obtener datos
-            data = json.loads(request.httprequest.data.decode('utf-8'))
-
-            if not data.get('password_actual'):
-                return response_helpers.validation_error_response('Campo "password_actual" requerido')
+        # Verificar contraseña actual
+        if not auth_helpers.verify_password(data['password_actual'], partner.password_hash):
+            return response_helpers.validation_error_response('La contraseña actual es incorrecta')
 
-            if not data.get('password_nueva'):
-                return response_helpers.validation_error_response('Campo "password_nueva" requerido')
+        # Validar fortaleza de la nueva contraseña
+        is_valid, error_msg = auth_helpers.validate_password_strength(data['password_nueva'])
+        if not is_valid:
+            return response_helpers.validation_error_response(error_msg)
 
-            # Verificar contraseña actual
-            if not auth_helpers.verify_password(data['password_actual'], partner.password_hash):
-                return response_helpers.validation_error_response('La contraseña actual es incorrecta')
+        # Cambiar contraseña usando el método del modelo
+        partner.sudo().set_password(data['password_nueva'])
 
-            # Validar fortaleza de la nueva contraseña
-            is_valid, error_msg = auth_helpers.validate_password_strength(data['password_nueva'])
-            if not is_valid:
-                return response_helpers.validation_error_response(error_msg)
+        _logger.info(f'Contraseña cambiada para usuario {partner.id}')
 
-            # Cambiar contraseña usando el método del modelo
-            partner.sudo().set_password(data['password_nueva'])
-
-            _logger.info(f'Contraseña cambiada para usuario {partner.id}')
-
-            return response_helpers.success_response(
-                message='Contraseña actualizada correctamente'
-            )
-
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
-
-        except Exception as e:
-            _logger.error(f'Error al cambiar contraseña: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        return response_helpers.success_response(
+            message='Contraseña actualizada correctamente'
+        )
 
     @http.route('/api/v1/usuarios/<int:user_id>', type='http', auth='public',
                 methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('usuarios.get_usuario_publico', auth=False)
     def get_usuario_publico(self, user_id, **params):
         """
         Obtener perfil público de un usuario.
@@ -296,27 +240,23 @@ class UsuariosController(http.Controller):
         Returns:
             JSON: {user}
         """
-        try:
-            # Buscar usuario
-            partner = request.env['res.partner'].sudo().browse(user_id)
-            
-            if not partner.exists() or not partner.es_usuario_app:
-                return response_helpers.not_found_response('Usuario no encontrado')
-            
-            # Devolver solo información pública
-            return response_helpers.success_response(
-                data=serializers.serialize_partner(partner, full=True),
-                message='Usuario encontrado'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al obtener usuario: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Buscar usuario
+        partner = request.env['res.partner'].sudo().browse(user_id)
+        
+        if not partner.exists() or not partner.es_usuario_app:
+            return response_helpers.not_found_response('Usuario no encontrado')
+        
+        # Devolver solo información pública
+        return response_helpers.success_response(
+            data=serializers.serialize_partner(partner, full=True),
+            message='Usuario encontrado'
+        )
     
     
     @http.route('/api/v1/usuarios/perfil/productos', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
-    def get_mis_productos(self, **params):
+    @route_utils.endpoint('usuarios.get_mis_productos')
+    def get_mis_productos(self, partner, **params):
         """
         Obtener productos del usuario autenticado.
         
@@ -327,168 +267,148 @@ class UsuariosController(http.Controller):
         Returns:
             JSON: {productos} (paginado)
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            # Parámetros de paginación
-            page, limit = validators.validate_pagination_params(
-                params.get('page'),
-                params.get('limit')
-            )
-            
-            # Buscar productos
-            productos = request.env['renaix.producto'].sudo().search([
-                ('propietario_id', '=', partner.id)
-            ], order='fecha_publicacion DESC')
-            
-            total = len(productos)
-            offset = (page - 1) * limit
-            productos_pagina = productos[offset:offset + limit]
-            
-            # Serializar
-            productos_data = [serializers.serialize_producto(p, include_images=True) for p in productos_pagina]
-            
-            return response_helpers.paginated_response(
-                items=productos_data,
-                total=total,
-                page=page,
-                limit=limit,
-                message='Productos recuperados'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al obtener productos: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Parámetros de paginación
+        page, limit = validators.validate_pagination_params(
+            params.get('page'),
+            params.get('limit')
+        )
+        
+        # Buscar productos (solo la página solicitada)
+        Producto = request.env['renaix.producto'].sudo()
+        domain = [('propietario_id', '=', partner.id)]
+        
+        total = Producto.search_count(domain)
+        offset = (page - 1) * limit
+        productos_pagina = Producto.search(
+            domain, order='fecha_publicacion DESC, id DESC', limit=limit, offset=offset
+        )
+        
+        # Serializar
+        productos_data = serializers.serialize_productos(
+            productos_pagina, include_images=True, vista=validators.validate_vista(params),
+            **validators.validate_fieldsets(params)
+        )
+        
+        return response_helpers.paginated_response(
+            items=productos_data,
+            total=total,
+            page=page,
+            limit=limit,
+            message='Productos recuperados'
+        )
     
     
     @http.route('/api/v1/usuarios/perfil/compras', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
-    def get_mis_compras(self, **params):
+    @route_utils.endpoint('usuarios.get_mis_compras')
+    def get_mis_compras(self, partner, **params):
         """
         Obtener compras del usuario autenticado.
         
         Returns:
             JSON: {compras}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            # Buscar compras
-            compras = request.env['renaix.compra'].sudo().search([
-                ('comprador_id', '=', partner.id)
-            ], order='fecha_compra DESC')
-            
-            # Serializar
-            compras_data = [serializers.serialize_compra(c) for c in compras]
-            
-            return response_helpers.success_response(
-                data=compras_data,
-                message='Compras recuperadas'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al obtener compras: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Buscar compras
+        compras = request.env['renaix.compra'].sudo().search([
+            ('comprador_id', '=', partner.id)
+        ], order='fecha_compra DESC')
+        
+        # Serializar (en streaming, por lotes)
+        if validators.validate_vista(params) == 'tarjeta':
+            serializar = serializers.serialize_compras_tarjeta
+        else:
+            fieldsets = validators.validate_fieldsets(params)
+            serializar = lambda lote: [serializers.serialize_compra(c, **fieldsets) for c in lote]
+        
+        return response_helpers.stream_response(
+            compras,
+            serializar,
+            message='Compras recuperadas'
+        )
     
     
     @http.route('/api/v1/usuarios/perfil/ventas', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
-    def get_mis_ventas(self, **params):
+    @route_utils.endpoint('usuarios.get_mis_ventas')
+    def get_mis_ventas(self, partner, **params):
         """
         Obtener ventas del usuario autenticado.
         
         Returns:
             JSON: {ventas}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            # Buscar ventas
-            ventas = request.env['renaix.compra'].sudo().search([
-                ('vendedor_id', '=', partner.id)
-            ], order='fecha_compra DESC')
-            
-            # Serializar
-            ventas_data = [serializers.serialize_compra(v) for v in ventas]
-            
-            return response_helpers.success_response(
-                data=ventas_data,
-                message='Ventas recuperadas'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al obtener ventas: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Buscar ventas
+        ventas = request.env['renaix.compra'].sudo().search([
+            ('vendedor_id', '=', partner.id)
+        ], order='fecha_compra DESC')
+        
+        # Serializar (en streaming, por lotes)
+        if validators.validate_vista(params) == 'tarjeta':
+            serializar = serializers.serialize_compras_tarjeta
+        else:
+            fieldsets = validators.validate_fieldsets(params)
+            serializar = lambda lote: [serializers.serialize_compra(v, **fieldsets) for v in lote]
+        
+        return response_helpers.stream_response(
+            ventas,
+            serializar,
+            message='Ventas recuperadas'
+        )
     
     
     @http.route('/api/v1/usuarios/perfil/valoraciones', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
-    def get_mis_valoraciones(self, **params):
+    @route_utils.endpoint('usuarios.get_mis_valoraciones')
+    def get_mis_valoraciones(self, partner, **params):
         """
         Obtener valoraciones recibidas del usuario autenticado.
         
         Returns:
             JSON: {valoraciones}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            # Buscar valoraciones recibidas
-            valoraciones = request.env['renaix.valoracion'].sudo().search([
-                ('usuario_valorado_id', '=', partner.id)
-            ], order='fecha DESC')
-            
-            # Serializar
-            valoraciones_data = [serializers.serialize_valoracion(v) for v in valoraciones]
-            
-            return response_helpers.success_response(
-                data=valoraciones_data,
-                message='Valoraciones recuperadas'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al obtener valoraciones: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Buscar valoraciones recibidas
+        valoraciones = request.env['renaix.valoracion'].sudo().search([
+            ('usuario_valorado_id', '=', partner.id)
+        ], order='fecha DESC')
+        
+        # Serializar
+        fieldsets = validators.validate_fieldsets(params)
+        valoraciones_data = [serializers.serialize_valoracion(v, **fieldsets) for v in valoraciones]
+        
+        return response_helpers.success_response(
+            data=valoraciones_data,
+            message='Valoraciones recuperadas'
+        )
     
     
     @http.route('/api/v1/usuarios/perfil/estadisticas', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
-    def get_estadisticas(self, **params):
+    @route_utils.endpoint('usuarios.get_estadisticas')
+    def get_estadisticas(self, partner, **params):
         """
         Obtener estadísticas del usuario autenticado.
         
         Returns:
             JSON: {estadisticas}
         """
-        try:
-            # Verificar token
-            partner = jwt_utils.verify_token(request)
-            
-            estadisticas = {
-                'productos_en_venta': partner.productos_en_venta,
-                'productos_vendidos': partner.productos_vendidos,
-                'productos_comprados': partner.productos_comprados,
-                'valoracion_promedio': round(partner.valoracion_promedio, 2),
-                'total_comentarios': partner.total_comentarios,
-                'total_denuncias_realizadas': partner.total_denuncias_realizadas,
-            }
-            
-            return response_helpers.success_response(
-                data=estadisticas,
-                message='Estadísticas recuperadas'
-            )
-            
-        except Exception as e:
-            _logger.error(f'Error al obtener estadísticas: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        estadisticas = {
+            'productos_en_venta': partner.productos_en_venta,
+            'productos_vendidos': partner.productos_vendidos,
+            'productos_comprados': partner.productos_comprados,
+            'valoracion_promedio': round(partner.valoracion_promedio, 2),
+            'total_comentarios': partner.total_comentarios,
+            'total_denuncias_realizadas': partner.total_denuncias_realizadas,
+        }
+        
+        return response_helpers.success_response(
+            data=estadisticas,
+            message='Estadísticas recuperadas'
+        )
 
 
     @http.route('/api/v1/usuarios/<int:user_id>/productos', type='http', auth='none',
                 methods=['GET'], csrf=False, cors='*')
+    @route_utils.endpoint('usuarios.get_productos_usuario_publico', auth=False)
     def get_productos_usuario_publico(self, user_id, **params):
         """
         Obtener productos disponibles de un usuario público.
@@ -503,43 +423,44 @@ class UsuariosController(http.Controller):
         Returns:
             JSON: {productos} (paginado)
         """
-        try:
-            # Verificar que el usuario existe
-            partner = request.env['res.partner'].sudo().browse(user_id)
-
-            if not partner.exists() or not partner.es_usuario_app:
-                return response_helpers.not_found_response('Usuario no encontrado')
-
-            # Parámetros de paginación
-            page, limit = validators.validate_pagination_params(
-                params.get('page'),
-                params.get('limit')
-            )
-
-            # Buscar productos disponibles del usuario
-            productos = request.env['renaix.producto'].sudo().search([
-                ('propietario_id', '=', user_id),
-                ('active', '=', True),
-                ('estado_venta', '=', 'disponible')
-            ], order='fecha_publicacion DESC')
-
-            total = len(productos)
-            offset = (page - 1) * limit
-            productos_pagina = productos[offset:offset + limit]
-
-            productos_data = [serializers.serialize_producto(p, include_images=True) for p in productos_pagina]
-
-            return response_helpers.paginated_response(
-                items=productos_data,
-                total=total,
-                page=page,
-                limit=limit,
-                message='Productos recuperados'
-            )
-
-        except Exception as e:
-            _logger.error(f'Error al obtener productos del usuario: {str(e)}')
-            return response_helpers.server_error_response(str(e))
+        # Verificar que el usuario existe
+        partner = request.env['res.partner'].sudo().browse(user_id)
+
+        if not partner.exists() or not partner.es_usuario_app:
+            return response_helpers.not_found_response('Usuario no encontrado')
+
+        # Parámetros de paginación
+        page, limit = validators.validate_pagination_params(
+            params.get('page'),
+            params.get('limit')
+        )
+
+        # Buscar productos disponibles del usuario (solo la página solicitada)
+        Producto = request.env['renaix.producto'].sudo()
+        domain = [
+            ('propietario_id', '=', user_id),
+            ('active', '=', True),
+            ('estado_venta', '=', 'disponible')
+        ]
+
+        total = Producto.search_count(domain)
+        offset = (page - 1) * limit
+        productos_pagina = Producto.search(
+            domain, order='fecha_publicacion DESC, id DESC', limit=limit, offset=offset
+        )
+
+        productos_data = serializers.serialize_productos(
+            productos_pagina, include_images=True, vista=validators.validate_vista(params),
+            **validators.validate_fieldsets(params)
+        )
+
+        return response_helpers.paginated_response(
+            items=productos_data,
+            total=total,
+            page=page,
+            limit=limit,
+            message='Productos recuperados'
+        )
 
 
     @http.route('/api/v1/usuarios/<int:partner_id>/imagen', type='http', auth='none',
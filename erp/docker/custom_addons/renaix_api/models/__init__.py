@@ -1,3 +1,12 @@
 # -*- coding: utf-8 -*-
 
 from . import utils
+
+from . import producto
+from . import producto_imagen
+from . import etiqueta
+from . import categoria
+from . import busqueda_guardada
+from . import res_partner
+from . import refresh_token
+from . import token_revocado
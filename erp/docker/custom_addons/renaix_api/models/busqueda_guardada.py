@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from collections import defaultdict
+from odoo import models, fields, api
+from odoo.tools import SQL
+from .utils import search_helpers
+from ..config import settings
+
+_logger = logging.getLogger(__name__)
+
+# Filtros que el índice inverso no resuelve: requieren evaluar la búsqueda
+# completa (texto, ubicación, cercanía) sobre el producto publicado
+_FILTROS_RESIDUALES = ('query', 'ubicacion', 'lat')
+
+
+class BusquedaGuardada(models.Model):
+    """
+    Modelo: Búsqueda Guardada
+    Descripción: Filtros de /productos/buscar guardados por un usuario para
+                 recibir avisos cuando se publique un producto que coincida.
+
+    Categoría, etiquetas, estado y rango de precio se copian de los filtros a
+    columnas indexadas (índice inverso): al publicar un producto solo se
+    evalúan las búsquedas que pueden coincidir con él.
+    """
+    _name = 'renaix.busqueda.guardada'
+    _description = 'Búsqueda Guardada'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(
+        string='Nombre',
+        required=True,
+        help='Nombre descriptivo (ej: "iPhone barato en Valencia")'
+    )
+
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Usuario',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+
+    filtros = fields.Json(
+        string='Filtros',
+        required=True,
+        help='Filtros validados por validators.validate_search_filters'
+    )
+
+    active = fields.Boolean(
+        string='Activa',
+        default=True,
+    )
+
+    # Índice inverso (derivado de filtros en create/write)
+    categoria_id = fields.Many2one(
+        'renaix.categoria',
+        string='Categoría',
+        ondelete='cascade',
+        index=True,
+    )
+
+    etiqueta_ids = fields.Many2many(
+        'renaix.etiqueta',
+        'renaix_busqueda_guardada_etiqueta_rel',
+        'busqueda_id',
+        'etiqueta_id',
+        string='Etiquetas',
+    )
+
+    estado_producto = fields.Char(
+        string='Estado del producto',
+        index=True,
+    )
+
+    precio_min = fields.Float(
+        string='Precio mínimo',
+        index=True,
+        help='0 = sin mínimo'
+    )
+
+    precio_max = fields.Float(
+        string='Precio máximo',
+        index=True,
+        help='0 = sin máximo'
+    )
+
+    coincidencia_ids = fields.One2many(
+        'renaix.busqueda.guardada.coincidencia',
+        'busqueda_id',
+        string='Coincidencias',
+    )
+
+    @api.model
+    def _valores_indice(self, filtros):
+        """
+        Columnas del índice inverso a partir de los filtros.
+
+        Args:
+            filtros (dict): Filtros validados
+
+        Returns:
+            dict: Valores de categoria_id, etiqueta_ids, estado_producto y precios
+        """
+        etiqueta_ids = []
+        for etiqueta in filtros.get('etiquetas') or []:
+            try:
+                etiqueta_ids.append(int(etiqueta))
+            except (ValueError, TypeError):
+                pass
+
+        return {
+            'categoria_id': filtros.get('categoria_id') or False,
+            'etiqueta_ids': [(6, 0, etiqueta_ids)],
+            'estado_producto': filtros.get('estado_producto') or False,
+            'precio_min': filtros.get('precio_min') or 0.0,
+            'precio_max': filtros.get('precio_max') or 0.0,
+        }
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('filtros'):
+                vals.update(self._valores_indice(vals['filtros']))
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if vals.get('filtros'):
+            vals = dict(vals, **self._valores_indice(vals['filtros']))
+        return super().write(vals)
+
+    @api.model
+    def _candidatas_domain(self, producto):
+        """
+        Dominio de las búsquedas que pueden coincidir con un producto según el
+        índice inverso (sin evaluar texto, ubicación ni cercanía).
+
+        Args:
+            producto: Recordset de renaix.producto (un registro)
+
+        Returns:
+            list: Dominio sobre renaix.busqueda.guardada
+        """
+        return [
+            ('active', '=', True),
+            ('partner_id', '!=', producto.propietario_id.id),
+            '|', ('categoria_id', '=', False), ('categoria_id', '=', producto.categoria_id.id),
+            '|', ('estado_producto', '=', False), ('estado_producto', '=', producto.estado_producto),
+            ('precio_min', '<=', producto.precio),
+            '|', ('precio_max', '=', 0), ('precio_max', '>=', producto.precio),
+            '|', ('etiqueta_ids', '=', False), ('etiqueta_ids', 'in', producto.etiqueta_ids.ids),
+        ]
+
+    def _coincidentes_con(self, producto):
+        """
+        Evalúa las búsquedas completas (mismo SQL que /productos/buscar)
+        restringidas a un producto, todas en una sola consulta.
+
+        Las búsquedas sin texto, ubicación ni cercanía ya coinciden por el
+        índice inverso. Las demás se combinan en un UNION ALL de
+        "SELECT id WHERE EXISTS (búsqueda AND producto = id)": cada rama
+        accede al producto por su clave primaria.
+
+        Args:
+            producto: Recordset de renaix.producto (un registro)
+
+        Returns:
+            renaix.busqueda.guardada: Búsquedas en cuyos resultados aparecería
+        """
+        residuales = self.filtered(
+            lambda b: any((b.filtros or {}).get(clave) for clave in _FILTROS_RESIDUALES)
+        )
+        coincidentes = self - residuales
+        if not residuales:
+            return coincidentes
+
+        Producto = self.env['renaix.producto'].sudo()
+        ramas = []
+        for busqueda in residuales:
+            filtros = busqueda.filtros
+            domain = search_helpers.build_search_domain(filtros) + [('id', '=', producto.id)]
+            query = search_helpers.build_search_query(Producto, domain, filtros, limit=1)
+            ramas.append(SQL('SELECT %s WHERE EXISTS (%s)', busqueda.id, query.select(SQL('1'))))
+
+        # execute_query vuelca antes los campos del producto que usa la consulta:
+        # al publicar, estado_venta y fecha_publicacion aún están solo en el ORM
+        rows = self.env.execute_query(SQL(' UNION ALL ').join(ramas))
+        return coincidentes | self.browse([row[0] for row in rows])
+
+    @api.model
+    def _encolar_coincidencias(self, productos):
+        """
+        Encola las coincidencias de productos recién publicados con las
+        búsquedas guardadas. El aviso se envía después, por lotes (cron).
+
+        Args:
+            productos: Recordset de renaix.producto publicados
+
+        Returns:
+            int: Número de coincidencias encoladas
+        """
+        Coincidencia = self.env['renaix.busqueda.guardada.coincidencia'].sudo()
+        vals_list = []
+
+        # Un producto republicado no vuelve a avisar a las mismas búsquedas
+        existentes = {
+            (c.busqueda_id.id, c.producto_id.id)
+            for c in Coincidencia.search([('producto_id', 'in', productos.ids)])
+        }
+
+        for producto in productos:
+            candidatas = self.sudo().search(self._candidatas_domain(producto)).filtered(
+                lambda b: (b.id, producto.id) not in existentes
+            )
+            if not candidatas:
+                continue
+            # Una consulta por producto, sea cual sea el número de candidatas
+            for busqueda in candidatas._coincidentes_con(producto):
+                vals_list.append({
+                    'busqueda_id': busqueda.id,
+                    'producto_id': producto.id,
+                })
+
+        if vals_list:
+            Coincidencia.create(vals_list)
+            _logger.info(f'{len(vals_list)} coincidencias de búsquedas guardadas encoladas')
+
+        return len(vals_list)
+
+
+class BusquedaGuardadaCoincidencia(models.Model):
+    """
+    Modelo: Coincidencia de Búsqueda Guardada
+    Descripción: Cola de avisos pendientes (producto publicado que coincide con
+                 una búsqueda guardada)
+    """
+    _name = 'renaix.busqueda.guardada.coincidencia'
+    _description = 'Coincidencia de Búsqueda Guardada'
+    _order = 'create_date desc, id desc'
+
+    busqueda_id = fields.Many2one(
+        'renaix.busqueda.guardada',
+        string='Búsqueda',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+
+    partner_id = fields.Many2one(
+        related='busqueda_id.partner_id',
+        store=True,
+        index=True,
+    )
+
+    producto_id = fields.Many2one(
+        'renaix.producto',
+        string='Producto',
+        required=True,
+        ondelete='cascade',
+    )
+
+    estado = fields.Selection([
+        ('pendiente', 'Pendiente'),
+        ('notificada', 'Notificada'),
+    ], string='Estado',
+       default='pendiente',
+       required=True,
+       index=True,
+    )
+
+    fecha_notificacion = fields.Datetime(
+        string='Fecha de notificación',
+    )
+
+    leida = fields.Boolean(
+        string='Leída',
+        default=False,
+    )
+
+    _sql_constraints = [
+        ('busqueda_producto_unique', 'UNIQUE(busqueda_id, producto_id)',
+         'El producto ya está registrado para esta búsqueda.')
+    ]
+
+    @api.model
+    def _cron_notificar(self):
+        """
+        Procesa un lote de coincidencias pendientes agrupadas por usuario:
+        un aviso por usuario con todos sus productos nuevos del lote.
+        """
+        pendientes = self.search(
+            [('estado', '=', 'pendiente')],
+            order='id',
+            limit=settings.SAVED_SEARCH_NOTIFY_BATCH_SIZE,
+        )
+        if not pendientes:
+            return
+
+        por_usuario = defaultdict(lambda: self.browse())
+        for coincidencia in pendientes:
+            por_usuario[coincidencia.partner_id] |= coincidencia
+
+        for partner, coincidencias in por_usuario.items():
+            # Nota: el envío push/email iría aquí. De momento solo se registra
+            # y la app lo consulta en /api/v1/busquedas-guardadas/avisos
+            _logger.info(
+                f'Aviso de búsquedas guardadas para usuario {partner.id}: '
+                f'{len(coincidencias)} productos nuevos'
+            )
+
+        pendientes.write({
+            'estado': 'notificada',
+            'fecha_notificacion': fields.Datetime.now(),
+        })
+
+        # Quedan más pendientes: volver a ejecutar el cron en cuanto termine
+        if len(pendientes) == settings.SAVED_SEARCH_NOTIFY_BATCH_SIZE:
+            self.env.ref('renaix_api.ir_cron_notificar_busquedas_guardadas')._trigger()
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+from .utils import cache_utils
+
+
+class Categoria(models.Model):
+    """
+    Extiende renaix.categoria para invalidar las búsquedas y sugerencias
+    cacheadas de la API (incluyen el nombre de la categoría)
+    """
+    _inherit = 'renaix.categoria'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        categorias = super().create(vals_list)
+        cache_utils.bump_search_generation(self.env)
+        return categorias
+
+    def write(self, vals):
+        result = super().write(vals)
+        cache_utils.bump_search_generation(self.env)
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        cache_utils.bump_search_generation(self.env)
+        return result
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+from .utils import cache_utils
+
+
+class Etiqueta(models.Model):
+    """
+    Extiende renaix.etiqueta para invalidar las búsquedas cacheadas de la API
+    cuando cambia la relación producto-etiqueta o el nombre de la etiqueta
+    """
+    _inherit = 'renaix.etiqueta'
+
+    def write(self, vals):
+        result = super().write(vals)
+        if 'name' in vals or 'producto_ids' in vals:
+            cache_utils.bump_search_generation(self.env)
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        cache_utils.bump_search_generation(self.env)
+        return result
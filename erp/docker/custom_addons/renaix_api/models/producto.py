@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+from .utils import cache_utils
+
+
+class Producto(models.Model):
+    """
+    Extiende renaix.producto para invalidar las búsquedas cacheadas de la API
+    y avisar a las búsquedas guardadas al publicar
+    """
+    _inherit = 'renaix.producto'
+
+    def init(self):
+        super().init()
+        cache_utils.init_search_generation(self.env.cr)
+
+    @api.model
+    def create(self, vals):
+        producto = super().create(vals)
+        cache_utils.bump_search_generation(self.env)
+        return producto
+
+    def write(self, vals):
+        result = super().write(vals)
+        cache_utils.bump_search_generation(self.env)
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        cache_utils.bump_search_generation(self.env)
+        return result
+
+    def action_publicar(self):
+        borradores = self.filtered(lambda p: p.estado_venta == 'borrador')
+        result = super().action_publicar()
+        
+        publicados = borradores.filtered(lambda p: p.estado_venta == 'disponible')
+        if publicados:
+            self.env['renaix.busqueda.guardada'].sudo()._encolar_coincidencias(publicados)
+        
+        return result
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+from .utils import cache_utils
+
+
+class ProductoImagen(models.Model):
+    """
+    Extiende renaix.producto.imagen para invalidar las búsquedas cacheadas de la API
+    """
+    _inherit = 'renaix.producto.imagen'
+
+    @api.model
+    def create(self, vals):
+        imagen = super().create(vals)
+        cache_utils.bump_search_generation(self.env)
+        return imagen
+
+    def write(self, vals):
+        result = super().write(vals)
+        cache_utils.bump_search_generation(self.env)
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        cache_utils.bump_search_generation(self.env)
+        return result
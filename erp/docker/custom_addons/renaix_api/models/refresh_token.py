@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import logging
+from odoo import models, fields, api
+from ..config import settings
+
+_logger = logging.getLogger(__name__)
+
+
+class RefreshToken(models.Model):
+    """
+    Modelo: Refresh Token
+    Descripción: Sesiones de la app (una por dispositivo). Se guarda solo el
+                 SHA-256 del refresh token: renovar es una búsqueda por índice
+                 y cerrar sesión en un dispositivo no afecta a los demás.
+    """
+    _name = 'renaix.refresh.token'
+    _description = 'Refresh Token'
+    _order = 'create_date desc, id desc'
+    _rec_name = 'dispositivo'
+
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Usuario',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+
+    # Sin index=True: la restricción UNIQUE ya crea el índice
+    token_hash = fields.Char(
+        string='Hash del token',
+        required=True,
+        help='SHA-256 (hex) del refresh token'
+    )
+
+    dispositivo = fields.Char(
+        string='Dispositivo',
+        help='Nombre del dispositivo o User-Agent de la app'
+    )
+
+    fecha_expiracion = fields.Datetime(
+        string='Fecha de expiración',
+        required=True,
+        index=True,
+    )
+
+    revocado = fields.Boolean(
+        string='Revocado',
+        default=False,
+    )
+
+    _sql_constraints = [
+        ('token_hash_unique', 'UNIQUE(token_hash)', 'El refresh token ya existe.')
+    ]
+
+    def init(self):
+        # Los refresh tokens antiguos (en claro en res_partner.api_token) ya no
+        # se aceptan: no dejarlos guardados en la BD
+        self.env.cr.execute('UPDATE res_partner SET api_token = NULL WHERE api_token IS NOT NULL')
+
+    @api.model
+    def _hash(self, token):
+        """
+        Args:
+            token (str): Refresh token JWT
+
+        Returns:
+            str: SHA-256 del token (hex)
+        """
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @api.model
+    def _registrar(self, partner, token, expiracion, dispositivo=None):
+        """
+        Guarda un refresh token recién emitido.
+
+        Args:
+            partner: Recordset de res.partner
+            token (str): Refresh token JWT
+            expiracion (datetime): Fecha de expiración (UTC)
+            dispositivo (str): Nombre del dispositivo (opcional)
+
+        Returns:
+            renaix.refresh.token: Sesión creada
+        """
+        return self.sudo().create({
+            'partner_id': partner.id,
+            'token_hash': self._hash(token),
+            'dispositivo': (dispositivo or '')[:settings.REFRESH_TOKEN_DEVICE_MAX_LENGTH] or False,
+            'fecha_expiracion': expiracion,
+        })
+
+    @api.model
+    def _buscar_valido(self, token):
+        """
+        Sesión vigente de un refresh token, con el usuario activo (una consulta
+        por el índice de token_hash).
+
+        Args:
+            token (str): Refresh token JWT
+
+        Returns:
+            renaix.refresh.token: Sesión (vacío si no existe, está revocada o ha caducado)
+        """
+        return self.sudo().search([
+            ('token_hash', '=', self._hash(token)),
+            ('revocado', '=', False),
+            ('fecha_expiracion', '>', fields.Datetime.now()),
+            ('partner_id.es_usuario_app', '=', True),
+            ('partner_id.cuenta_activa', '=', True),
+        ], limit=1)
+
+    @api.model
+    def _cron_purgar(self):
+        """
+        Borra por lotes las sesiones caducadas o revocadas.
+        """
+        caducados = self.search(
+            ['|', ('fecha_expiracion', '<', fields.Datetime.now()), ('revocado', '=', True)],
+            order='id',
+            limit=settings.REFRESH_TOKEN_PURGE_BATCH_SIZE,
+        )
+        if not caducados:
+            return
+
+        total = len(caducados)
+        caducados.unlink()
+        _logger.info(f'{total} refresh tokens caducados o revocados eliminados')
+
+        # Quedan más: volver a ejecutar el cron en cuanto termine
+        if total == settings.REFRESH_TOKEN_PURGE_BATCH_SIZE:
+            self.env.ref('renaix_api.ir_cron_purgar_refresh_tokens')._trigger()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from odoo import models, fields, api
+from .utils import cache_utils, auth_helpers, rate_limit_utils
+
+_logger = logging.getLogger(__name__)
+
+# Campos que deciden si un access token es válido para el usuario
+_CAMPOS_ACCESO = ('cuenta_activa', 'es_usuario_app', 'active')
+
+
+class ResPartner(models.Model):
+    """
+    Extiende res.partner para invalidar los tokens verificados en caché
+    al activar/desactivar cuentas o borrar usuarios, y para hashear las
+    contraseñas con el backend de auth_helpers (argon2id o PBKDF2).
+    Crea también la tabla de buckets del límite de peticiones de la API.
+    """
+    _inherit = 'res.partner'
+
+    def init(self):
+        super().init()
+        cache_utils.init_generation(self.env.cr, cache_utils.AUTH_GENERATION_SEQUENCE)
+        rate_limit_utils.init_table(self.env.cr)
+
+    def write(self, vals):
+        result = super().write(vals)
+        if any(campo in vals for campo in _CAMPOS_ACCESO):
+            cache_utils.bump_generation(self.env, cache_utils.AUTH_GENERATION_SEQUENCE)
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        cache_utils.bump_generation(self.env, cache_utils.AUTH_GENERATION_SEQUENCE)
+        return result
+
+    def set_password(self, password):
+        """
+        Establece la contraseña del usuario de la app (hasheada con el
+        backend configurado).
+
+        Args:
+            password (str): Contraseña en texto plano
+        """
+        self.ensure_one()
+        if not self.es_usuario_app:
+            raise ValueError('Solo se puede establecer contraseña para usuarios de la app')
+
+        self.password_hash = auth_helpers.hash_password(password)
+
+    @api.model
+    def authenticate_app_user(self, email, password):
+        """
+        Autentica un usuario de la app mediante email y contraseña.
+
+        Si el hash guardado usa otro algoritmo o coste que el configurado, se
+        regenera con la contraseña recién verificada.
+
+        Args:
+            email (str): Email del usuario
+            password (str): Contraseña en texto plano
+
+        Returns:
+            res.partner: Registro del usuario si la autenticación es exitosa, False si no
+
+        Raises:
+            auth_helpers.PasswordHashBusy: Si hay demasiados logins simultáneos
+        """
+        partner = self.search([
+            ('email', '=', email),
+            ('es_usuario_app', '=', True),
+            ('cuenta_activa', '=', True)
+        ], limit=1)
+
+        if not partner or not partner.password_hash:
+            return False
+
+        if not auth_helpers.verify_password(password, partner.password_hash):
+            return False
+
+        vals = {'fecha_ultima_actividad': fields.Datetime.now()}
+        if auth_helpers.password_needs_rehash(partner.password_hash):
+            vals['password_hash'] = auth_helpers.hash_password(password)
+        partner.write(vals)
+        return partner
+
+    @api.model
+    def _cron_purgar_rate_limit(self):
+        """
+        Borra los buckets del límite de peticiones que ya están llenos.
+        """
+        total = rate_limit_utils.purge(self.env.cr)
+        if total:
+            _logger.info(f'{total} buckets de límite de peticiones eliminados')
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from odoo import models, fields, api
+from .utils import cache_utils
+from ..config import settings
+
+_logger = logging.getLogger(__name__)
+
+
+class TokenRevocado(models.Model):
+    """
+    Modelo: Access Token Revocado
+    Descripción: Lista de revocación de access tokens (por jti) antes de que
+                 caduquen, p.ej. al cerrar sesión. Cada worker la replica en
+                 memoria (revocation_utils.revocation_filter) y solo la relee
+                 cuando cambia la generación de revocaciones.
+    """
+    _name = 'renaix.token.revocado'
+    _description = 'Access Token Revocado'
+    _order = 'id desc'
+    _rec_name = 'jti'
+
+    # Sin index=True: la restricción UNIQUE ya crea el índice
+    jti = fields.Char(
+        string='JTI',
+        required=True,
+        help='Identificador único del access token (claim jti)'
+    )
+
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Usuario',
+        ondelete='cascade',
+        index=True,
+    )
+
+    fecha_expiracion = fields.Datetime(
+        string='Fecha de expiración',
+        required=True,
+        index=True,
+        help='Expiración del token: a partir de aquí la fila ya no es necesaria'
+    )
+
+    _sql_constraints = [
+        ('jti_unique', 'UNIQUE(jti)', 'El token ya está revocado.')
+    ]
+
+    def init(self):
+        cache_utils.init_generation(self.env.cr, cache_utils.REVOCATION_GENERATION_SEQUENCE)
+
+    @api.model
+    def _revocar(self, jti, expiracion, partner=None):
+        """
+        Revoca un access token (los workers lo ven tras el commit).
+
+        Idempotente: dos logouts simultáneos con el mismo token no chocan con
+        la restricción UNIQUE (INSERT ... ON CONFLICT DO NOTHING).
+
+        Args:
+            jti (str): Claim jti del token
+            expiracion (datetime): Expiración del token (UTC)
+            partner: Recordset de res.partner (opcional)
+        """
+        self.env.cr.execute("""
+            INSERT INTO renaix_token_revocado
+                   (jti, partner_id, fecha_expiracion, create_uid, create_date, write_uid, write_date)
+            VALUES (%(jti)s, %(partner_id)s, %(expiracion)s,
+                    %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC')
+            ON CONFLICT (jti) DO NOTHING
+            RETURNING id
+        """, {
+            'jti': jti,
+            'partner_id': partner.id if partner else None,
+            'expiracion': expiracion,
+            'uid': self.env.uid,
+        })
+        if not self.env.cr.fetchone():
+            return  # Ya estaba revocado
+        cache_utils.bump_generation(self.env, cache_utils.REVOCATION_GENERATION_SEQUENCE)
+
+    @api.model
+    def _cron_purgar(self):
+        """
+        Borra por lotes las revocaciones de tokens ya caducados.
+        """
+        caducados = self.search(
+            [('fecha_expiracion', '<', fields.Datetime.now())],
+            order='id',
+            limit=settings.REVOKED_TOKEN_PURGE_BATCH_SIZE,
+        )
+        if not caducados:
+            return
+
+        total = len(caducados)
+        caducados.unlink()
+        _logger.info(f'{total} revocaciones de access tokens caducados eliminadas')
+
+        # Quedan más: volver a ejecutar el cron en cuanto termine
+        if total == settings.REVOKED_TOKEN_PURGE_BATCH_SIZE:
+            self.env.ref('renaix_api.ir_cron_purgar_tokens_revocados')._trigger()
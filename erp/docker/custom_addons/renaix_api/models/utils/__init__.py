@@ -1,7 +1,16 @@
 # -*- coding: utf-8 -*-
 
+from . import activity_utils
+from . import revocation_utils
+from . import rate_limit_utils
 from . import jwt_utils
 from . import auth_helpers
 from . import validators
 from . import serializers
+from . import json_utils
+from . import compression_utils
 from . import response_helpers
+from . import search_helpers
+from . import cache_utils
+from . import etag_utils
+from . import route_utils
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Registro agrupado de la última actividad de los usuarios de la app
+
+verify_token no escribe en res_partner en cada petición: la hora se anota
+en memoria y un temporizador del worker la vuelca, como mucho
+ACTIVITY_FLUSH_INTERVAL_SECONDS después, con un único UPDATE en bloque en un
+cursor propio. Las peticiones autenticadas de lectura no abren así una
+transacción de escritura sobre el usuario.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from odoo import fields
+from ...config import settings
+
+_logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """
+    Últimas actividades pendientes de guardar, por BD (por worker).
+
+    El volcado no depende de que lleguen más peticiones: la primera actividad
+    pendiente arranca un temporizador (hilo daemon) que vuelca al cumplirse el
+    intervalo, aunque el worker quede inactivo. Al terminar el proceso de
+    forma ordenada (reciclado por limit_request o limit_memory_soft, parada
+    del servidor) se vuelca lo pendiente. Solo si el proceso muere de golpe
+    (SIGKILL, limit_time_real) se pierde como mucho un intervalo.
+    """
+
+    def __init__(self):
+        self._pending = {}      # {dbname: {partner_id: datetime}}
+        self._registries = {}   # {dbname: registry}
+        self._timer = None
+        self._timer_pid = None
+        self._lock = threading.Lock()
+        self.flushes = 0
+
+    def touch(self, partner):
+        """
+        Anota la actividad de un usuario y programa el volcado si no lo está.
+
+        Args:
+            partner: Recordset de res.partner (un registro)
+        """
+        env = partner.env
+        now = fields.Datetime.now()
+        with self._lock:
+            self._pending.setdefault(env.cr.dbname, {})[partner.id] = now
+            self._registries[env.cr.dbname] = env.registry
+            # Un temporizador creado antes de un fork no existe en el hijo
+            if self._timer is None or self._timer_pid != os.getpid():
+                self._timer = threading.Timer(settings.ACTIVITY_FLUSH_INTERVAL_SECONDS, self._on_timer)
+                self._timer.daemon = True
+                self._timer_pid = os.getpid()
+                self._timer.start()
+
+    def _on_timer(self):
+        """Volcado programado: el siguiente touch() vuelve a programarlo."""
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def flush(self):
+        """
+        Guarda las actividades pendientes: un UPDATE por BD.
+
+        Solo se actualizan las filas cuyo valor guardado sea anterior en más
+        de ACTIVITY_MIN_UPDATE_SECONDS (menos escrituras en usuarios muy
+        activos). No se modifica write_date: la actividad no cambia los
+        datos del usuario ni invalida sus cachés y ETags.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            registries = dict(self._registries)
+
+        for dbname, actividades in pending.items():
+            if not actividades:
+                continue
+            try:
+                with registries[dbname].cursor() as cr:
+                    cr.execute("""
+                        UPDATE res_partner AS p
+                           SET fecha_ultima_actividad = v.fecha
+                          FROM (SELECT unnest(%s::int[]) AS id, unnest(%s::timestamp[]) AS fecha) AS v
+                         WHERE p.id = v.id
+                           AND (p.fecha_ultima_actividad IS NULL
+                                OR p.fecha_ultima_actividad < v.fecha - make_interval(secs => %s))
+                    """, [list(actividades), list(actividades.values()), settings.ACTIVITY_MIN_UPDATE_SECONDS])
+                self.flushes += 1
+            except Exception as e:
+                _logger.warning(f'No se pudo guardar la última actividad ({len(actividades)} usuarios): {str(e)}')
+
+    def stats(self):
+        """
+        Returns:
+            dict: {pendientes, volcados}
+        """
+        with self._lock:
+            pendientes = sum(len(actividades) for actividades in self._pending.values())
+        return {'pendientes': pendientes, 'volcados': self.flushes}
+
+
+activity_tracker = ActivityTracker()
+
+# Salida ordenada del worker: guardar lo pendiente antes de terminar
+atexit.register(activity_tracker.flush)
@@ -4,13 +4,129 @@ Helpers para autenticación y gestión de passwords
 """
 
 import re
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.security import generate_password_hash, check_password_hash
 from ...config import settings
 
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:
+    PasswordHasher = None
+
+_logger = logging.getLogger(__name__)
+
+
+class PasswordHashBusy(Exception):
+    """Demasiadas verificaciones de contraseña en curso en este worker."""
+
+
+class Argon2Backend:
+    """Hash argon2id (requiere: pip install argon2-cffi)."""
+
+    name = 'argon2id'
+
+    def __init__(self):
+        self._hasher = PasswordHasher(
+            time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+            memory_cost=settings.PASSWORD_ARGON2_MEMORY_COST,
+            parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+        )
+
+    @staticmethod
+    def handles(password_hash):
+        return password_hash.startswith('$argon2')
+
+    def hash(self, password):
+        return self._hasher.hash(password)
+
+    def verify(self, password, password_hash):
+        try:
+            return self._hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, password_hash):
+        return not password_hash.startswith('$argon2id$') or self._hasher.check_needs_rehash(password_hash)
+
+
+class Pbkdf2Backend:
+    """Hash PBKDF2-SHA256 de werkzeug (sin dependencias)."""
+
+    name = 'pbkdf2'
+
+    @property
+    def method(self):
+        return f'pbkdf2:sha256:{settings.PASSWORD_PBKDF2_ITERATIONS}'
+
+    @staticmethod
+    def handles(password_hash):
+        # Formato werkzeug: "método$sal$hash" (pbkdf2, scrypt...)
+        return not password_hash.startswith('$')
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, password, password_hash):
+        return check_password_hash(password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.method
+
+
+def _make_backend():
+    if settings.PASSWORD_HASH_ALGORITHM == 'argon2id':
+        if PasswordHasher is not None:
+            return Argon2Backend()
+        _logger.warning('argon2-cffi no está instalado: se usa PBKDF2 para las contraseñas')
+    return Pbkdf2Backend()
+
+
+# Backend para los hashes nuevos; los antiguos se verifican con el que los generó
+password_backend = _make_backend()
+_backends = [password_backend]
+if PasswordHasher is not None and password_backend.name != Argon2Backend.name:
+    _backends.append(Argon2Backend())
+if password_backend.name != Pbkdf2Backend.name:
+    _backends.append(Pbkdf2Backend())
+
+# Verificaciones en un pool acotado: una ráfaga de logins no acapara el worker.
+# Las peticiones que no consiguen turno en PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS
+# reciben PasswordHashBusy (503) en lugar de esperar indefinidamente
+_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    thread_name_prefix='renaix_password',
+)
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+
+
+def _run_in_pool(func, *args):
+    """
+    Ejecuta un cálculo de hash en el pool acotado.
+
+    Raises:
+        PasswordHashBusy: Si no hay hueco en el tiempo de espera configurado
+    """
+    if not _hash_slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS):
+        raise PasswordHashBusy('Demasiados inicios de sesión simultáneos, inténtalo de nuevo')
+    try:
+        return _hash_pool.submit(func, *args).result()
+    finally:
+        _hash_slots.release()
+
+
+def _backend_for(password_hash):
+    for backend in _backends:
+        if backend.handles(password_hash):
+            return backend
+    return None
+
 
 def hash_password(password):
     """
-    Hashea una contraseña usando werkzeug.
+    Hashea una contraseña con el backend configurado (argon2id o PBKDF2).
     
     Args:
         password (str): Contraseña en texto plano
@@ -18,12 +134,12 @@ def hash_password(password):
     Returns:
         str: Hash de la contraseña
     """
-    return generate_password_hash(password)
+    return _run_in_pool(password_backend.hash, password)
 
 
 def verify_password(password, password_hash):
     """
-    Verifica si una contraseña coincide con su hash.
+    Verifica si una contraseña coincide con su hash (de cualquier backend).
     
     Args:
         password (str): Contraseña en texto plano
@@ -31,10 +147,31 @@ def verify_password(password, password_hash):
     
     Returns:
         bool: True si coincide, False si no
+    
+    Raises:
+        PasswordHashBusy: Si el pool de verificación está saturado
     """
     if not password_hash:
         return False
-    return check_password_hash(password_hash, password)
+    backend = _backend_for(password_hash)
+    if backend is None:
+        _logger.warning('Hash de contraseña en un formato no soportado (¿falta argon2-cffi?)')
+        return False
+    return _run_in_pool(backend.verify, password, password_hash)
+
+
+def password_needs_rehash(password_hash):
+    """
+    Indica si un hash se generó con otro algoritmo o con otros parámetros de
+    coste que los configurados (se vuelve a hashear en el siguiente login).
+    
+    Args:
+        password_hash (str): Hash almacenado
+    
+    Returns:
+        bool: True si hay que regenerarlo
+    """
+    return not password_backend.handles(password_hash) or password_backend.needs_rehash(password_hash)
 
 
 def validate_email_format(email):
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Cachés en memoria (por proceso/worker de Odoo) para la API
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from ...config import settings
+
+_logger = logging.getLogger(__name__)
+
+# Secuencia de PostgreSQL usada como contador de generación de las búsquedas.
+# Es común a todos los workers: incrementarla invalida sus cachés de búsqueda.
+SEARCH_GENERATION_SEQUENCE = 'renaix_api_search_generation'
+
+# Ídem para la caché de tokens verificados: se incrementa al activar/desactivar
+# cuentas y al borrar usuarios (cambios que afectan a todos sus tokens)
+AUTH_GENERATION_SEQUENCE = 'renaix_api_auth_generation'
+
+# Revocaciones de access tokens (logout): solo obliga a releer la lista de
+# revocación; no invalida la caché de tokens verificados
+REVOCATION_GENERATION_SEQUENCE = 'renaix_api_revocation_generation'
+
+
+class LRUCache:
+    """
+    Caché LRU con caducidad (TTL), límite opcional de tamaño en bytes y
+    contadores de aciertos/fallos.
+
+    Es segura entre hilos (modo multi-thread de Odoo). Cada worker en modo
+    prefork tiene su propia instancia.
+    """
+
+    def __init__(self, name, max_entries, ttl=None, max_bytes=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Devuelve el valor cacheado o None si no existe o ha caducado.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires, size = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.bytes -= size
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """
+        Guarda un valor, expulsando las entradas menos usadas si está llena
+        (por número de entradas o por tamaño).
+        """
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        size = self._sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._data[key] = (value, expires, size)
+            self.bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes):
+                _key, (_value, _expires, evicted_size) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+
+    @staticmethod
+    def _sizeof(value):
+        """Tamaño aproximado de un valor: longitud de su JSON (o de los bytes)."""
+        if isinstance(value, bytes):
+            return len(value)
+        return len(json.dumps(value, default=str))
+
+    def clear(self):
+        """Vacía la caché (los contadores se mantienen)."""
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """
+        Estadísticas de uso de la caché.
+
+        Returns:
+            dict: {entries, max_entries, bytes, max_bytes, hits, misses, hit_ratio}
+        """
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._data),
+            'max_entries': self.max_entries,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Resultados de búsqueda: listas ordenadas de ids de producto por filtros + página
+search_cache = LRUCache(
+    'busquedas',
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+)
+
+
+def make_key(*parts):
+    """
+    Construye una clave hashable y estable a partir de dicts/listas.
+
+    Args:
+        *parts: Partes de la clave (dicts, listas o valores simples)
+
+    Returns:
+        tuple: Clave normalizada
+    """
+    def normalize(value):
+        if isinstance(value, dict):
+            return tuple(sorted((k, normalize(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple, set)):
+            return tuple(normalize(v) for v in value)
+        return value
+
+    return tuple(normalize(part) for part in parts)
+
+
+def init_generation(cr, sequence):
+    """Crea la secuencia de un contador de generación si no existe."""
+    cr.execute(f'CREATE SEQUENCE IF NOT EXISTS {sequence}')
+
+
+def get_generation(cr, sequence):
+    """
+    Generación actual de un contador (común a todos los workers).
+    
+    Args:
+        cr: Cursor de la BD
+        sequence: Nombre de la secuencia del contador
+    
+    Returns:
+        int: Valor actual del contador
+    """
+    cr.execute(f'SELECT last_value, is_called FROM {sequence}')
+    last_value, is_called = cr.fetchone()
+    return last_value if is_called else 0
+
+
+def get_generations(cr, *sequences):
+    """
+    Generación actual de varios contadores en una sola consulta.
+    
+    Args:
+        cr: Cursor de la BD
+        *sequences: Nombres de las secuencias
+    
+    Returns:
+        tuple: Valor actual de cada contador, en el mismo orden
+    """
+    cr.execute('SELECT ' + ', '.join(
+        f'(SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM {sequence})'
+        for sequence in sequences
+    ))
+    return cr.fetchone()
+
+
+def bump_generation(env, sequence):
+    """
+    Invalida las entradas cacheadas con un contador en todos los workers.
+    
+    El contador se incrementa tras el commit de la transacción actual, para
+    que ningún worker vuelva a cachear datos anteriores al cambio. Se agrupa
+    en un solo incremento por transacción.
+    
+    Args:
+        env: Environment de Odoo de la transacción que modifica los datos
+        sequence: Nombre de la secuencia del contador
+    """
+    cr = env.cr
+    flag = f'renaix_api.{sequence}_bumped'
+    if cr.postcommit.data.get(flag):
+        return
+    cr.postcommit.data[flag] = True
+    
+    registry = env.registry
+    
+    @cr.postcommit.add
+    def _bump():
+        try:
+            with registry.cursor() as new_cr:
+                new_cr.execute(f"SELECT nextval('{sequence}')")
+        except Exception as e:
+            _logger.warning(f'No se pudo incrementar el contador {sequence}: {str(e)}')
+
+
+def init_search_generation(cr):
+    """Crea la secuencia del contador de generación de búsquedas si no existe."""
+    init_generation(cr, SEARCH_GENERATION_SEQUENCE)
+
+
+def get_search_generation(cr):
+    """
+    Generación actual de los datos de búsqueda (común a todos los workers).
+    
+    Args:
+        cr: Cursor de la BD
+    
+    Returns:
+        int: Valor actual del contador
+    """
+    return get_generation(cr, SEARCH_GENERATION_SEQUENCE)
+
+
+def bump_search_generation(env):
+    """
+    Invalida las búsquedas cacheadas de todos los workers (tras el commit).
+    
+    Args:
+        env: Environment de Odoo de la transacción que modifica los datos
+    """
+    bump_generation(env, SEARCH_GENERATION_SEQUENCE)
+
+
+def cached_search(cr, key, compute):
+    """
+    Devuelve el resultado cacheado de una búsqueda o lo calcula y lo guarda.
+
+    La clave se completa con la BD y la generación actual, de modo que
+    cualquier escritura confirmada en productos deja obsoletas las entradas
+    anteriores sin tener que recorrer la caché.
+
+    Args:
+        cr: Cursor de la BD
+        key: Tupla que identifica la búsqueda (filtros, página, límite...)
+        compute: Función sin argumentos que calcula el resultado (solo ids y
+                 datos serializables, nunca recordsets)
+
+    Returns:
+        Resultado de compute(), posiblemente cacheado
+    """
+    if not settings.SEARCH_CACHE_ENABLED:
+        return compute()
+
+    full_key = make_key(cr.dbname, get_search_generation(cr), *key)
+    value = search_cache.get(full_key)
+    if value is None:
+        value = compute()
+        search_cache.set(full_key, value)
+    return value
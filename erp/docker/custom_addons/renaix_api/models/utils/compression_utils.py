@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Compresión de las respuestas JSON (gzip y, si está instalado, brotli)
+
+Se negocia con la cabecera Accept-Encoding de la app y solo se aplica a
+partir de COMPRESSION_MIN_BYTES. Las respuestas con ETag guardan los bytes
+comprimidos en caché: una página que no ha cambiado no se vuelve a comprimir.
+"""
+
+import gzip
+import zlib
+from odoo.http import request
+from . import cache_utils
+from ...config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Bytes comprimidos de respuestas con ETag: (BD, ruta, ETag, codificación)
+compressed_cache = cache_utils.LRUCache(
+    'comprimidos',
+    max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES,
+    max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+)
+
+
+def supported_encodings():
+    """Codificaciones disponibles, por orden de preferencia."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(size=None):
+    """
+    Elige la codificación de la respuesta según Accept-Encoding.
+
+    Args:
+        size (int): Tamaño del cuerpo sin comprimir (None = desconocido,
+                    p.ej. en streaming)
+
+    Returns:
+        str: 'br', 'gzip' o None (sin comprimir)
+    """
+    if not settings.COMPRESSION_ENABLED:
+        return None
+    if size is not None and size < settings.COMPRESSION_MIN_BYTES:
+        return None
+
+    accept_encodings = request.httprequest.accept_encodings
+    for encoding in supported_encodings():
+        if accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding, cache_key=None):
+    """
+    Comprime un cuerpo de respuesta.
+
+    Args:
+        body (bytes): Cuerpo sin comprimir
+        encoding (str): 'br' o 'gzip'
+        cache_key (tuple): Clave de la versión de la respuesta (p.ej. ruta +
+                           ETag). Si se indica, el resultado se cachea
+
+    Returns:
+        bytes: Cuerpo comprimido
+    """
+    if cache_key is not None:
+        full_key = (request.env.cr.dbname, *cache_key, encoding)
+        cached = compressed_cache.get(full_key)
+        if cached is not None:
+            return cached
+
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+    if cache_key is not None:
+        compressed_cache.set(full_key, compressed)
+    return compressed
+
+
+def compress_stream(chunks, encoding):
+    """
+    Comprime un cuerpo en streaming, bloque a bloque.
+
+    Args:
+        chunks: Iterable de bytes
+        encoding (str): 'br' o 'gzip'
+
+    Yields:
+        bytes: Bloques comprimidos
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    # wbits = 16 + MAX_WBITS: formato gzip (cabecera y CRC)
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+ETags y peticiones condicionales (If-None-Match / 304 Not Modified)
+
+Las ETags se calculan sin serializar nada: write_date máximo y número de
+registros para colecciones, write_date para registros sueltos. Si la ETag
+coincide con la que envía la app, el controlador responde 304 antes de leer
+y serializar los datos.
+"""
+
+import hashlib
+import threading
+from odoo import fields
+from odoo.tools import SQL
+from odoo.http import request
+from . import cache_utils, serializers
+
+
+class ETagStats:
+    """Aciertos (304) y fallos por endpoint, por worker."""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, hit):
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: {endpoint: {hits, misses, hit_ratio}}
+        """
+        with self._lock:
+            items = {endpoint: tuple(counts) for endpoint, counts in self._counts.items()}
+        return {
+            endpoint: {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            }
+            for endpoint, (hits, misses) in items.items()
+        }
+
+
+etag_stats = ETagStats()
+
+
+def make_etag(*parts):
+    """
+    ETag fuerte a partir de las partes que determinan la respuesta.
+
+    Incluye siempre la query string (fields, expand, vista, página...), ya
+    que cambia el cuerpo de la respuesta.
+
+    Args:
+        *parts: Valores que identifican la versión de los datos
+
+    Returns:
+        str: ETag (sin comillas)
+    """
+    query_string = request.httprequest.query_string.decode('utf-8', 'replace')
+    key = repr(cache_utils.make_key(query_string, *parts))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def collection_etag(Model, domain=None):
+    """
+    ETag de una colección: write_date máximo y número de registros.
+
+    Args:
+        Model: Modelo de Odoo (con sudo si es necesario)
+        domain (list): Dominio de la colección
+
+    Returns:
+        str: ETag
+    """
+    Model.flush_model(['write_date'])
+    query = Model._search(domain or [])
+    Model.env.cr.execute(query.select(
+        SQL('MAX(%s)', SQL.identifier(Model._table, 'write_date')),
+        SQL('COUNT(*)'),
+    ))
+    max_write_date, count = Model.env.cr.fetchone()
+    return make_etag(Model._name, max_write_date, count)
+
+
+def productos_etag(productos, *parts):
+    """
+    ETag de una página o detalle de productos: write_date de los productos,
+    sus propietarios y categorías (una consulta), y la generación de las
+    búsquedas, que cambia también al modificar imágenes y etiquetas.
+
+    Incluye la fecha del día: dias_publicado cambia sin que cambie el producto.
+
+    Args:
+        productos: Recordset de renaix.producto (en el orden de la respuesta)
+        *parts: Partes adicionales (p.ej. datos de comentarios)
+
+    Returns:
+        str: ETag
+    """
+    env = productos.env
+    write_dates = serializers.write_dates_productos(productos) if productos else ({}, {}, {})
+    return make_etag(
+        productos.ids,
+        *[sorted(wd.items()) for wd in write_dates],
+        cache_utils.get_search_generation(env.cr),
+        fields.Date.context_today(productos),
+        *parts,
+    )
+
+
+def representation_etag(etag, encoding=None):
+    """
+    ETag de una representación concreta: la versión comprimida de una
+    respuesta es otra representación y lleva su propia ETag fuerte.
+
+    Args:
+        etag: ETag de los datos
+        encoding: Codificación de la respuesta ('gzip', 'br' o None)
+
+    Returns:
+        str: ETag (sin comillas)
+    """
+    return f'{etag}-{encoding}' if encoding else etag
+
+
+def _matching_etag(etag):
+    """ETag (de cualquier representación) enviada en If-None-Match, o None."""
+    if_none_match = request.httprequest.if_none_match
+    if not if_none_match:
+        return None
+    for encoding in (None, 'gzip', 'br'):
+        candidate = representation_etag(etag, encoding)
+        if if_none_match.contains_weak(candidate):
+            return candidate
+    return None
+
+
+def is_not_modified(endpoint, etag):
+    """
+    Comprueba If-None-Match y registra el acierto o fallo.
+
+    Args:
+        endpoint: Nombre del endpoint (para las métricas)
+        etag: ETag actual de la respuesta
+
+    Returns:
+        bool: True si la app ya tiene esta versión (responder 304)
+    """
+    hit = _matching_etag(etag) is not None
+    etag_stats.record(endpoint, hit)
+    return hit
+
+
+def set_etag(response, etag):
+    """
+    Añade la ETag a una respuesta.
+
+    Args:
+        response: Respuesta HTTP
+        etag: ETag (sin comillas)
+
+    Returns:
+        Response: La misma respuesta
+    """
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
+
+
+def not_modified_response(etag):
+    """
+    Respuesta HTTP 304 Not Modified (sin cuerpo).
+
+    Args:
+        etag: ETag vigente de los datos
+
+    Returns:
+        Response: Respuesta HTTP 304 (con la ETag de la representación que tiene la app)
+    """
+    response = request.make_response(b'', headers=[('Vary', 'Accept-Encoding')], status=304)
+    return set_etag(response, _matching_etag(etag) or etag)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Codificación JSON de las respuestas de la API (y lectura de los bodies)
+
+Usa orjson si está instalado (pip install orjson) y, si no, el json de la
+librería estándar. Las fechas se serializan directamente en ISO 8601, sin
+que los serializers tengan que llamar a isoformat().
+
+No depende de Odoo: el micro-benchmark (erp/docker/benchmark_json.py) lo
+importa directamente.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """
+    Tipos que ninguno de los dos codificadores serializa por sí solo.
+
+    Args:
+        obj: Valor no serializable
+
+    Returns:
+        Valor serializable equivalente
+    """
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8')
+    # Traducciones diferidas de Odoo (_lt) y similares
+    return str(obj)
+
+
+def dumps(data):
+    """
+    Codifica datos a JSON (UTF-8).
+
+    Args:
+        data: dict/list con los datos de la respuesta
+
+    Returns:
+        bytes: JSON codificado
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def loads(body):
+    """
+    Decodifica un body JSON directamente desde bytes (sin decode previo).
+
+    Args:
+        body (bytes): Body de la petición en UTF-8
+
+    Returns:
+        Datos decodificados
+
+    Raises:
+        ValueError: Si el JSON o el UTF-8 no son válidos
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def encoder_name():
+    """Nombre del codificador en uso (para métricas)."""
+    return 'orjson' if orjson is not None else 'json'
@@ -4,14 +4,23 @@ Utilidades para manejo de JWT (JSON Web Tokens)
 """
 
 import jwt
+import hashlib
 import logging
+import time
+import uuid
 from datetime import datetime, timedelta
 from odoo.http import request
 from odoo.exceptions import AccessDenied
+from . import activity_utils, cache_utils, revocation_utils
 from ...config import settings
 
 _logger = logging.getLogger(__name__)
 
+# Access tokens verificados: (BD, generación, sha256 del token) -> (partner_id, exp, jti).
+# Solo se guardan tokens de usuarios app con la cuenta activa. Un logout no
+# invalida la caché: la revocación se comprueba también en cada acierto
+token_cache = cache_utils.LRUCache('tokens', max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
+
 
 def generate_access_token(partner):
     """
@@ -35,7 +44,8 @@ def generate_access_token(partner):
         'email': partner.email,
         'iat': datetime.utcnow(),  # Issued at
         'exp': expiration,          # Expiration
-        'type': 'access'            # Tipo de token
+        'type': 'access',           # Tipo de token
+        'jti': uuid.uuid4().hex     # Identificador (lista de revocación)
     }
     
     # Generar token
@@ -48,12 +58,16 @@ def generate_access_token(partner):
     return token
 
 
-def generate_refresh_token(partner):
+def generate_refresh_token(partner, dispositivo=None):
     """
     Genera un refresh token JWT para renovar el access token.
     
+    Cada login abre una sesión nueva (renaix.refresh.token): las sesiones
+    de otros dispositivos siguen activas.
+    
     Args:
         partner (res.partner): Usuario autenticado
+        dispositivo (str): Nombre del dispositivo (opcional)
     
     Returns:
         str: Refresh token JWT
@@ -69,7 +83,8 @@ def generate_refresh_token(partner):
         'partner_gid': partner.partner_gid,
         'iat': datetime.utcnow(),
         'exp': expiration,
-        'type': 'refresh'  # Tipo de token
+        'type': 'refresh',  # Tipo de token
+        'jti': uuid.uuid4().hex  # Único aunque se emitan dos en el mismo segundo
     }
     
     # Generar token
@@ -79,8 +94,8 @@ def generate_refresh_token(partner):
         algorithm=settings.JWT_ALGORITHM
     )
     
-    # Guardar en BD para poder invalidarlo después
-    partner.sudo().write({'api_token': token})
+    # Guardar el hash en BD para poder invalidarlo después
+    partner.env['renaix.refresh.token']._registrar(partner, token, expiration, dispositivo)
     
     return token
 
@@ -112,6 +127,24 @@ def verify_token(http_request):
     
     token = parts[1]
     
+    # Cambios de cuenta y revocaciones, en una consulta (ver cache_utils)
+    cr = http_request.env.cr
+    generation, revocation_generation = cache_utils.get_generations(
+        cr, cache_utils.AUTH_GENERATION_SEQUENCE, cache_utils.REVOCATION_GENERATION_SEQUENCE
+    )
+    
+    # Token ya verificado en este worker (y sin cambios de cuenta desde entonces)
+    if settings.TOKEN_CACHE_ENABLED:
+        cache_key = (cr.dbname, generation, hashlib.sha256(token.encode('utf-8')).hexdigest())
+        cached = token_cache.get(cache_key)
+        if cached is not None and cached[1] > time.time():
+            partner_id, _exp, jti = cached
+            if jti and revocation_utils.revocation_filter.is_revoked(http_request.env, jti, revocation_generation):
+                raise Exception('Token revocado')
+            partner = http_request.env['res.partner'].sudo().browse(partner_id)
+            activity_utils.activity_tracker.touch(partner)
+            return partner
+    
     try:
         # Decodificar token
         payload = jwt.decode(
@@ -130,6 +163,11 @@ def verify_token(http_request):
         if not user_id:
             raise Exception('Token inválido: falta user_id')
         
+        # Lista de revocación (en memoria; sin consulta si no hay revocaciones nuevas)
+        jti = payload.get('jti')
+        if jti and revocation_utils.revocation_filter.is_revoked(http_request.env, jti, revocation_generation):
+            raise Exception('Token revocado')
+        
         # Buscar usuario en la BD
         partner = http_request.env['res.partner'].sudo().browse(user_id)
         
@@ -144,10 +182,11 @@ def verify_token(http_request):
         if not partner.cuenta_activa:
             raise Exception('Cuenta desactivada')
         
-        # Actualizar última actividad
-        partner.sudo().write({
-            'fecha_ultima_actividad': datetime.now()
-        })
+        if settings.TOKEN_CACHE_ENABLED:
+            token_cache.set(cache_key, (partner.id, payload['exp'], jti))
+        
+        # Última actividad: se guarda en bloque, sin escribir en esta petición
+        activity_utils.activity_tracker.touch(partner)
         
         return partner
         
@@ -189,27 +228,13 @@ def verify_refresh_token(refresh_token):
         if payload.get('type') != 'refresh':
             raise Exception('Tipo de token inválido')
         
-        # Obtener user_id
-        user_id = payload.get('user_id')
-        
-        if not user_id:
-            raise Exception('Token inválido: falta user_id')
-        
-        # Buscar usuario
-        partner = request.env['res.partner'].sudo().browse(user_id)
-        
-        if not partner.exists():
-            raise Exception('Usuario no encontrado')
+        # Sesión vigente (hash indexado) de un usuario app con cuenta activa
+        sesion = request.env['renaix.refresh.token']._buscar_valido(refresh_token)
         
-        # Verificar que el token coincida con el guardado en BD
-        if partner.api_token != refresh_token:
+        if not sesion or sesion.partner_id.id != payload.get('user_id'):
             raise Exception('Refresh token inválido o revocado')
         
-        # Verificar cuenta activa
-        if not partner.cuenta_activa:
-            raise Exception('Cuenta desactivada')
-        
-        return partner
+        return sesion.partner_id
         
     except jwt.ExpiredSignatureError:
         _logger.warning('Refresh token expirado')
@@ -224,12 +249,44 @@ def verify_refresh_token(refresh_token):
         raise
 
 
-def revoke_refresh_token(partner):
+def revoke_access_token(http_request, partner):
     """
-    Revoca el refresh token de un usuario (logout).
+    Revoca el access token de la petición (logout): deja de ser válido en
+    todos los workers aunque no haya caducado.
+    
+    Args:
+        http_request: Request HTTP de Odoo (con el token ya verificado)
+        partner (res.partner): Usuario del token
+    """
+    token = http_request.httprequest.headers.get('Authorization', '').split()[-1]
+    payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    if not payload.get('jti'):
+        return  # Token anterior a la lista de revocación: caduca solo
+    
+    http_request.env['renaix.token.revocado']._revocar(
+        payload['jti'], datetime.utcfromtimestamp(payload['exp']), partner
+    )
+
+
+def revoke_refresh_token(partner, refresh_token=None):
+    """
+    Revoca refresh tokens de un usuario (logout).
     
     Args:
         partner (res.partner): Usuario
+        refresh_token (str): Refresh token del dispositivo que cierra sesión.
+                             Si no se indica, se cierran todas sus sesiones
+    
+    Returns:
+        int: Número de sesiones revocadas
     """
-    partner.sudo().write({'api_token': False})
-    _logger.info(f'Refresh token revocado para usuario {partner.id}')
+    RefreshToken = partner.env['renaix.refresh.token'].sudo()
+    domain = [('partner_id', '=', partner.id), ('revocado', '=', False)]
+    if refresh_token:
+        domain.append(('token_hash', '=', RefreshToken._hash(refresh_token)))
+    
+    sesiones = RefreshToken.search(domain)
+    # Sin invalidar cachés: cada renovación busca la sesión en BD
+    sesiones.write({'revocado': True})
+    _logger.info(f'{len(sesiones)} refresh tokens revocados para usuario {partner.id}')
+    return len(sesiones)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Límite de peticiones (token bucket) por IP y por usuario
+
+Cada ruta limitada tiene en RATE_LIMITS una capacidad (ráfaga máxima) y un
+periodo en el que se recupera entera. El estado de los buckets vive en una
+tabla UNLOGGED de Postgres, compartida por todos los workers, y se actualiza
+con un único INSERT ... ON CONFLICT atómico en un cursor propio: la fila
+queda bloqueada solo durante esa sentencia, no durante toda la petición.
+
+Se comprueba al principio del controlador, antes de leer el JSON, calcular
+hashes de contraseñas o decodificar imágenes.
+"""
+
+import logging
+import math
+import threading
+from odoo.http import request
+from ...config import settings
+
+_logger = logging.getLogger(__name__)
+
+TABLE = 'renaix_api_rate_limit'
+
+
+def init_table(cr):
+    """
+    Crea la tabla de buckets si no existe (UNLOGGED: sin WAL; tras una caída
+    de Postgres se vacía, lo que solo reinicia los contadores).
+
+    Args:
+        cr: Cursor de la BD
+    """
+    cr.execute(f"""
+        CREATE UNLOGGED TABLE IF NOT EXISTS {TABLE} (
+            clave VARCHAR PRIMARY KEY,
+            capacidad DOUBLE PRECISION NOT NULL,
+            tasa DOUBLE PRECISION NOT NULL,
+            tokens DOUBLE PRECISION NOT NULL,
+            permitido BOOLEAN NOT NULL,
+            actualizado TIMESTAMPTZ NOT NULL
+        )
+    """)
+
+
+def purge(cr):
+    """
+    Borra los buckets que ya se han rellenado por completo (equivalen a no
+    tener fila).
+
+    Args:
+        cr: Cursor de la BD
+
+    Returns:
+        int: Buckets eliminados
+    """
+    cr.execute(f"""
+        DELETE FROM {TABLE}
+         WHERE actualizado + make_interval(secs => (capacidad - tokens) / tasa) < clock_timestamp()
+    """)
+    return cr.rowcount
+
+
+class RateLimiter:
+    """
+    Consume tokens de los buckets y lleva la cuenta (por worker) de las
+    peticiones permitidas y rechazadas por ruta.
+    """
+
+    def __init__(self):
+        self._stats = {}    # {ruta: [permitidas, rechazadas]}
+        self._lock = threading.Lock()
+
+    def check(self, route, usuario=None):
+        """
+        Consume un token del bucket de la ruta.
+
+        Sin usuario se usa el bucket de la IP de la petición; con usuario
+        (id de res.partner o email), el de ese usuario.
+
+        Args:
+            route (str): Clave de la ruta en settings.RATE_LIMITS
+            usuario: Identificador del usuario (opcional)
+
+        Returns:
+            int: Segundos hasta poder reintentar (0 = petición permitida)
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return 0
+
+        scope = 'usuario' if usuario is not None else 'ip'
+        limite = settings.RATE_LIMITS.get(route, {}).get(scope)
+        if not limite:
+            return 0
+
+        if usuario is None:
+            usuario = request.httprequest.remote_addr or 'desconocida'
+        capacidad, periodo = limite
+        tasa = capacidad / periodo
+
+        try:
+            # Cursor propio: se confirma al salir y no depende de la
+            # transacción (ni del rollback) de la petición
+            with request.env.registry.cursor() as cr:
+                cr.execute(f"""
+                    INSERT INTO {TABLE} AS b (clave, capacidad, tasa, tokens, permitido, actualizado)
+                    VALUES (%(clave)s, %(capacidad)s, %(tasa)s, %(capacidad)s - 1, TRUE, clock_timestamp())
+                    ON CONFLICT (clave) DO UPDATE SET
+                        -- Tokens recuperados desde la última petición (sin pasar
+                        -- de la capacidad); se consume uno si hay al menos uno
+                        (tokens, permitido) = (
+                            SELECT CASE WHEN r.tokens >= 1 THEN r.tokens - 1 ELSE r.tokens END,
+                                   r.tokens >= 1
+                              FROM (SELECT LEAST(
+                                        EXCLUDED.capacidad,
+                                        b.tokens + GREATEST(EXTRACT(EPOCH FROM EXCLUDED.actualizado - b.actualizado), 0) * EXCLUDED.tasa
+                                   ) AS tokens) AS r
+                        ),
+                        capacidad = EXCLUDED.capacidad,
+                        tasa = EXCLUDED.tasa,
+                        actualizado = EXCLUDED.actualizado
+                    RETURNING tokens, permitido
+                """, {
+                    'clave': f'{route}:{scope}:{usuario}',
+                    'capacidad': float(capacidad),
+                    'tasa': tasa,
+                })
+                tokens, permitido = cr.fetchone()
+        except Exception as e:
+            # Sin tabla (módulo sin actualizar) o BD saturada: no bloquear la API
+            _logger.warning(f'No se pudo comprobar el límite de peticiones de {route}: {str(e)}')
+            return 0
+
+        with self._lock:
+            contadores = self._stats.setdefault(route, [0, 0])
+            contadores[0 if permitido else 1] += 1
+
+        if permitido:
+            return 0
+        return max(1, math.ceil((1 - tokens) / tasa))
+
+    def stats(self):
+        """
+        Returns:
+            dict: {ruta: {permitidas, rechazadas}}
+        """
+        with self._lock:
+            return {
+                route: {'permitidas': permitidas, 'rechazadas': rechazadas}
+                for route, (permitidas, rechazadas) in self._stats.items()
+            }
+
+
+rate_limiter = RateLimiter()
@@ -3,11 +3,51 @@
 Helpers para respuestas HTTP estandarizadas
 """
 
-import json
+import logging
+from odoo import api
 from odoo.http import request
+from . import json_utils, compression_utils, etag_utils
+from ...config import settings
 
+_logger = logging.getLogger(__name__)
 
-def success_response(data=None, message='Operación exitosa', status=200):
+
+JSON_HEADERS = [('Content-Type', 'application/json; charset=utf-8')]
+
+
+def json_response(data, status=200, etag=None):
+    """
+    Respuesta HTTP JSON codificada con json_utils (orjson si está instalado).
+    
+    Se comprime con gzip/brotli si la app lo acepta y supera el tamaño
+    mínimo. Con ETag, los bytes comprimidos se cachean por versión.
+    
+    Args:
+        data: Cuerpo de la respuesta (dict, list, etc.)
+        status: Código HTTP
+        etag: ETag de la respuesta (ver etag_utils), opcional
+    
+    Returns:
+        Response: Respuesta HTTP JSON
+    """
+    body = json_utils.dumps(data)
+    headers = list(JSON_HEADERS)
+    
+    encoding = compression_utils.negotiate(len(body))
+    if encoding:
+        cache_key = (request.httprequest.path, etag) if etag else None
+        body = compression_utils.compress(body, encoding, cache_key=cache_key)
+        headers.append(('Content-Encoding', encoding))
+    if settings.COMPRESSION_ENABLED:
+        headers.append(('Vary', 'Accept-Encoding'))
+    
+    response = request.make_response(body, headers=headers, status=status)
+    if etag:
+        etag_utils.set_etag(response, etag_utils.representation_etag(etag, encoding))
+    return response
+
+
+def success_response(data=None, message='Operación exitosa', status=200, etag=None):
     """
     Respuesta HTTP de éxito estandarizada.
     
@@ -15,6 +55,7 @@ def success_response(data=None, message='Operación exitosa', status=200):
         data: Datos a devolver (dict, list, etc.)
         message: Mensaje descriptivo
         status: Código HTTP (default: 200)
+        etag: ETag de la respuesta (peticiones condicionales), opcional
     
     Returns:
         Response: Respuesta HTTP JSON
@@ -27,7 +68,7 @@ def success_response(data=None, message='Operación exitosa', status=200):
     if data is not None:
         response_data['data'] = data
     
-    return request.make_json_response(response_data, status=status)
+    return json_response(response_data, status=status, etag=etag)
 
 
 def error_response(error='Error en la operación', code='ERROR', status=400):
@@ -48,10 +89,11 @@ def error_response(error='Error en la operación', code='ERROR', status=400):
         'code': code
     }
     
-    return request.make_json_response(response_data, status=status)
+    return json_response(response_data, status=status)
 
 
-def paginated_response(items, total, page=1, limit=20, message='Datos recuperados'):
+def paginated_response(items, total, page=1, limit=20, message='Datos recuperados', total_exact=None,
+                       facets=None, etag=None, has_next=None):
     """
     Respuesta HTTP paginada estandarizada.
     
@@ -61,12 +103,26 @@ def paginated_response(items, total, page=1, limit=20, message='Datos recuperado
         page: Página actual
         limit: Elementos por página
         message: Mensaje descriptivo
+        total_exact: Si se indica, añade a la paginación si el total es
+                     exacto (True) o una estimación (False)
+        facets: Recuentos por faceta (opcional, solo en búsquedas)
+        etag: ETag de la respuesta (peticiones condicionales), opcional
+        has_next: Si hay página siguiente, cuando se sabe aparte del total
+                  (p. ej. con un total estimado); si no, se deduce del total
     
     Returns:
         Response: Respuesta HTTP JSON con paginación
     """
     total_pages = (total + limit - 1) // limit  # Redondeo hacia arriba
     
+    if has_next is None:
+        has_next = page < total_pages
+    elif has_next:
+        # Con un total estimado, no anunciar menos páginas de las que hay
+        total_pages = max(total_pages, page + 1)
+    else:
+        total_pages = page
+    
     response_data = {
         'success': True,
         'message': message,
@@ -76,12 +132,116 @@ def paginated_response(items, total, page=1, limit=20, message='Datos recuperado
             'page': page,
             'limit': limit,
             'total_pages': total_pages,
-            'has_next': page < total_pages,
+            'has_next': has_next,
             'has_prev': page > 1
         }
     }
     
-    return request.make_json_response(response_data, status=200)
+    if total_exact is not None:
+        response_data['pagination']['total_exact'] = total_exact
+    
+    if facets is not None:
+        response_data['facets'] = facets
+    
+    return json_response(response_data, status=200, etag=etag)
+
+
+def cursor_paginated_response(items, next_cursor, limit=20, message='Datos recuperados', facets=None,
+                              etag=None):
+    """
+    Respuesta HTTP paginada por cursor (keyset).
+
+    Args:
+        items: Lista de elementos de la página actual
+        next_cursor: Cursor para pedir la página siguiente (None si no hay más)
+        limit: Elementos por página
+        message: Mensaje descriptivo
+        facets: Recuentos por faceta (opcional, solo en búsquedas)
+        etag: ETag de la respuesta (peticiones condicionales), opcional
+
+    Returns:
+        Response: Respuesta HTTP JSON con paginación por cursor
+    """
+    response_data = {
+        'success': True,
+        'message': message,
+        'data': items,
+        'pagination': {
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
+        }
+    }
+
+    if facets is not None:
+        response_data['facets'] = facets
+
+    return json_response(response_data, status=200, etag=etag)
+
+
+def stream_response(records, serialize, message='Datos recuperados', batch_size=None):
+    """
+    Respuesta HTTP JSON en streaming para listados completos (sin paginar).
+    
+    El JSON se va enviando por lotes de ids: cada lote se lee, se serializa,
+    se codifica y se libera antes de leer el siguiente, de modo que la memoria
+    del worker no crece con el número de filas. El cuerpo es el mismo que el
+    de success_response (comprimido en streaming si la app lo acepta).
+    
+    El generador se consume después de que Odoo haya cerrado el cursor de la
+    petición, por lo que abre el suyo propio (mismo usuario, sudo y contexto).
+    Un error a mitad del envío ya no puede cambiar el código HTTP: se registra
+    y la respuesta queda truncada.
+    
+    Args:
+        records: Recordset ordenado con todas las filas a devolver
+        serialize: Función que recibe un recordset (un lote) y devuelve la
+                   lista de dicts serializados
+        message: Mensaje descriptivo
+        batch_size: Filas por lote (default: settings.STREAM_BATCH_SIZE)
+    
+    Returns:
+        Response: Respuesta HTTP JSON en streaming
+    """
+    batch_size = batch_size or settings.STREAM_BATCH_SIZE
+    model_name = records._name
+    ids = records.ids
+    registry = records.env.registry
+    uid, su, context = records.env.uid, records.env.su, dict(records.env.context)
+    
+    envelope = json_utils.dumps({'success': True, 'message': message})
+    
+    def generate():
+        # Mismas claves y orden que success_response: {success, message, data}
+        yield envelope[:-1] + b',"data":['
+        try:
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context, su=su)
+                first = True
+                for start in range(0, len(ids), batch_size):
+                    # exists(): filas borradas desde la búsqueda inicial
+                    batch = env[model_name].browse(ids[start:start + batch_size]).exists()
+                    chunk = b','.join(json_utils.dumps(item) for item in serialize(batch))
+                    if chunk:
+                        yield chunk if first else b',' + chunk
+                        first = False
+                    # Libera la caché del ORM del lote ya enviado
+                    env.invalidate_all()
+        except Exception as e:
+            _logger.error(f'Error en respuesta en streaming ({model_name}): {str(e)}')
+            return
+        yield b']}'
+    
+    headers = list(JSON_HEADERS)
+    body = generate()
+    encoding = compression_utils.negotiate()
+    if encoding:
+        body = compression_utils.compress_stream(body, encoding)
+        headers.append(('Content-Encoding', encoding))
+    if settings.COMPRESSION_ENABLED:
+        headers.append(('Vary', 'Accept-Encoding'))
+    
+    return request.make_response(body, headers=headers, status=200)
 
 
 def unauthorized_response(message='No autorizado'):
@@ -152,6 +312,65 @@ def validation_error_response(message='Error de validación'):
     )
 
 
+def payload_too_large_response(message='El cuerpo de la petición es demasiado grande'):
+    """
+    Respuesta HTTP 413 Payload Too Large.
+    
+    Args:
+        message: Mensaje de error
+    
+    Returns:
+        Response: Respuesta HTTP JSON 413
+    """
+    return error_response(
+        error=message,
+        code='PAYLOAD_TOO_LARGE',
+        status=413
+    )
+
+
+def service_unavailable_response(message='Servicio no disponible', retry_after=None):
+    """
+    Respuesta HTTP 503 Service Unavailable (sobrecarga temporal).
+    
+    Args:
+        message: Mensaje de error
+        retry_after: Segundos tras los que reintentar (cabecera Retry-After)
+    
+    Returns:
+        Response: Respuesta HTTP JSON 503
+    """
+    response = error_response(
+        error=message,
+        code='SERVICE_UNAVAILABLE',
+        status=503
+    )
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(int(retry_after))
+    return response
+
+
+def too_many_requests_response(message='Demasiadas peticiones, inténtalo más tarde', retry_after=None):
+    """
+    Respuesta HTTP 429 Too Many Requests (límite de peticiones superado).
+    
+    Args:
+        message: Mensaje de error
+        retry_after: Segundos tras los que reintentar (cabecera Retry-After)
+    
+    Returns:
+        Response: Respuesta HTTP JSON 429
+    """
+    response = error_response(
+        error=message,
+        code='RATE_LIMITED',
+        status=429
+    )
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(int(retry_after))
+    return response
+
+
 def server_error_response(message='Error interno del servidor'):
     """
     Respuesta HTTP 500 Internal Server Error.
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Réplica en memoria (por worker) de la lista de revocación de access tokens
+
+Guarda los jti revocados y aún no caducados de renaix.token.revocado. Se
+recarga entera (el conjunto es pequeño: solo tokens sin caducar) y
+únicamente cuando cambia la generación de revocaciones, que se incrementa
+con cada revocación: comprobar un token no revocado no consulta la BD.
+
+No se lee de forma incremental por id: los ids se asignan al insertar y no
+al confirmar, así que una revocación con id menor puede confirmarse después
+de otra con id mayor y una lectura "id > último" la perdería.
+"""
+
+import logging
+import threading
+from calendar import timegm
+
+_logger = logging.getLogger(__name__)
+
+
+class RevocationFilter:
+    """
+    jti revocados por BD: {dbname: {jti: exp (timestamp)}}.
+
+    El conjunto es exacto (sin falsos positivos): un acierto es una
+    revocación confirmada y no requiere volver a la BD.
+    """
+
+    def __init__(self):
+        self._jtis = {}
+        self._generation = {}
+        self._lock = threading.Lock()
+        self.refresh_errors = 0
+
+    def is_revoked(self, env, jti, generation):
+        """
+        Comprueba si un jti está revocado.
+
+        Args:
+            env: Environment de Odoo
+            jti (str): Claim jti del token
+            generation (int): Generación de revocaciones actual
+
+        Returns:
+            bool: True si el token está revocado
+        """
+        dbname = env.cr.dbname
+        if self._generation.get(dbname) != generation:
+            self._refresh(env, generation)
+        return jti in self._jtis.get(dbname, {})
+
+    def _refresh(self, env, generation):
+        """
+        Recarga las revocaciones vigentes.
+
+        Se usa un cursor nuevo: la transacción de la petición puede tener una
+        instantánea anterior al commit de la revocación que subió la generación.
+        Si la lectura falla no se da por actualizada la generación: la
+        siguiente petición vuelve a intentarlo.
+        """
+        dbname = env.cr.dbname
+        with self._lock:
+            # Otro hilo ya la ha recargado mientras se esperaba el lock
+            if self._generation.get(dbname) == generation:
+                return
+            try:
+                with env.registry.cursor() as cr:
+                    cr.execute("""
+                        SELECT jti, fecha_expiracion
+                          FROM renaix_token_revocado
+                         WHERE fecha_expiracion > (now() AT TIME ZONE 'UTC')
+                    """)
+                    rows = cr.fetchall()
+            except Exception as e:
+                self.refresh_errors += 1
+                _logger.warning(f'No se pudo actualizar la lista de tokens revocados: {str(e)}')
+                return
+
+            self._jtis[dbname] = {
+                jti: timegm(fecha_expiracion.timetuple()) for jti, fecha_expiracion in rows
+            }
+            self._generation[dbname] = generation
+
+    def stats(self):
+        """
+        Returns:
+            dict: {revocados, errores}
+        """
+        return {
+            'revocados': sum(len(jtis) for jtis in self._jtis.values()),
+            'errores': self.refresh_errors,
+        }
+
+
+revocation_filter = RevocationFilter()
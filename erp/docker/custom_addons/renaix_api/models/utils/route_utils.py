@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline común de los endpoints de la API
+
+El decorador endpoint() se coloca debajo de @http.route y ejecuta, en orden:
+
+1. Límite de peticiones por IP (rate_limit_utils)
+2. Verificación del access token: inyecta el argumento partner
+3. Límite de peticiones por usuario
+4. Tamaño del body, con Content-Length, antes de leerlo
+5. Parseo del JSON una sola vez, directamente desde bytes: inyecta data
+6. Validación contra el Schema precompilado del endpoint (validators)
+7. El endpoint, con el tratamiento de errores común
+
+Cada etapa se cronometra: las duraciones se acumulan por endpoint (ver
+/api/v1/metricas) y se devuelven en la cabecera Server-Timing.
+"""
+
+import functools
+import logging
+import threading
+import time
+from odoo.http import request
+from . import jwt_utils, auth_helpers, json_utils, response_helpers, rate_limit_utils
+from ...config import settings
+
+_logger = logging.getLogger(__name__)
+
+
+class EndpointStats:
+    """
+    Duración de cada etapa por endpoint (por worker).
+    """
+
+    def __init__(self):
+        self._stats = {}    # {endpoint: {etapa: [peticiones, total_ms, max_ms]}}
+        self._lock = threading.Lock()
+
+    def record(self, name, tiempos):
+        """
+        Acumula las duraciones de una petición.
+
+        Args:
+            name (str): Nombre del endpoint
+            tiempos (dict): {etapa: milisegundos}
+        """
+        with self._lock:
+            etapas = self._stats.setdefault(name, {})
+            for etapa, ms in tiempos.items():
+                acumulado = etapas.setdefault(etapa, [0, 0.0, 0.0])
+                acumulado[0] += 1
+                acumulado[1] += ms
+                acumulado[2] = max(acumulado[2], ms)
+
+    def stats(self):
+        """
+        Returns:
+            dict: {endpoint: {etapa: {peticiones, media_ms, max_ms}}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    etapa: {
+                        'peticiones': peticiones,
+                        'media_ms': round(total / peticiones, 3),
+                        'max_ms': round(maximo, 3),
+                    }
+                    for etapa, (peticiones, total, maximo) in etapas.items()
+                }
+                for name, etapas in self._stats.items()
+            }
+
+
+endpoint_stats = EndpointStats()
+
+
+class _Cronometro:
+    """Mide etapas consecutivas de una petición."""
+
+    def __init__(self):
+        self.tiempos = {}
+        self._inicio = time.perf_counter()
+
+    def marcar(self, etapa):
+        """Cierra la etapa en curso (se suma si la etapa se repite)."""
+        ahora = time.perf_counter()
+        self.tiempos[etapa] = self.tiempos.get(etapa, 0.0) + (ahora - self._inicio) * 1000
+        self._inicio = ahora
+
+    def server_timing(self):
+        """Valor de la cabecera Server-Timing."""
+        return ', '.join(f'{etapa};dur={ms:.2f}' for etapa, ms in self.tiempos.items())
+
+
+def _read_body(max_body_bytes):
+    """
+    Lee el body de la petición respetando el tamaño máximo.
+
+    Content-Length se comprueba antes de leer nada; el tamaño real se vuelve
+    a comprobar para los bodies sin Content-Length (chunked).
+
+    Args:
+        max_body_bytes (int): Tamaño máximo en bytes
+
+    Returns:
+        bytes: Body, o None si supera el máximo
+    """
+    content_length = request.httprequest.content_length
+    if content_length is not None and content_length > max_body_bytes:
+        return None
+    body = request.httprequest.get_data()
+    if len(body) > max_body_bytes:
+        return None
+    return body
+
+
+def endpoint(name, auth=True, schema=None, body=None, rate_limit=None, rate_limit_key=None,
+             max_body_bytes=None):
+    """
+    Decorador del pipeline común (debajo de @http.route).
+
+    Args:
+        name (str): Nombre del endpoint en métricas y logs (p.ej. 'comentarios.crear')
+        auth (bool): Requiere access token; el endpoint recibe partner
+        schema (validators.Schema): Esquema del body JSON (implica body=True)
+        body: True = body JSON obligatorio, 'opcional' = puede venir vacío
+              ({}); el endpoint recibe data. None = sin body
+        rate_limit (str): Clave de settings.RATE_LIMITS (límite por IP y,
+                          si hay usuario, por usuario)
+        rate_limit_key: Función (partner, data) -> identificador del usuario
+                        para el límite, si no es partner.id (p.ej. el email
+                        del login); se comprueba tras validar el body
+        max_body_bytes (int): Tamaño máximo del body (por defecto
+                              settings.API_MAX_BODY_BYTES)
+
+    Returns:
+        function: Decorador
+    """
+    if body is None and schema is not None:
+        body = True
+    limite_body = max_body_bytes or settings.API_MAX_BODY_BYTES
+
+    def decorator(func):
+
+        def pipeline(crono, self, args, params):
+            limiter = rate_limit_utils.rate_limiter
+            partner = None
+
+            if rate_limit:
+                retry_after = limiter.check(rate_limit)
+                crono.marcar('limite')
+                if retry_after:
+                    return response_helpers.too_many_requests_response(retry_after=retry_after)
+
+            if auth:
+                try:
+                    partner = jwt_utils.verify_token(request)
+                except Exception as e:
+                    return response_helpers.unauthorized_response(str(e))
+                finally:
+                    crono.marcar('auth')
+                params['partner'] = partner
+
+                if rate_limit and rate_limit_key is None:
+                    retry_after = limiter.check(rate_limit, usuario=partner.id)
+                    crono.marcar('limite')
+                    if retry_after:
+                        return response_helpers.too_many_requests_response(retry_after=retry_after)
+
+            if body:
+                raw = _read_body(limite_body)
+                if raw is None:
+                    crono.marcar('body')
+                    return response_helpers.payload_too_large_response()
+                try:
+                    data = json_utils.loads(raw) if raw else ({} if body == 'opcional' else None)
+                except ValueError:
+                    return response_helpers.validation_error_response('JSON inválido')
+                finally:
+                    crono.marcar('body')
+                if data is None:
+                    return response_helpers.validation_error_response('No se proporcionaron datos')
+                if not isinstance(data, dict):
+                    return response_helpers.validation_error_response('El body debe ser un objeto JSON')
+                params['data'] = data
+
+                if schema is not None:
+                    is_valid, error_msg = schema.validate(data)
+                    crono.marcar('validacion')
+                    if not is_valid:
+                        return response_helpers.validation_error_response(error_msg)
+
+                if rate_limit and rate_limit_key is not None:
+                    retry_after = limiter.check(rate_limit, usuario=rate_limit_key(partner, data))
+                    crono.marcar('limite')
+                    if retry_after:
+                        return response_helpers.too_many_requests_response(retry_after=retry_after)
+
+            try:
+                return func(self, *args, **params)
+            finally:
+                crono.marcar('endpoint')
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **params):
+            # Los argumentos inyectados no pueden venir de la query string
+            params.pop('partner', None)
+            params.pop('data', None)
+
+            crono = _Cronometro()
+            try:
+                response = pipeline(crono, self, args, params)
+            except auth_helpers.PasswordHashBusy as e:
+                # El cliente reintentará: no dejar nada escrito a medias
+                request.env.cr.rollback()
+                response = response_helpers.service_unavailable_response(
+                    str(e), retry_after=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS
+                )
+            except Exception as e:
+                _logger.error(f'Error en {name}: {str(e)}')
+                # Deshacer lo que el endpoint haya escrito a medias (y salir
+                # de una transacción abortada, que Odoo no podría confirmar)
+                request.env.cr.rollback()
+                response = response_helpers.server_error_response(str(e))
+
+            endpoint_stats.record(name, crono.tiempos)
+            if settings.SERVER_TIMING_ENABLED:
+                response.headers['Server-Timing'] = crono.server_timing()
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers para búsquedas y paginación de productos
+"""
+
+import base64
+import binascii
+import json
+import math
+from odoo import fields
+from odoo.tools import SQL
+from ...config import settings
+
+
+# Orden del feed de productos (coincide con el _order de renaix.producto)
+KEYSET_ORDER = 'fecha_publicacion DESC, id DESC'
+
+# Operador pg_trgm "word similarity" (texto <% columna), indexable con gin_trgm_ops.
+# SQL() sin argumentos conserva el %% escapado tal cual hasta psycopg2
+WORD_SIMILAR_OPERATOR = SQL('<%%')
+
+
+def encode_cursor(producto):
+    """
+    Genera un cursor opaco a partir del último producto de una página.
+
+    Args:
+        producto: Recordset de renaix.producto (un registro)
+
+    Returns:
+        str: Cursor en base64 (url-safe)
+    """
+    raw = f'{fields.Datetime.to_string(producto.fecha_publicacion)}|{producto.id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Args:
+        cursor (str): Cursor recibido del cliente
+
+    Returns:
+        tuple: (datetime, int) - (fecha_publicacion, id), o None si es inválido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        fecha_str, producto_id = raw.split('|')
+        fecha = fields.Datetime.to_datetime(fecha_str)
+        producto_id = int(producto_id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        return None
+
+    if not fecha or producto_id <= 0:
+        return None
+
+    return fecha, producto_id
+
+
+# Radio medio de la Tierra y km por grado de latitud
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.045
+
+
+def bounding_box_domain(lat, lon, radio_km):
+    """
+    Dominio de la caja que contiene el círculo de búsqueda.
+
+    Filtro grueso que resuelve el índice (latitud, longitud); la distancia
+    exacta se comprueba después solo sobre los productos de la caja.
+
+    Args:
+        lat (float): Latitud del centro
+        lon (float): Longitud del centro
+        radio_km (float): Radio en km
+
+    Returns:
+        list: Dominio ORM
+    """
+    delta_lat = radio_km / KM_PER_DEGREE
+    delta_lon = radio_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return [
+        ('latitud', '>=', lat - delta_lat),
+        ('latitud', '<=', lat + delta_lat),
+        ('longitud', '>=', lon - delta_lon),
+        ('longitud', '<=', lon + delta_lon),
+    ]
+
+
+def distance_sql(Producto, lat, lon):
+    """
+    Expresión SQL de la distancia (haversine, en km) de cada producto a un punto.
+
+    Args:
+        Producto: Modelo renaix.producto
+        lat (float): Latitud del punto
+        lon (float): Longitud del punto
+
+    Returns:
+        SQL: Expresión de distancia
+    """
+    latitud = SQL.identifier(Producto._table, 'latitud')
+    longitud = SQL.identifier(Producto._table, 'longitud')
+    return SQL(
+        '(2 * %s * asin(sqrt(least(1, '
+        'power(sin(radians(%s - %s) / 2), 2) '
+        '+ cos(radians(%s)) * cos(radians(%s)) * power(sin(radians(%s - %s) / 2), 2)'
+        '))))',
+        EARTH_RADIUS_KM, latitud, lat, lat, latitud, longitud, lon,
+    )
+
+
+def build_search_domain(filters):
+    """
+    Dominio ORM de una búsqueda de productos disponibles.
+
+    La búsqueda de texto (filters['query']) y la cercanía no se expresan como
+    dominio: las aplica build_search_query.
+
+    Args:
+        filters (dict): Filtros validados por validators.validate_search_filters
+
+    Returns:
+        list: Dominio de búsqueda
+    """
+    domain = [
+        ('active', '=', True),
+        ('estado_venta', '=', 'disponible')
+    ]
+
+    if filters.get('categoria_id'):
+        domain.append(('categoria_id', '=', filters['categoria_id']))
+
+    if filters.get('etiquetas'):
+        domain.append(('etiqueta_ids', 'in', filters['etiquetas']))
+
+    if filters.get('precio_min'):
+        domain.append(('precio', '>=', filters['precio_min']))
+
+    if filters.get('precio_max'):
+        domain.append(('precio', '<=', filters['precio_max']))
+
+    if filters.get('estado_producto'):
+        domain.append(('estado_producto', '=', filters['estado_producto']))
+
+    if filters.get('ubicacion'):
+        domain.append(('ubicacion', 'ilike', filters['ubicacion']))
+
+    return domain
+
+
+def build_search_query(Producto, domain, filters=None, order=None, limit=None, offset=0):
+    """
+    Construye la consulta SQL de búsqueda de productos.
+
+    Al dominio ORM se le añaden las condiciones que no se pueden expresar
+    como dominio (texto completo sobre search_vector, en modo fuzzy
+    similitud trigram sobre el nombre, y distancia a un punto).
+
+    Args:
+        Producto: Modelo renaix.producto (con sudo si es necesario)
+        domain (list): Dominio de búsqueda
+        filters (dict): Filtros validados por validators.validate_search_filters
+        order (str): Orden ORM (None = sin ORDER BY, p.ej. para contar)
+        limit (int): Máximo de registros
+        offset (int): Registros a saltar
+
+    Returns:
+        Query: Consulta de Odoo lista para ejecutar
+    """
+    filters = filters or {}
+    table = Producto._table
+
+    # Cercanía: la caja va en el dominio para que la resuelva el índice
+    if 'lat' in filters:
+        domain = domain + bounding_box_domain(filters['lat'], filters['lon'], filters['radio_km'])
+
+    query = Producto._search(domain, offset=offset, limit=limit, order=order)
+
+    if 'lat' in filters:
+        distance = distance_sql(Producto, filters['lat'], filters['lon'])
+        query.add_where(SQL('%s <= %s', distance, filters['radio_km']))
+
+        if order and filters.get('orden') == 'distancia':
+            query.order = SQL('%s ASC, %s DESC', distance, SQL.identifier(table, 'id'))
+
+    if not filters.get('query'):
+        return query
+
+    # Búsqueda de texto completo (índice GIN sobre search_vector)
+    vector = SQL.identifier(table, 'search_vector')
+    tsquery = SQL('websearch_to_tsquery(%s, %s)', Producto._search_ts_config, filters['query'])
+    rank = SQL('ts_rank(%s, %s)', vector, tsquery)
+
+    if filters.get('fuzzy'):
+        # Modo aproximado: además del texto completo, nombres parecidos por
+        # trigramas (índice GIN trigram sobre name); admite erratas y palabras a medias
+        name = SQL.identifier(table, 'name')
+        Producto.env.cr.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            [str(settings.SEARCH_FUZZY_THRESHOLD)],
+        )
+        query.add_where(SQL(
+            '(%s @@ %s OR %s %s %s)',
+            vector, tsquery, filters['query'], WORD_SIMILAR_OPERATOR, name,
+        ))
+        rank = SQL('word_similarity(%s, %s)', filters['query'], name)
+    else:
+        query.add_where(SQL('%s @@ %s', vector, tsquery))
+
+    if order and filters.get('orden') == 'relevancia':
+        query.order = SQL('%s DESC, %s DESC', rank, SQL.identifier(table, 'id'))
+
+    return query
+
+
+def count_search(Producto, domain, filters=None):
+    """
+    Cuenta los resultados de una búsqueda sin recorrer todo el conjunto.
+
+    Cuenta de forma exacta hasta SEARCH_EXACT_COUNT_THRESHOLD resultados
+    (COUNT sobre una subconsulta con LIMIT). Si se supera el umbral,
+    devuelve la estimación de filas del planificador (EXPLAIN).
+
+    Args:
+        Producto: Modelo renaix.producto (con sudo si es necesario)
+        domain (list): Dominio de búsqueda
+        filters (dict): Filtros validados
+
+    Returns:
+        tuple: (int, bool) - (total, es_exacto)
+    """
+    cr = Producto.env.cr
+    threshold = settings.SEARCH_EXACT_COUNT_THRESHOLD
+
+    # Conteo acotado: como mucho se leen threshold + 1 filas
+    query = build_search_query(Producto, domain, filters, limit=threshold + 1)
+    cr.execute(SQL('SELECT COUNT(*) FROM (%s) AS resultados', query.select(SQL('1'))))
+    total = cr.fetchone()[0]
+
+    if total <= threshold:
+        return total, True
+
+    # Conjunto grande: usar la estimación del planificador
+    query = build_search_query(Producto, domain, filters)
+    cr.execute(SQL('EXPLAIN (FORMAT JSON) %s', query.select(SQL('1'))))
+    plan = cr.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+
+    # La estimación nunca puede ser menor que lo que ya sabemos que existe
+    return max(estimate, threshold + 1), False
+
+
+def compute_facets(Producto, domain, filters, facets):
+    """
+    Calcula los recuentos por valor de cada faceta en una sola consulta.
+
+    Usa GROUPING SETS sobre el conjunto filtrado, de modo que todas las
+    facetas se resuelven en una única pasada en lugar de una búsqueda
+    por faceta.
+
+    Args:
+        Producto: Modelo renaix.producto (con sudo si es necesario)
+        domain (list): Dominio de búsqueda
+        filters (dict): Filtros validados
+        facets (list): Facetas validadas por validators.validate_facets
+
+    Returns:
+        dict: {faceta: [{valor..., 'count': n}, ...]}
+    """
+    if not facets:
+        return {}
+
+    table = Producto._table
+    bounds = [float(b) for b in settings.SEARCH_PRICE_BUCKETS]
+    expressions = {
+        'categoria': SQL.identifier(table, 'categoria_id'),
+        'estado_producto': SQL.identifier(table, 'estado_producto'),
+        'precio': SQL('width_bucket(%s::float8, %s::float8[])', SQL.identifier(table, 'precio'), bounds),
+    }
+    exprs = [expressions[facet] for facet in facets]
+
+    # SELECT expr_1, ..., expr_n, GROUPING(expr_1), ..., COUNT(*)
+    # ... GROUP BY GROUPING SETS ((expr_1), ..., (expr_n))
+    query = build_search_query(Producto, domain, filters)
+    select = query.select(
+        *exprs,
+        *[SQL('GROUPING(%s)', expr) for expr in exprs],
+        SQL('COUNT(*)'),
+    )
+    cr = Producto.env.cr
+    cr.execute(SQL(
+        '%s GROUP BY GROUPING SETS (%s)',
+        select,
+        SQL(', ').join(SQL('(%s)', expr) for expr in exprs),
+    ))
+
+    counts = {facet: {} for facet in facets}
+    n = len(facets)
+    for row in cr.fetchall():
+        values, groupings, count = row[:n], row[n:2 * n], row[-1]
+        # GROUPING(expr) = 0 indica el conjunto de agrupación de esa faceta
+        for facet, value, grouping in zip(facets, values, groupings):
+            if not grouping:
+                counts[facet][value] = count
+
+    result = {}
+
+    if 'categoria' in counts:
+        categorias = Producto.env['renaix.categoria'].sudo().browse(
+            [cat_id for cat_id in counts['categoria'] if cat_id]
+        )
+        nombres = {c['id']: c['name'] for c in categorias.read(['name'])}
+        result['categoria'] = sorted(
+            [{'id': cat_id, 'nombre': nombres.get(cat_id, ''), 'count': count}
+             for cat_id, count in counts['categoria'].items() if cat_id],
+            key=lambda item: -item['count'],
+        )
+
+    if 'estado_producto' in counts:
+        etiquetas = dict(Producto._fields['estado_producto'].selection)
+        result['estado_producto'] = [
+            {'valor': valor, 'nombre': nombre, 'count': counts['estado_producto'][valor]}
+            for valor, nombre in etiquetas.items()
+            if valor in counts['estado_producto']
+        ]
+
+    if 'precio' in counts:
+        # width_bucket: 0 = por debajo del primer límite, len(bounds) = por encima del último
+        result['precio'] = [
+            {
+                'min': bounds[bucket - 1] if bucket > 0 else 0.0,
+                'max': bounds[bucket] if bucket < len(bounds) else None,
+                'count': counts['precio'][bucket],
+            }
+            for bucket in range(len(bounds) + 1)
+            if bucket in counts['precio']
+        ]
+
+    return result
+
+
+def search_page(Producto, domain, filters, order, limit, offset=0):
+    """
+    Devuelve una página de productos de la búsqueda.
+
+    Args:
+        Producto: Modelo renaix.producto (con sudo si es necesario)
+        domain (list): Dominio de búsqueda
+        filters (dict): Filtros validados
+        order (str): Orden ORM
+        limit (int): Elementos por página
+        offset (int): Registros a saltar
+
+    Returns:
+        Recordset: Productos de la página, en orden
+    """
+    query = build_search_query(Producto, domain, filters, order=order, limit=limit, offset=offset)
+    return Producto.browse(query.get_result_ids())
+
+
+def search_keyset(Producto, domain, cursor, limit, filters=None):
+    """
+    Busca una página de productos posterior a un cursor (paginación keyset).
+
+    En lugar de OFFSET, filtra con una comparación de filas
+    (fecha_publicacion, id) < (cursor), de modo que PostgreSQL empieza a
+    leer directamente desde la posición del cursor en el índice del feed.
+
+    Args:
+        Producto: Modelo renaix.producto (con sudo si es necesario)
+        domain (list): Dominio de búsqueda
+        cursor (tuple): (fecha_publicacion, id) o None para la primera página
+        limit (int): Elementos por página
+        filters (dict): Filtros validados (opcional)
+
+    Returns:
+        tuple: (productos, next_cursor) - next_cursor es None si no hay más
+    """
+    # Pedimos un registro extra para saber si hay página siguiente
+    query = build_search_query(Producto, domain, filters, order=KEYSET_ORDER, limit=limit + 1)
+
+    if cursor:
+        fecha, last_id = cursor
+        query.add_where(SQL(
+            '(%s, %s) < (%s, %s)',
+            SQL.identifier(Producto._table, 'fecha_publicacion'),
+            SQL.identifier(Producto._table, 'id'),
+            fecha,
+            last_id,
+        ))
+
+    productos = Producto.browse(query.get_result_ids())
+
+    if len(productos) > limit:
+        productos = productos[:limit]
+        return productos, encode_cursor(productos[-1])
+
+    return productos, None
+
+
+def like_prefix(texto):
+    """
+    Patrón LIKE "empieza por" para un texto, escapando sus comodines.
+
+    Args:
+        texto: Prefijo introducido por el usuario
+
+    Returns:
+        str: Patrón en minúsculas (ej: 'ipho%')
+    """
+    texto = texto.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'{texto}%'
+
+
+def autocompletar(env, prefijo, limit):
+    """
+    Sugerencias de nombres de producto, etiquetas y categorías que empiezan
+    por un prefijo.
+
+    Cada consulta es un recorrido acotado de un índice lower(name)
+    text_pattern_ops, sin pasar por el ORM ni serializar productos.
+
+    Args:
+        env: Environment de Odoo
+        prefijo: Texto introducido por el usuario
+        limit: Máximo de sugerencias por tipo
+
+    Returns:
+        dict: {productos: [str], etiquetas: [{id, nombre, count}],
+               categorias: [{id, nombre, count}]}
+    """
+    cr = env.cr
+    pattern = like_prefix(prefijo)
+
+    # Nombres de productos disponibles en orden del índice; se piden algunos
+    # más para poder descartar repetidos sin salir del recorrido del índice
+    env['renaix.producto'].flush_model(['name', 'active', 'estado_venta'])
+    cr.execute("""
+        SELECT name FROM renaix_producto
+         WHERE active AND estado_venta = 'disponible'
+           AND lower(name) LIKE %s
+         ORDER BY lower(name)
+         LIMIT %s
+    """, [pattern, limit * 4])
+    productos = []
+    vistos = set()
+    for (name,) in cr.fetchall():
+        if name.lower() not in vistos:
+            vistos.add(name.lower())
+            productos.append(name)
+            if len(productos) == limit:
+                break
+
+    env['renaix.etiqueta'].flush_model(['name', 'active', 'producto_count'])
+    cr.execute("""
+        SELECT id, name, producto_count FROM renaix_etiqueta
+         WHERE active AND producto_count > 0
+           AND lower(name) LIKE %s
+         ORDER BY producto_count DESC, name
+         LIMIT %s
+    """, [pattern, limit])
+    etiquetas = [{'id': id_, 'nombre': name, 'count': count} for id_, name, count in cr.fetchall()]
+
+    env['renaix.categoria'].flush_model(['name', 'active', 'producto_count'])
+    cr.execute("""
+        SELECT id, name, producto_count FROM renaix_categoria
+         WHERE active AND lower(name) LIKE %s
+         ORDER BY producto_count DESC, name
+         LIMIT %s
+    """, [pattern, limit])
+    categorias = [{'id': id_, 'nombre': name, 'count': count} for id_, name, count in cr.fetchall()]
+
+    return {
+        'productos': productos,
+        'etiquetas': etiquetas,
+        'categorias': categorias,
+    }
@@ -3,6 +3,54 @@
 Serializers: Conversión de modelos Odoo a JSON
 """
 
+from odoo import fields as odoo_fields
+from . import cache_utils
+from ...config import settings
+
+
+# Objetos serializados por (BD, modelo, id, write_date, variante). Cuando el
+# registro cambia su write_date avanza y la entrada anterior deja de usarse
+serialized_cache = cache_utils.LRUCache(
+    'serializados',
+    max_entries=settings.SERIALIZED_CACHE_MAX_ENTRIES,
+    ttl=settings.SERIALIZED_CACHE_TTL_SECONDS,
+    max_bytes=settings.SERIALIZED_CACHE_MAX_BYTES,
+)
+
+
+def _cacheado(env, modelo, write_dates, variante, leer):
+    """
+    Devuelve objetos serializados desde la caché, leyendo solo los que faltan.
+    
+    Args:
+        env: Environment de Odoo
+        modelo: Nombre del modelo (parte de la clave)
+        write_dates (dict): {id: write_date} de los registros a serializar
+        variante: Variante de la serialización (campos leídos, completo/básico...)
+        leer: Función que recibe la lista de ids que faltan y devuelve {id: objeto}
+    
+    Returns:
+        dict: {id: objeto serializado}
+    """
+    if not settings.SERIALIZED_CACHE_ENABLED:
+        return leer(list(write_dates))
+    
+    result = {}
+    faltan = []
+    for record_id, write_date in write_dates.items():
+        value = serialized_cache.get((env.cr.dbname, modelo, record_id, write_date, variante))
+        if value is None:
+            faltan.append(record_id)
+        else:
+            result[record_id] = value
+    
+    if faltan:
+        for record_id, value in leer(faltan).items():
+            serialized_cache.set((env.cr.dbname, modelo, record_id, write_dates[record_id], variante), value)
+            result[record_id] = value
+    
+    return result
+
 
 def serialize_partner(partner, full=False):
     """
@@ -34,7 +82,7 @@ def serialize_partner(partner, full=False):
             'productos_vendidos': partner.productos_vendidos,
             'productos_comprados': partner.productos_comprados,
             'total_comentarios': partner.total_comentarios,
-            'fecha_registro_app': partner.fecha_registro_app.isoformat() if partner.fecha_registro_app else None,
+            'fecha_registro_app': partner.fecha_registro_app or None,
             'image_url': f'/api/v1/usuarios/{partner.id}/imagen' if partner.image_1920 else None,
         })
     
@@ -107,7 +155,111 @@ def serialize_producto_imagen(imagen):
     }
 
 
-def serialize_producto(producto, include_images=True, include_comentarios=False, include_propietario_full=False):
+def _campo_pedido(nombre, fields):
+    """
+    Indica si un campo se ha pedido con ?fields= (None = todos).
+    
+    Args:
+        nombre: Clave del campo en el JSON
+        fields: Conjunto de campos pedidos o None
+    
+    Returns:
+        bool: True si hay que incluirlo
+    """
+    return fields is None or nombre == 'id' or nombre in fields
+
+
+def _expandir(nombre, expand, default=True):
+    """
+    Indica si una relación se devuelve como objeto completo (?expand=).
+    
+    Args:
+        nombre: Nombre de la relación
+        expand: Conjunto de relaciones a expandir o None (comportamiento por defecto)
+        default: Valor si no se ha indicado expand
+    
+    Returns:
+        bool: True si hay que serializar el objeto relacionado
+    """
+    return default if expand is None else nombre in expand
+
+
+def _modo_relacion(nombre, id_key, fields, expand, default=True):
+    """
+    Indica cómo devolver una relación según ?fields= y ?expand=.
+    
+    La expansión por defecto solo aplica si se pide la relación por su
+    nombre (o todos los campos): ?fields=propietario_id sin expand devuelve
+    el id, no el objeto.
+    
+    Args:
+        nombre: Clave del objeto expandido (ej: 'propietario')
+        id_key: Clave con el id sin expandir (ej: 'propietario_id')
+        fields: Conjunto de campos pedidos o None
+        expand: Conjunto de relaciones a expandir o None
+        default: Si se expande cuando no se indica expand
+    
+    Returns:
+        str: 'objeto', 'id' o None si la relación no se devuelve
+    """
+    pedido_nombre = _campo_pedido(nombre, fields)
+    if not (pedido_nombre or _campo_pedido(id_key, fields)):
+        return None
+    
+    if _expandir(nombre, expand, default and pedido_nombre):
+        return 'objeto'
+    if expand is not None or not pedido_nombre:
+        return 'id'
+    return None
+
+
+def _filtrar_campos(data, fields):
+    """
+    Deja en data solo los campos pedidos con ?fields=.
+    
+    Args:
+        data (dict): Objeto serializado
+        fields: Conjunto de campos pedidos o None
+    
+    Returns:
+        dict: Objeto con los campos pedidos
+    """
+    if fields is None:
+        return data
+    return {clave: valor for clave, valor in data.items() if _campo_pedido(clave, fields)}
+
+
+def _relacion(data, nombre, id_key, obtener, serializar, fields, expand, many=False, default=True):
+    """
+    Añade una relación al objeto serializado según ?fields= y ?expand=.
+    
+    Si no se pide, no se toca (ni se carga); si se pide sin expandir, se
+    devuelve solo el id (o la lista de ids) en id_key.
+    
+    Args:
+        data (dict): Objeto serializado al que añadir la relación
+        nombre: Clave del objeto expandido (ej: 'propietario')
+        id_key: Clave con el id sin expandir (ej: 'propietario_id')
+        obtener: Función sin argumentos que devuelve el recordset relacionado
+                 (solo se llama si la relación se pide)
+        serializar: Función que serializa un registro
+        fields: Conjunto de campos pedidos o None
+        expand: Conjunto de relaciones a expandir o None
+        many: True si la relación es a varios registros
+        default: Si se expande cuando no se indica expand
+    """
+    modo = _modo_relacion(nombre, id_key, fields, expand, default)
+    
+    if modo == 'objeto':
+        registros = obtener()
+        data[nombre] = [serializar(r) for r in registros] if many else serializar(registros)
+    elif modo == 'id':
+        registros = obtener()
+        data[id_key] = registros.ids if many else (registros.id or None)
+
+
+def serialize_producto(producto, include_images=True, include_comentarios=False, include_propietario_full=False,
+                       fields=None, expand=None):
     """
     Serializa un producto a JSON.
     
@@ -116,6 +268,8 @@ def serialize_producto(producto, include_images=True, include_comentarios=False,
         include_images: Si True, incluye las imágenes
         include_comentarios: Si True, incluye los comentarios
         include_propietario_full: Si True, incluye info completa del propietario
+        fields: Campos a devolver (?fields=), None = todos
+        expand: Relaciones a expandir (?expand=), None = por defecto
     
     Returns:
         dict: Producto serializado
@@ -123,40 +277,376 @@ def serialize_producto(producto, include_images=True, include_comentarios=False,
     if not producto:
         return None
     
-    data = {
-        'id': producto.id,
-        'nombre': producto.name,
-        'descripcion': producto.descripcion or '',
-        'precio': producto.precio,
-        'estado_producto': producto.estado_producto,
-        'estado_venta': producto.estado_venta,
-        'antiguedad': producto.antiguedad or '',
-        'ubicacion': producto.ubicacion or '',
-        'fecha_publicacion': producto.fecha_publicacion.isoformat() if producto.fecha_publicacion else None,
-        'fecha_actualizacion': producto.fecha_actualizacion.isoformat() if producto.fecha_actualizacion else None,
-        'dias_publicado': producto.dias_publicado,
-        'total_comentarios': producto.total_comentarios,
-        'total_denuncias': producto.total_denuncias,
-        'propietario': serialize_partner(producto.propietario_id, full=include_propietario_full),
-        'categoria': serialize_categoria(producto.categoria_id),
-        'etiquetas': [serialize_etiqueta(e) for e in producto.etiqueta_ids],
+    data = serialize_productos(
+        producto, include_images=include_images, include_propietario_full=include_propietario_full,
+        fields=fields, expand=expand
+    )[0]
+    
+    _relacion(
+        data, 'comentarios', 'comentario_ids', lambda: producto.comentario_ids.filtered(lambda x: x.active),
+        serialize_comentario, fields, expand, many=True, default=include_comentarios
+    )
+    
+    return data
+
+
+def _texto(valor):
+    return valor or ''
+
+
+def _opcional(valor):
+    return valor or None
+
+
+def _dias_desde(fecha):
+    # Se calcula al serializar (no se cachea: cambia aunque el producto no cambie)
+    return (odoo_fields.Datetime.now() - fecha).days if fecha else 0
+
+
+# Campos simples del JSON de producto: clave -> (campo de renaix.producto, formato)
+_PRODUCTO_CAMPOS = {
+    'nombre': ('name', None),
+    'descripcion': ('descripcion', _texto),
+    'precio': ('precio', None),
+    'estado_producto': ('estado_producto', None),
+    'estado_venta': ('estado_venta', None),
+    'antiguedad': ('antiguedad', _texto),
+    'ubicacion': ('ubicacion', _texto),
+    # Coordenadas aproximadas de la ubicación (None si no se reconoce)
+    'latitud': ('latitud', _opcional),
+    'longitud': ('longitud', _opcional),
+    'fecha_publicacion': ('fecha_publicacion', _opcional),
+    'fecha_actualizacion': ('fecha_actualizacion', _opcional),
+    'dias_publicado': ('fecha_publicacion', _dias_desde),
+    'total_comentarios': ('total_comentarios', None),
+    'total_denuncias': ('total_denuncias', None),
+}
+
+# Relaciones del JSON de producto: nombre -> (clave sin expandir, campo de renaix.producto)
+_PRODUCTO_RELACIONES = {
+    'propietario': ('propietario_id', 'propietario_id'),
+    'categoria': ('categoria_id', 'categoria_id'),
+    'etiquetas': ('etiqueta_ids', 'etiqueta_ids'),
+    'imagenes': ('imagen_ids', 'imagen_ids'),
+}
+
+
+def serialize_productos(productos, include_images=True, include_propietario_full=False, fields=None, expand=None,
+                        vista=None):
+    """
+    Serializa una lista de productos a JSON con lecturas en bloque.
+    
+    Lee los productos y sus relaciones (propietarios, categorías, etiquetas e
+    imágenes) con un read()/search_read() por modelo, en lugar de recorrer
+    los campos registro a registro: el número de consultas no crece con el
+    tamaño de la página. Solo se leen los campos y relaciones pedidos con
+    fields/expand.
+    
+    Productos, propietarios, categorías y etiquetas se cachean por separado
+    con clave (modelo, id, write_date, variante): un cambio en un registro
+    solo invalida su propia entrada. Las imágenes no se cachean (una sola
+    consulta sin binarios).
+    
+    Args:
+        productos: Recordset de renaix.producto (se respeta su orden)
+        include_images: Si True, incluye las imágenes
+        include_propietario_full: Si True, incluye info completa del propietario
+        fields: Campos a devolver (?fields=), None = todos
+        expand: Relaciones a expandir (?expand=), None = por defecto
+        vista: 'tarjeta' para el formato compacto de listados (ignora fields/expand)
+    
+    Returns:
+        list: Productos serializados
+    """
+    if not productos:
+        return []
+    
+    if vista == 'tarjeta':
+        return serialize_productos_tarjeta(productos)
+    
+    env = productos.env
+    
+    campos = [clave for clave in _PRODUCTO_CAMPOS if _campo_pedido(clave, fields)]
+    
+    # Relaciones pedidas: expandidas (objeto) o solo ids
+    expandidas = set()
+    solo_ids = set()
+    for nombre, (id_key, _campo) in _PRODUCTO_RELACIONES.items():
+        modo = _modo_relacion(
+            nombre, id_key, fields, expand, default=include_images if nombre == 'imagenes' else True
+        )
+        if modo == 'objeto':
+            expandidas.add(nombre)
+        elif modo == 'id':
+            solo_ids.add(nombre)
+    
+    # Las imágenes expandidas se leen aparte (search_read), no como imagen_ids
+    read_fields = [_PRODUCTO_CAMPOS[clave][0] for clave in campos]
+    read_fields += [
+        campo for nombre, (_id_key, campo) in _PRODUCTO_RELACIONES.items()
+        if nombre in solo_ids or (nombre in expandidas and nombre != 'imagenes')
+    ]
+    read_fields = list(dict.fromkeys(read_fields))
+    
+    # write_date de productos, propietarios y categorías en una consulta: son
+    # la clave de la caché, cada registro relacionado con la suya propia
+    productos_wd, partners_wd, categorias_wd = write_dates_productos(productos)
+    
+    rows_by_id = _cacheado(
+        env, 'renaix.producto', productos_wd, tuple(read_fields),
+        lambda ids: {row['id']: row for row in productos.browse(ids).read(read_fields, load=None)}
+    )
+    rows = [rows_by_id[producto_id] for producto_id in productos.ids if producto_id in rows_by_id]
+    
+    # Propietarios
+    partners_data = {}
+    if 'propietario' in expandidas:
+        if include_propietario_full:
+            leer_partners = lambda ids: {p.id: serialize_partner(p, full=True) for p in env['res.partner'].browse(ids)}
+        else:
+            leer_partners = lambda ids: {
+                row['id']: {'id': row['id'], 'name': row['name'], 'email': row['email']}
+                for row in env['res.partner'].browse(ids).read(['name', 'email'], load=None)
+            }
+        partners_data = _cacheado(
+            env, 'res.partner', partners_wd, 'completo' if include_propietario_full else 'basico', leer_partners
+        )
+    
+    # Categorías (bin_size: solo se comprueba si hay imagen, sin leer el binario)
+    categorias_data = {}
+    if 'categoria' in expandidas:
+        categorias_data = _cacheado(env, 'renaix.categoria', categorias_wd, 'basico', lambda ids: {
+            row['id']: {
+                'id': row['id'],
+                'nombre': row['name'],
+                'descripcion': row['descripcion'] or '',
+                'producto_count': row['producto_count'],
+                'imagen_url': f'/web/image/renaix.categoria/{row["id"]}/image' if row['image'] else None,
+            }
+            for row in env['renaix.categoria'].with_context(bin_size=True).browse(ids).read(
+                ['name', 'descripcion', 'producto_count', 'image'], load=None
+            )
+        })
+    
+    # Etiquetas
+    etiquetas_data = {}
+    if 'etiquetas' in expandidas:
+        etiquetas = env['renaix.etiqueta'].browse({etiqueta_id for row in rows for etiqueta_id in row['etiqueta_ids']})
+        etiquetas_wd = {row['id']: row['write_date'] for row in etiquetas.read(['write_date'], load=None)}
+        etiquetas_data = _cacheado(env, 'renaix.etiqueta', etiquetas_wd, 'basico', lambda ids: {
+            row['id']: {
+                'id': row['id'],
+                'nombre': row['name'],
+                'producto_count': row['producto_count'],
+                'color': row['color'],
+            }
+            for row in env['renaix.etiqueta'].browse(ids).read(['name', 'producto_count', 'color'], load=None)
+        })
+    
+    # Imágenes (sin el binario), agrupadas por producto en orden de secuencia
+    imagenes_por_producto = {}
+    if 'imagenes' in expandidas:
+        imagenes = env['renaix.producto.imagen'].search_read(
+            [('producto_id', 'in', productos.ids)],
+            ['producto_id', 'es_principal', 'descripcion', 'secuencia'],
+            order='secuencia, id',
+            load=None,
+        )
+        for row in imagenes:
+            imagenes_por_producto.setdefault(row['producto_id'], []).append({
+                'id': row['id'],
+                'url_imagen': f'/api/v1/imagenes/{row["id"]}',
+                'es_principal': row['es_principal'],
+                'descripcion': row['descripcion'] or '',
+                'secuencia': row['secuencia'],
+            })
+    
+    result = []
+    for row in rows:
+        data = {'id': row['id']}
+        
+        for clave in campos:
+            campo, formato = _PRODUCTO_CAMPOS[clave]
+            data[clave] = formato(row[campo]) if formato else row[campo]
+        
+        if 'propietario' in expandidas:
+            data['propietario'] = partners_data.get(row['propietario_id'])
+        if 'categoria' in expandidas:
+            data['categoria'] = categorias_data.get(row['categoria_id'])
+        if 'etiquetas' in expandidas:
+            data['etiquetas'] = [etiquetas_data[e] for e in row['etiqueta_ids'] if e in etiquetas_data]
+        if 'imagenes' in expandidas:
+            data['imagenes'] = imagenes_por_producto.get(row['id'], [])
+        
+        for nombre, (id_key, campo) in _PRODUCTO_RELACIONES.items():
+            if nombre not in solo_ids:
+                continue
+            if id_key.endswith('_ids'):
+                data[id_key] = row[campo]
+            else:
+                data[id_key] = row[campo] or None
+        
+        result.append(data)
+    
+    return result
+
+
+# Columnas de la tarjeta de producto (alias p = producto, v = vendedor). La
+# imagen es la principal (o la primera por secuencia) vía índice en producto_id
+_TARJETA_PRODUCTO_SQL = """
+    p.id, p.name, p.precio, p.estado_venta, p.ubicacion,
+    v.id, v.name, v.valoracion_promedio,
+    (SELECT i.id FROM renaix_producto_imagen i
+      WHERE i.producto_id = p.id
+      ORDER BY i.es_principal DESC, i.secuencia, i.id
+      LIMIT 1)
+"""
+
+
+def _tarjeta_producto(row):
+    """
+    Construye la tarjeta de producto a partir de las columnas de _TARJETA_PRODUCTO_SQL.
+    
+    Args:
+        row (tuple): Columnas en el orden de _TARJETA_PRODUCTO_SQL
+    
+    Returns:
+        dict: Tarjeta de producto
+    """
+    (producto_id, nombre, precio, estado_venta, ubicacion,
+     vendedor_id, vendedor_nombre, vendedor_valoracion, imagen_id) = row
+    
+    return {
+        'id': producto_id,
+        'nombre': nombre,
+        'precio': precio,
+        'estado_venta': estado_venta,
+        'ubicacion': ubicacion or '',
+        'imagen_url': f'/api/v1/imagenes/{imagen_id}?size=small' if imagen_id else None,
+        'propietario': {
+            'id': vendedor_id,
+            'name': vendedor_nombre,
+            'valoracion_promedio': round(vendedor_valoracion or 0.0, 2),
+        } if vendedor_id else None,
     }
+
+
+def write_dates_productos(productos):
+    """
+    write_date de unos productos y de sus propietarios y categorías (una consulta).
+    
+    Args:
+        productos: Recordset de renaix.producto
     
-    if include_images:
-        data['imagenes'] = [serialize_producto_imagen(img) for img in producto.imagen_ids.sorted('secuencia')]
+    Returns:
+        tuple: ({producto_id: wd}, {partner_id: wd}, {categoria_id: wd})
+    """
+    env = productos.env
+    env['renaix.producto'].flush_model(['write_date', 'propietario_id', 'categoria_id'])
+    env['res.partner'].flush_model(['write_date'])
+    env['renaix.categoria'].flush_model(['write_date'])
+    
+    env.cr.execute("""
+        SELECT p.id, p.write_date, p.propietario_id, v.write_date, p.categoria_id, c.write_date
+          FROM renaix_producto p
+          LEFT JOIN res_partner v ON v.id = p.propietario_id
+          LEFT JOIN renaix_categoria c ON c.id = p.categoria_id
+         WHERE p.id = ANY(%s)
+    """, [productos.ids])
+    
+    productos_wd, partners_wd, categorias_wd = {}, {}, {}
+    for producto_id, producto_wd, partner_id, partner_wd, categoria_id, categoria_wd in env.cr.fetchall():
+        productos_wd[producto_id] = producto_wd
+        if partner_id:
+            partners_wd[partner_id] = partner_wd
+        if categoria_id:
+            categorias_wd[categoria_id] = categoria_wd
+    
+    return productos_wd, partners_wd, categorias_wd
+
+
+def serialize_productos_tarjeta(productos):
+    """
+    Serializa productos en formato tarjeta (?vista=tarjeta) con una sola consulta.
     
-    if include_comentarios:
-        data['comentarios'] = [serialize_comentario(c) for c in producto.comentario_ids.filtered(lambda x: x.active)]
+    Solo lo que muestra una tarjeta de listado: id, nombre, precio, estado,
+    ubicación, miniatura de la imagen principal y vendedor (id, nombre, valoración).
     
-    return data
+    Args:
+        productos: Recordset de renaix.producto (se respeta su orden)
+    
+    Returns:
+        list: Tarjetas de producto
+    """
+    if not productos:
+        return []
+    
+    env = productos.env
+    env['renaix.producto'].flush_model(['name', 'precio', 'estado_venta', 'ubicacion', 'propietario_id'])
+    env['renaix.producto.imagen'].flush_model(['producto_id', 'es_principal', 'secuencia'])
+    env['res.partner'].flush_model(['name', 'valoracion_promedio'])
+    
+    env.cr.execute(f"""
+        SELECT {_TARJETA_PRODUCTO_SQL}
+          FROM renaix_producto p
+          LEFT JOIN res_partner v ON v.id = p.propietario_id
+         WHERE p.id = ANY(%s)
+    """, [productos.ids])
+    tarjetas = {row[0]: _tarjeta_producto(row) for row in env.cr.fetchall()}
+    
+    return [tarjetas[producto_id] for producto_id in productos.ids if producto_id in tarjetas]
+
+
+def serialize_compras_tarjeta(compras):
+    """
+    Serializa compras en formato tarjeta (?vista=tarjeta) con una sola consulta.
+    
+    Args:
+        compras: Recordset de renaix.compra (se respeta su orden)
+    
+    Returns:
+        list: Compras con la tarjeta de su producto
+    """
+    if not compras:
+        return []
+    
+    env = compras.env
+    env['renaix.compra'].flush_model(['codigo', 'fecha_compra', 'precio_final', 'estado', 'producto_id'])
+    env['renaix.producto'].flush_model(['name', 'precio', 'estado_venta', 'ubicacion', 'propietario_id'])
+    env['renaix.producto.imagen'].flush_model(['producto_id', 'es_principal', 'secuencia'])
+    env['res.partner'].flush_model(['name', 'valoracion_promedio'])
+    
+    env.cr.execute(f"""
+        SELECT c.id, c.codigo, c.fecha_compra, c.precio_final, c.estado, {_TARJETA_PRODUCTO_SQL}
+          FROM renaix_compra c
+          JOIN renaix_producto p ON p.id = c.producto_id
+          LEFT JOIN res_partner v ON v.id = p.propietario_id
+         WHERE c.id = ANY(%s)
+    """, [compras.ids])
+    
+    tarjetas = {}
+    for row in env.cr.fetchall():
+        compra_id, codigo, fecha_compra, precio_final, estado = row[:5]
+        tarjetas[compra_id] = {
+            'id': compra_id,
+            'codigo': codigo,
+            'fecha_compra': fecha_compra or None,
+            'precio_final': precio_final,
+            'estado': estado,
+            'producto': _tarjeta_producto(row[5:]),
+        }
+    
+    return [tarjetas[compra_id] for compra_id in compras.ids if compra_id in tarjetas]
 
 
-def serialize_comentario(comentario):
+def serialize_comentario(comentario, fields=None, expand=None):
     """
     Serializa un comentario a JSON.
     
     Args:
         comentario: Recordset de renaix.comentario
+        fields: Campos a devolver (?fields=), None = todos
+        expand: Relaciones a expandir (?expand=), None = por defecto
     
     Returns:
         dict: Comentario serializado
@@ -164,22 +654,27 @@ def serialize_comentario(comentario):
     if not comentario:
         return None
     
-    return {
+    data = _filtrar_campos({
         'id': comentario.id,
         'texto': comentario.texto,
-        'fecha': comentario.fecha.isoformat() if comentario.fecha else None,
-        'usuario': serialize_partner(comentario.usuario_id, full=False),
+        'fecha': comentario.fecha or None,
         'producto_id': comentario.producto_id.id,
         'producto_nombre': comentario.producto_nombre,
-    }
+    }, fields)
+    
+    _relacion(data, 'usuario', 'usuario_id', lambda: comentario.usuario_id, serialize_partner, fields, expand)
+    
+    return data
 
 
-def serialize_valoracion(valoracion):
+def serialize_valoracion(valoracion, fields=None, expand=None):
     """
     Serializa una valoración a JSON.
     
     Args:
         valoracion: Recordset de renaix.valoracion
+        fields: Campos a devolver (?fields=), None = todos
+        expand: Relaciones a expandir (?expand=), None = por defecto
     
     Returns:
         dict: Valoración serializada
@@ -187,25 +682,32 @@ def serialize_valoracion(valoracion):
     if not valoracion:
         return None
     
-    return {
+    data = _filtrar_campos({
         'id': valoracion.id,
         'puntuacion': valoracion.puntuacion,
         'comentario': valoracion.comentario or '',
-        'fecha': valoracion.fecha.isoformat() if valoracion.fecha else None,
+        'fecha': valoracion.fecha or None,
         'tipo_valoracion': valoracion.tipo_valoracion,
-        'usuario_valorador': serialize_partner(valoracion.usuario_valorador_id, full=False),
-        'usuario_valorado': serialize_partner(valoracion.usuario_valorado_id, full=False),
         'compra_id': valoracion.compra_id.id,
-    }
+    }, fields)
+    
+    _relacion(data, 'usuario_valorador', 'usuario_valorador_id', lambda: valoracion.usuario_valorador_id,
+              serialize_partner, fields, expand)
+    _relacion(data, 'usuario_valorado', 'usuario_valorado_id', lambda: valoracion.usuario_valorado_id,
+              serialize_partner, fields, expand)
+    
+    return data
 
 
-def serialize_compra(compra, include_valoraciones=False):
+def serialize_compra(compra, include_valoraciones=False, fields=None, expand=None):
     """
     Serializa una compra a JSON.
     
     Args:
         compra: Recordset de renaix.compra
         include_valoraciones: Si True, incluye las valoraciones
+        fields: Campos a devolver (?fields=), None = todos
+        expand: Relaciones a expandir (?expand=producto,comprador,vendedor), None = todas
     
     Returns:
         dict: Compra serializada
@@ -213,21 +715,25 @@ def serialize_compra(compra, include_valoraciones=False):
     if not compra:
         return None
     
-    data = {
+    data = _filtrar_campos({
         'id': compra.id,
         'codigo': compra.codigo,
-        'fecha_compra': compra.fecha_compra.isoformat() if compra.fecha_compra else None,
+        'fecha_compra': compra.fecha_compra or None,
         'precio_final': compra.precio_final,
         'estado': compra.estado,
         'notas': compra.notas or '',
-        'producto': serialize_producto(compra.producto_id, include_images=True, include_comentarios=False),
-        'comprador': serialize_partner(compra.comprador_id, full=True),
-        'vendedor': serialize_partner(compra.vendedor_id, full=True),
         'comprador_valoro': compra.comprador_valoro,
         'vendedor_valoro': compra.vendedor_valoro,
-    }
+    }, fields)
+    
+    _relacion(data, 'producto', 'producto_id', lambda: compra.producto_id,
+              lambda p: serialize_producto(p, include_images=True, include_comentarios=False), fields, expand)
+    _relacion(data, 'comprador', 'comprador_id', lambda: compra.comprador_id,
+              lambda p: serialize_partner(p, full=True), fields, expand)
+    _relacion(data, 'vendedor', 'vendedor_id', lambda: compra.vendedor_id,
+              lambda p: serialize_partner(p, full=True), fields, expand)
     
-    if include_valoraciones:
+    if include_valoraciones and _campo_pedido('valoraciones', fields):
         data['valoraciones'] = {
             'comprador_a_vendedor': [serialize_valoracion(v) for v in compra.valoracion_comprador_ids],
             'vendedor_a_comprador': [serialize_valoracion(v) for v in compra.valoracion_vendedor_ids],
@@ -236,12 +742,14 @@ def serialize_compra(compra, include_valoraciones=False):
     return data
 
 
-def serialize_mensaje(mensaje):
+def serialize_mensaje(mensaje, fields=None, expand=None):
     """
     Serializa un mensaje a JSON.
 
     Args:
         mensaje: Recordset de renaix.mensaje
+        fields: Campos a devolver (?fields=), None = todos
+        expand: Relaciones a expandir (?expand=), None = por defecto
 
     Returns:
         dict: Mensaje serializado
@@ -249,22 +757,24 @@ def serialize_mensaje(mensaje):
     if not mensaje:
         return None
 
-    data = {
+    data = _filtrar_campos({
         'id': mensaje.id,
         'texto': mensaje.texto,
-        'fecha': mensaje.fecha.isoformat() if mensaje.fecha else None,
+        'fecha': mensaje.fecha or None,
         'leido': mensaje.leido,
-        'fecha_lectura': mensaje.fecha_lectura.isoformat() if mensaje.fecha_lectura else None,
-        'emisor': serialize_partner(mensaje.emisor_id, full=False),
-        'receptor': serialize_partner(mensaje.receptor_id, full=False),
+        'fecha_lectura': mensaje.fecha_lectura or None,
         'producto_id': mensaje.producto_id.id if mensaje.producto_id else None,
         'producto_nombre': mensaje.producto_nombre or '',
         'hilo_id': mensaje.hilo_id,
         'message_type': mensaje.tipo_mensaje or 'text',
-    }
+    }, fields)
+
+    _relacion(data, 'emisor', 'emisor_id', lambda: mensaje.emisor_id, serialize_partner, fields, expand)
+    _relacion(data, 'receptor', 'receptor_id', lambda: mensaje.receptor_id, serialize_partner, fields, expand)
 
     # Incluir datos de oferta si es un mensaje de oferta
-    if mensaje.tipo_mensaje in ('offer', 'offer_accepted', 'offer_rejected', 'counter_offer'):
+    es_oferta = mensaje.tipo_mensaje in ('offer', 'offer_accepted', 'offer_rejected', 'counter_offer')
+    if es_oferta and _campo_pedido('offer_data', fields):
         data['offer_data'] = {
             'product_id': mensaje.producto_id.id if mensaje.producto_id else None,
             'product_name': mensaje.producto_nombre or '',
@@ -294,8 +804,8 @@ def serialize_denuncia(denuncia):
         'motivo': denuncia.motivo,
         'categoria': denuncia.categoria,
         'estado': denuncia.estado,
-        'fecha_denuncia': denuncia.fecha_denuncia.isoformat() if denuncia.fecha_denuncia else None,
-        'fecha_resolucion': denuncia.fecha_resolucion.isoformat() if denuncia.fecha_resolucion else None,
+        'fecha_denuncia': denuncia.fecha_denuncia or None,
+        'fecha_resolucion': denuncia.fecha_resolucion or None,
         'resolucion': denuncia.resolucion or '',
         'denunciado_nombre': denuncia.denunciado_nombre,
         'usuario_reportante': serialize_partner(denuncia.usuario_reportante_id, full=False),
@@ -345,3 +855,47 @@ def serialize_conversacion(mensajes):
         'mensajes_no_leidos': len(mensajes_no_leidos),
         'mensajes': [serialize_mensaje(m) for m in mensajes],
     }
+
+
+def serialize_busqueda_guardada(busqueda):
+    """
+    Serializa una búsqueda guardada a JSON.
+    
+    Args:
+        busqueda: Recordset de renaix.busqueda.guardada
+    
+    Returns:
+        dict: Búsqueda guardada serializada
+    """
+    if not busqueda:
+        return None
+    
+    return {
+        'id': busqueda.id,
+        'nombre': busqueda.name,
+        'filtros': busqueda.filtros or {},
+        'activa': busqueda.active,
+        'fecha_creacion': busqueda.create_date or None,
+    }
+
+
+def serialize_aviso_busqueda(coincidencia):
+    """
+    Serializa un aviso (coincidencia de búsqueda guardada) a JSON.
+    
+    Args:
+        coincidencia: Recordset de renaix.busqueda.guardada.coincidencia
+    
+    Returns:
+        dict: Aviso serializado
+    """
+    if not coincidencia:
+        return None
+    
+    return {
+        'id': coincidencia.id,
+        'busqueda_id': coincidencia.busqueda_id.id,
+        'busqueda_nombre': coincidencia.busqueda_id.name,
+        'fecha_notificacion': coincidencia.fecha_notificacion or None,
+        'producto': serialize_producto(coincidencia.producto_id, include_images=True),
+    }
@@ -3,6 +3,9 @@
 Validadores reutilizables para datos de la API
 """
 
+import math
+
+from . import auth_helpers
 from ...config import settings
 
 
@@ -31,6 +34,175 @@ def validate_required_fields(data, required_fields):
     return True, ''
 
 
+class Campo:
+    """
+    Regla declarativa de un campo del body JSON.
+    
+    Los mensajes de error se construyen con la etiqueta del campo (p.ej.
+    "El comentario no puede superar 500 caracteres") y pueden sustituirse
+    con mensajes={regla: texto}.
+    
+    Args:
+        etiqueta (str): Nombre del campo en los mensajes ("El comentario")
+        requerido: True (se agrupa en "Campos requeridos faltantes") o un
+                   mensaje propio si falta, es None o es ''
+        tipo: Tipo o tupla de tipos aceptados
+        entero (bool): Debe poder convertirse a entero
+        rango (tuple): (mínimo, máximo) del valor (junto con entero=True)
+        min_len (int): Longitud mínima (tras quitar espacios si es texto)
+        max_len (int): Longitud máxima
+        max_items (int): Número máximo de elementos de una lista
+        opciones (tuple): Valores permitidos
+        validar: Función (valor) -> bool o (bool, mensaje)
+        mensajes (dict): Mensajes que sustituyen a los de por defecto
+    """
+    
+    def __init__(self, etiqueta=None, requerido=False, tipo=None, entero=False, rango=None,
+                 min_len=None, max_len=None, max_items=None, opciones=None, validar=None,
+                 mensajes=None):
+        self.etiqueta = etiqueta
+        self.requerido = requerido
+        self.tipo = tipo
+        self.entero = entero
+        self.rango = rango
+        self.min_len = min_len
+        self.max_len = max_len
+        self.max_items = max_items
+        self.opciones = opciones
+        self.validar = validar
+        self.mensajes = mensajes or {}
+    
+    def compilar(self, nombre):
+        """
+        Traduce las reglas a una lista de comprobaciones (valor -> error o None).
+        
+        Args:
+            nombre (str): Clave del campo en el body
+        
+        Returns:
+            list: Funciones de comprobación, en orden
+        """
+        etiqueta = self.etiqueta or f'El campo "{nombre}"'
+        mensajes = self.mensajes
+        checks = []
+        
+        # Cada comprobación fija sus parámetros como argumentos por defecto
+        if self.tipo is not None:
+            checks.append(lambda v, tipo=self.tipo, error=mensajes.get(
+                'tipo', f'Formato inválido en el campo "{nombre}"'
+            ): None if isinstance(v, tipo) else error)
+        
+        if self.entero:
+            def check_entero(v, error=mensajes.get('entero', f'{etiqueta} debe ser un número')):
+                try:
+                    int(v)
+                except (ValueError, TypeError):
+                    return error
+            checks.append(check_entero)
+        
+        if self.rango is not None:
+            minimo, maximo = self.rango
+            checks.append(lambda v, minimo=minimo, maximo=maximo, error=mensajes.get(
+                'rango', f'{etiqueta} debe estar entre {minimo} y {maximo}'
+            ): None if minimo <= int(v) <= maximo else error)
+        
+        if self.min_len is not None:
+            def check_min_len(v, min_len=self.min_len,
+                              vacio=mensajes.get('vacio', f'{etiqueta} no puede estar vacío'),
+                              error=mensajes.get('min_len', f'{etiqueta} debe tener al menos {self.min_len} caracteres')):
+                longitud = len(v.strip() if isinstance(v, str) else v)
+                if longitud >= min_len:
+                    return None
+                return vacio if longitud == 0 or min_len == 1 else error
+            checks.append(check_min_len)
+        
+        if self.max_len is not None:
+            checks.append(lambda v, max_len=self.max_len, error=mensajes.get(
+                'max_len', f'{etiqueta} no puede superar {self.max_len} caracteres'
+            ): None if len(v.strip() if isinstance(v, str) else v) <= max_len else error)
+        
+        if self.max_items is not None:
+            checks.append(lambda v, max_items=self.max_items, error=mensajes.get(
+                'max_items', f'{etiqueta} no puede tener más de {self.max_items} elementos'
+            ): None if len(v) <= max_items else error)
+        
+        if self.opciones is not None:
+            checks.append(lambda v, opciones=self.opciones, error=mensajes.get(
+                'opciones', f'{etiqueta} inválido. Debe ser uno de: {", ".join(self.opciones)}'
+            ): None if v in opciones else error)
+        
+        if self.validar is not None:
+            def check_validar(v, validar=self.validar,
+                              error=mensajes.get('validar', f'{etiqueta} no es válido')):
+                resultado = validar(v)
+                if isinstance(resultado, tuple):
+                    return None if resultado[0] else resultado[1]
+                return None if resultado else error
+            checks.append(check_validar)
+        
+        return checks
+
+
+class Schema:
+    """
+    Esquema de validación del body JSON de un endpoint.
+    
+    Las reglas se compilan una sola vez (al importar el módulo) en una lista
+    plana de comprobaciones; validar un body solo recorre esa lista.
+    
+    Args:
+        campos (dict): {nombre: Campo}, en el orden en que se validan
+        reglas (tuple): Funciones (data) -> (bool, mensaje) que relacionan
+                        varios campos; se ejecutan al final
+        parcial (bool): Ningún campo es requerido (p.ej. actualizaciones)
+    """
+    
+    def __init__(self, campos=None, reglas=(), parcial=False):
+        self.campos = campos or {}
+        self.reglas = tuple(reglas)
+        # Requeridos agrupados en un único mensaje, como validate_required_fields
+        self.requeridos = [] if parcial else [
+            nombre for nombre, campo in self.campos.items() if campo.requerido is True
+        ]
+        self.checks = []
+        for nombre, campo in self.campos.items():
+            mensaje_requerido = campo.requerido if isinstance(campo.requerido, str) and not parcial else None
+            self.checks.append((nombre, mensaje_requerido, campo.compilar(nombre)))
+    
+    def validate(self, data):
+        """
+        Valida un body JSON.
+        
+        Args:
+            data (dict): Datos a validar
+        
+        Returns:
+            tuple: (bool, str) - (es_válido, mensaje_error)
+        """
+        if self.requeridos:
+            is_valid, error_msg = validate_required_fields(data, self.requeridos)
+            if not is_valid:
+                return False, error_msg
+        
+        for nombre, mensaje_requerido, checks in self.checks:
+            valor = data.get(nombre)
+            if valor is None or valor == '':
+                if mensaje_requerido:
+                    return False, mensaje_requerido
+                continue
+            for check in checks:
+                error = check(valor)
+                if error:
+                    return False, error
+        
+        for regla in self.reglas:
+            is_valid, error_msg = regla(data)
+            if not is_valid:
+                return False, error_msg
+        
+        return True, ''
+
+
 def validate_price(precio):
     """
     Valida que un precio sea válido.
@@ -73,156 +245,251 @@ def validate_pagination_params(page, limit):
     return page_int, limit_int
 
 
-def validate_producto_data(data):
+def validate_fieldsets(params):
     """
-    Valida datos de creación de producto.
+    Valida los parámetros de respuesta parcial ?fields= y ?expand=.
     
     Args:
-        data (dict): Datos del producto
+        params (dict): Query params de la petición
     
     Returns:
-        tuple: (bool, str) - (es_válido, mensaje_error)
+        dict: {fields, expand} como conjuntos de nombres, o None si no se
+              indican (respuesta completa / relaciones por defecto).
+              Un expand vacío (?expand=) no expande ninguna relación.
     """
-    # Campos requeridos
-    required = ['nombre', 'precio', 'categoria_id']
-    is_valid, error_msg = validate_required_fields(data, required)
-    
-    if not is_valid:
-        return False, error_msg
-    
-    # Validar precio
-    if not validate_price(data['precio']):
-        return False, 'Precio inválido. Debe estar entre 0 y 1.000.000'
+    def parse(valor):
+        return {nombre.strip().lower() for nombre in valor.split(',') if nombre.strip()}
     
-    # Validar nombre
-    if len(data['nombre']) < 3:
-        return False, 'El nombre debe tener al menos 3 caracteres'
+    fields = parse(params['fields']) if params.get('fields') else None
+    expand = parse(params['expand']) if 'expand' in params else None
     
-    if len(data['nombre']) > 200:
-        return False, 'El nombre no puede superar 200 caracteres'
-    
-    # Validar etiquetas (máximo 5)
-    if data.get('etiqueta_ids') and len(data['etiqueta_ids']) > 5:
-        return False, 'Un producto no puede tener más de 5 etiquetas'
-    
-    return True, ''
+    return {'fields': fields, 'expand': expand}
 
 
-def validate_comentario_data(data):
+def validate_vista(params):
     """
-    Valida datos de comentario.
+    Valida el parámetro ?vista= de los listados.
     
     Args:
-        data (dict): Datos del comentario
+        params (dict): Query params de la petición
     
     Returns:
-        tuple: (bool, str) - (es_válido, mensaje_error)
+        str: 'tarjeta' (formato compacto) o None (formato completo)
     """
-    if not data.get('texto'):
-        return False, 'El comentario no puede estar vacío'
-    
-    texto = data['texto'].strip()
-    
-    if len(texto) < 3:
-        return False, 'El comentario debe tener al menos 3 caracteres'
-    
-    if len(texto) > settings.MAX_COMMENT_LENGTH:
-        return False, f'El comentario no puede superar {settings.MAX_COMMENT_LENGTH} caracteres'
-    
-    return True, ''
+    return 'tarjeta' if params.get('vista') == 'tarjeta' else None
 
 
-def validate_valoracion_data(data):
+def validate_positive_number(valor):
     """
-    Valida datos de valoración.
+    Valida que un valor sea un número mayor que 0 (p.ej. el precio de una oferta).
     
     Args:
-        data (dict): Datos de la valoración
+        valor: Valor a validar
     
     Returns:
-        tuple: (bool, str) - (es_válido, mensaje_error)
+        bool: True si es válido
     """
-    if 'puntuacion' not in data:
-        return False, 'La puntuación es requerida'
-    
     try:
-        puntuacion = int(data['puntuacion'])
+        return float(valor) > 0
     except (ValueError, TypeError):
-        return False, 'La puntuación debe ser un número'
-    
-    if puntuacion < 1 or puntuacion > 5:
-        return False, 'La puntuación debe estar entre 1 y 5'
-    
-    # Validar comentario opcional
-    if data.get('comentario'):
-        if len(data['comentario']) > 500:
-            return False, 'El comentario no puede superar 500 caracteres'
-    
+        return False
+
+
+def _denuncia_con_referencia(data):
+    """La denuncia indica el producto, comentario o usuario según su tipo."""
+    referencias = {
+        'producto': ('producto_id', 'Debe especificar el producto a denunciar'),
+        'comentario': ('comentario_id', 'Debe especificar el comentario a denunciar'),
+        'usuario': ('usuario_reportado_id', 'Debe especificar el usuario a denunciar'),
+    }
+    campo, error_msg = referencias[data['tipo']]
+    if not data.get(campo):
+        return False, error_msg
     return True, ''
 
 
-def validate_mensaje_data(data):
+def _es_id(valor):
+    """Entero (o texto de dígitos) utilizable como id de registro."""
+    if isinstance(valor, bool):
+        return False
+    if isinstance(valor, int):
+        return valor > 0
+    return isinstance(valor, str) and valor.strip().isdigit() and int(valor) > 0
+
+
+def _busqueda_con_filtros(data):
     """
-    Valida datos de mensaje.
-    
-    Args:
-        data (dict): Datos del mensaje
-    
-    Returns:
-        tuple: (bool, str) - (es_válido, mensaje_error)
+    Los filtros guardados tienen el tipo esperado (en /productos/buscar los
+    inválidos se ignoran, aquí se rechazan) y filtran por algo: el orden por
+    sí solo no define una búsqueda.
     """
-    required = ['receptor_id', 'texto']
-    is_valid, error_msg = validate_required_fields(data, required)
-    
-    if not is_valid:
-        return False, error_msg
-    
-    texto = data['texto'].strip()
-    
-    if len(texto) < 1:
-        return False, 'El mensaje no puede estar vacío'
-    
-    if len(texto) > settings.MAX_MESSAGE_LENGTH:
-        return False, f'El mensaje no puede superar {settings.MAX_MESSAGE_LENGTH} caracteres'
-    
+    filtros = data['filtros']
+    for clave in ('query', 'ubicacion', 'estado_producto', 'orden'):
+        if filtros.get(clave) is not None and not isinstance(filtros[clave], str):
+            return False, f'El filtro "{clave}" debe ser un texto'
+    if filtros.get('categoria_id') is not None and not _es_id(filtros['categoria_id']):
+        return False, 'El filtro "categoria_id" debe ser un id'
+    etiquetas = filtros.get('etiquetas')
+    if isinstance(etiquetas, str):
+        etiquetas = etiquetas.split(',')
+    if etiquetas is not None and not (isinstance(etiquetas, list) and all(_es_id(e) for e in etiquetas)):
+        return False, 'El filtro "etiquetas" debe ser una lista de ids'
+
+    es_valido, mensaje = validate_numeric_search_filters(filtros)
+    if not es_valido:
+        return False, mensaje
+
+    filtros = validate_search_filters(filtros)
+    if not [clave for clave in filtros if clave not in ('orden', 'fuzzy')]:
+        return False, 'Debe indicar al menos un filtro de búsqueda'
     return True, ''
 
 
-def validate_denuncia_data(data):
+def _lista_de_ids(valor):
+    """Lista de ids enteros (p.ej. los avisos a marcar como leídos)."""
+    return all(isinstance(i, int) and not isinstance(i, bool) for i in valor)
+
+
+# ========================================
+# ESQUEMAS DE LOS BODIES JSON
+# ========================================
+# Se compilan al importar el módulo y los aplica route_utils.endpoint(schema=...)
+
+REGISTRO_SCHEMA = Schema({
+    'name': Campo(requerido=True, tipo=str),
+    'email': Campo(requerido=True, tipo=str, validar=auth_helpers.validate_email_format,
+                   mensajes={'validar': 'Formato de email inválido'}),
+    'password': Campo(requerido=True, tipo=str, validar=auth_helpers.validate_password_strength),
+    'phone': Campo(tipo=str, validar=auth_helpers.validate_phone_number,
+                   mensajes={'validar': 'Formato de teléfono inválido'}),
+    'dispositivo': Campo(tipo=str),
+})
+
+LOGIN_SCHEMA = Schema({
+    'email': Campo(requerido=True, tipo=str),
+    'password': Campo(requerido=True, tipo=str),
+    'dispositivo': Campo(tipo=str),
+})
+
+REFRESH_SCHEMA = Schema({
+    'refresh_token': Campo(requerido='Refresh token requerido', tipo=str),
+})
+
+LOGOUT_SCHEMA = Schema({
+    'refresh_token': Campo(tipo=str),
+})
+
+PERFIL_SCHEMA = Schema({
+    'name': Campo(tipo=str),
+    'phone': Campo(tipo=str, validar=auth_helpers.validate_phone_number,
+                   mensajes={'validar': 'Formato de teléfono inválido'}),
+    'mobile': Campo(tipo=str, validar=auth_helpers.validate_phone_number,
+                    mensajes={'validar': 'Formato de móvil inválido'}),
+    'image': Campo(tipo=str),
+})
+
+PASSWORD_SCHEMA = Schema({
+    'password_actual': Campo(requerido='Campo "password_actual" requerido', tipo=str),
+    'password_nueva': Campo(requerido='Campo "password_nueva" requerido', tipo=str),
+})
+
+IMAGEN_SCHEMA = Schema({
+    'image': Campo(requerido='Campo "image" requerido (base64)', tipo=str),
+    'descripcion': Campo(tipo=str),
+})
+
+PRODUCTO_SCHEMA = Schema({
+    'nombre': Campo('El nombre', requerido=True, tipo=str, min_len=3, max_len=200),
+    'precio': Campo(requerido=True, validar=validate_price,
+                    mensajes={'validar': 'Precio inválido. Debe estar entre 0 y 1.000.000'}),
+    'categoria_id': Campo(requerido=True, entero=True),
+    'etiqueta_ids': Campo(tipo=list, max_items=5,
+                          mensajes={'max_items': 'Un producto no puede tener más de 5 etiquetas'}),
+    'etiqueta_nombres': Campo(tipo=list),
+})
+
+# Actualización: mismos campos que al crear, todos opcionales
+PRODUCTO_UPDATE_SCHEMA = Schema(PRODUCTO_SCHEMA.campos, parcial=True)
+
+COMENTARIO_SCHEMA = Schema({
+    'texto': Campo('El comentario', requerido='El comentario no puede estar vacío', tipo=str,
+                   min_len=3, max_len=settings.MAX_COMMENT_LENGTH),
+})
+
+VALORACION_SCHEMA = Schema({
+    'puntuacion': Campo('La puntuación', requerido='La puntuación es requerida', entero=True, rango=(1, 5)),
+    'comentario': Campo('El comentario', tipo=str, max_len=500),
+})
+
+MENSAJE_SCHEMA = Schema({
+    'receptor_id': Campo(requerido=True, entero=True),
+    'texto': Campo('El mensaje', requerido=True, tipo=str, min_len=1, max_len=settings.MAX_MESSAGE_LENGTH),
+})
+
+OFERTA_SCHEMA = Schema({
+    'producto_id': Campo(requerido='producto_id requerido', entero=True),
+    'precio_ofertado': Campo(requerido='precio_ofertado requerido', validar=validate_positive_number,
+                             mensajes={'validar': 'El precio ofertado debe ser mayor que 0'}),
+})
+
+CONTRAOFERTA_SCHEMA = Schema({
+    'oferta_id': Campo(requerido='oferta_id requerido', entero=True),
+    'precio_contraoferta': Campo(requerido='precio_contraoferta requerido', validar=validate_positive_number,
+                                 mensajes={'validar': 'El precio debe ser mayor que 0'}),
+})
+
+COMPRA_SCHEMA = Schema({
+    'producto_id': Campo(requerido='producto_id requerido', entero=True),
+    'notas': Campo(tipo=str),
+})
+
+DENUNCIA_SCHEMA = Schema({
+    'tipo': Campo('Tipo', requerido=True, opciones=('producto', 'comentario', 'usuario')),
+    'motivo': Campo('El motivo', requerido=True, tipo=str, min_len=10),
+    'categoria': Campo(requerido=True, tipo=str),
+}, reglas=(_denuncia_con_referencia,))
+
+ETIQUETA_SCHEMA = Schema({
+    'nombre': Campo('El nombre', requerido='Campo "nombre" requerido', tipo=str, min_len=2, max_len=30),
+})
+
+BUSQUEDA_GUARDADA_SCHEMA = Schema({
+    'nombre': Campo(requerido=True, tipo=str),
+    'filtros': Campo(requerido=True, tipo=dict, mensajes={'tipo': 'Los filtros deben ser un objeto'}),
+}, reglas=(_busqueda_con_filtros,))
+
+AVISOS_LEIDOS_SCHEMA = Schema({
+    'ids': Campo('Los ids', tipo=list, validar=_lista_de_ids,
+                 mensajes={'tipo': 'Los ids deben ser una lista',
+                           'validar': 'Los ids deben ser números enteros'}),
+})
+
+
+NUMERIC_SEARCH_FILTERS = ('precio_min', 'precio_max', 'lat', 'lon', 'radio_km')
+
+
+def validate_numeric_search_filters(filters):
     """
-    Valida datos de denuncia.
+    Rechaza filtros numéricos de búsqueda que no son números finitos.
+    
+    float() acepta 'nan' e 'inf', y NaN no cumple ninguna comparación: un
+    radio NaN no se acota y la búsqueda no devuelve nada sin avisar.
     
     Args:
-        data (dict): Datos de la denuncia
+        filters (dict): Filtros a validar
     
     Returns:
         tuple: (bool, str) - (es_válido, mensaje_error)
     """
-    required = ['tipo', 'motivo', 'categoria']
-    is_valid, error_msg = validate_required_fields(data, required)
-    
-    if not is_valid:
-        return False, error_msg
-    
-    # Validar tipo
-    valid_tipos = ['producto', 'comentario', 'usuario']
-    if data['tipo'] not in valid_tipos:
-        return False, f'Tipo inválido. Debe ser uno de: {", ".join(valid_tipos)}'
-    
-    # Validar que existe la referencia según el tipo
-    if data['tipo'] == 'producto' and not data.get('producto_id'):
-        return False, 'Debe especificar el producto a denunciar'
-    
-    if data['tipo'] == 'comentario' and not data.get('comentario_id'):
-        return False, 'Debe especificar el comentario a denunciar'
-    
-    if data['tipo'] == 'usuario' and not data.get('usuario_reportado_id'):
-        return False, 'Debe especificar el usuario a denunciar'
-    
-    # Validar motivo
-    if len(data['motivo']) < 10:
-        return False, 'El motivo debe tener al menos 10 caracteres'
-    
+    for clave in NUMERIC_SEARCH_FILTERS:
+        if filters.get(clave) in (None, ''):
+            continue
+        try:
+            valor = float(filters[clave])
+        except (ValueError, TypeError):
+            continue  # validate_search_filters ignora los valores no numéricos
+        if not math.isfinite(valor):
+            return False, f'El filtro "{clave}" debe ser un número finito'
     return True, ''
 
 
@@ -238,8 +505,8 @@ def validate_search_filters(filters):
     """
     validated = {}
     
-    # Query de texto
-    if filters.get('query'):
+    # Query de texto (los filtros de un body JSON pueden traer cualquier tipo)
+    if filters.get('query') and isinstance(filters['query'], str):
         validated['query'] = filters['query'].strip()
     
     # Categoría
@@ -249,39 +516,100 @@ def validate_search_filters(filters):
         except (ValueError, TypeError):
             pass
     
-    # Etiquetas (puede ser string separado por comas)
+    # Etiquetas: ids separados por comas o lista de ids (se descartan los no numéricos)
     if filters.get('etiquetas'):
-        if isinstance(filters['etiquetas'], str):
-            validated['etiquetas'] = [e.strip() for e in filters['etiquetas'].split(',') if e.strip()]
-        elif isinstance(filters['etiquetas'], list):
-            validated['etiquetas'] = filters['etiquetas']
+        etiquetas = filters['etiquetas']
+        if isinstance(etiquetas, str):
+            etiquetas = [e.strip() for e in etiquetas.split(',')]
+        if isinstance(etiquetas, list):
+            ids = [int(e) for e in etiquetas if _es_id(e)]
+            if ids:
+                validated['etiquetas'] = ids
     
     # Rango de precio
     if filters.get('precio_min'):
         try:
-            validated['precio_min'] = float(filters['precio_min'])
+            valor = float(filters['precio_min'])
         except (ValueError, TypeError):
-            pass
+            valor = None
+        if valor is not None and math.isfinite(valor):
+            validated['precio_min'] = valor
     
     if filters.get('precio_max'):
         try:
-            validated['precio_max'] = float(filters['precio_max'])
+            valor = float(filters['precio_max'])
         except (ValueError, TypeError):
-            pass
+            valor = None
+        if valor is not None and math.isfinite(valor):
+            validated['precio_max'] = valor
     
     # Estado del producto
-    if filters.get('estado_producto'):
+    if filters.get('estado_producto') and isinstance(filters['estado_producto'], str):
         validated['estado_producto'] = filters['estado_producto']
     
     # Ubicación
-    if filters.get('ubicacion'):
+    if filters.get('ubicacion') and isinstance(filters['ubicacion'], str):
         validated['ubicacion'] = filters['ubicacion'].strip()
     
+    # Cercanía: coordenadas del usuario y radio en km
+    if filters.get('lat') and filters.get('lon'):
+        try:
+            lat = float(filters['lat'])
+            lon = float(filters['lon'])
+        except (ValueError, TypeError):
+            lat = lon = None
+        
+        if lat is not None and -90 <= lat <= 90 and -180 <= lon <= 180:
+            validated['lat'] = lat
+            validated['lon'] = lon
+            try:
+                radio_km = float(filters.get('radio_km') or settings.GEO_DEFAULT_RADIUS_KM)
+            except (ValueError, TypeError):
+                radio_km = settings.GEO_DEFAULT_RADIUS_KM
+            if not math.isfinite(radio_km):
+                radio_km = settings.GEO_DEFAULT_RADIUS_KM
+            validated['radio_km'] = min(max(radio_km, 0.1), settings.GEO_MAX_RADIUS_KM)
+    
+    # Búsqueda aproximada (tolerante a erratas) sobre el texto
+    if validated.get('query') and str(filters.get('fuzzy', '')).lower() in ('1', 'true'):
+        validated['fuzzy'] = True
+    
     # Orden
-    valid_orders = ['precio_asc', 'precio_desc', 'fecha_desc', 'fecha_asc']
+    valid_orders = ['precio_asc', 'precio_desc', 'fecha_desc', 'fecha_asc', 'relevancia', 'distancia']
     if filters.get('orden') and filters['orden'] in valid_orders:
         validated['orden'] = filters['orden']
+    elif validated.get('fuzzy'):
+        validated['orden'] = 'relevancia'  # Por defecto en búsqueda aproximada
     else:
         validated['orden'] = 'fecha_desc'  # Por defecto
     
+    # Relevancia solo tiene sentido con texto de búsqueda, y distancia con coordenadas
+    if validated['orden'] == 'relevancia' and not validated.get('query'):
+        validated['orden'] = 'fecha_desc'
+    
+    if validated['orden'] == 'distancia' and 'lat' not in validated:
+        validated['orden'] = 'fecha_desc'
+    
+    return validated
+
+
+def validate_facets(facets):
+    """
+    Valida la lista de facetas solicitadas en una búsqueda.
+    
+    Args:
+        facets (str): Facetas separadas por comas (ej: "categoria,precio")
+    
+    Returns:
+        list: Facetas válidas, sin duplicados y en el orden recibido
+    """
+    if not facets or not isinstance(facets, str):
+        return []
+    
+    validated = []
+    for facet in facets.split(','):
+        facet = facet.strip()
+        if facet in settings.SEARCH_FACETS and facet not in validated:
+            validated.append(facet)
+    
     return validated